@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from projects.models import Project
+from .db_router import primary
+from .metrics import record_cache_lookup
+
+ACCESS_CACHE_KEY = 'project_access:user:{}'
+
+
+def _cache_key(user_id):
+    return ACCESS_CACHE_KEY.format(user_id)
+
+
+def has_full_access(user):
+    """
+    Admins and superusers are not restricted to their own projects.
+    """
+    return user.is_superuser or getattr(user, 'role', '') == 'ADMIN'
+
+
+def get_accessible_project_ids(user):
+    """
+    Resolves the ids of projects the user manages or is a member of.
+    Uses a single UNION query over the project table and the members M2M table,
+    so callers can filter by `project_id IN (...)` without joins or DISTINCT.
+
+    The result is cached per user in CACHES['default'] and invalidated by
+    the membership/manager signals in projects.signals.
+    """
+    key = _cache_key(user.id)
+    project_ids = cache.get(key)
+    record_cache_lookup('project_access', project_ids is not None)
+
+    if project_ids is None:
+        managed = Project.objects.filter(manager=user).order_by().values_list('id', flat=True)
+        member_of = Project.members.through.objects.filter(user=user).order_by().values_list('project_id', flat=True)
+
+        # Invalidated on commit, so filled from the primary rather than a possibly lagging replica
+        with primary():
+            project_ids = set(managed.union(member_of))
+        cache.set(key, project_ids, settings.PROJECT_ACCESS_CACHE_TIMEOUT)
+
+    return project_ids
+
+
+def get_request_project_ids(request):
+    """
+    Request-memoized variant of get_accessible_project_ids().
+    Permissions and querysets share one lookup per request.
+    """
+    if not hasattr(request, '_accessible_project_ids'):
+        request._accessible_project_ids = get_accessible_project_ids(request.user)
+
+    return request._accessible_project_ids
+
+
+def invalidate_accessible_project_ids(*user_ids):
+    """
+    Drops cached access scopes of the given users, now and again on commit,
+    so a concurrent request cannot cache the pre-commit membership.
+    """
+    keys = [_cache_key(user_id) for user_id in user_ids if user_id is not None]
+
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'common'
+
+    def ready(self):
+        from . import db_router, profiling, slow_queries
+
+        db_router.install()
+
+        if settings.SLOW_QUERY_LOG_ENABLED:
+            slow_queries.install()
+        if settings.PROFILING_TASK_SAMPLE_RATE:
+            profiling.install()
@@ -0,0 +1,229 @@
+"""
+API benchmark suite: query budgets and latency percentiles per endpoint.
+
+Used by the `benchmark_api` command and by common.tests to catch N+1 regressions.
+"""
+import math
+import time
+from dataclasses import dataclass, field
+from importlib import import_module
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from projects.models import Project
+from reports.models import ProjectReport
+from sprints.models import Sprint, SprintCompletion
+from tasks.models import Task, BugReport, ImportJob
+from users.serializers import CustomTokenObtainPairSerializer
+
+# Apps whose router endpoints must all be covered by ENDPOINTS
+BENCHMARKED_URLCONFS = ['users.urls', 'projects.urls', 'sprints.urls', 'tasks.urls', 'reports.urls']
+
+
+@dataclass
+class Endpoint:
+    """
+    One benchmarked request. `path` and `data` are formatted with the fixture ids
+    (see `benchmark_fixtures`); `budget` is the maximum number of queries allowed.
+    """
+    name: str
+    method: str
+    path: str
+    budget: int
+    data: dict = field(default_factory=dict)
+
+
+ENDPOINTS = [
+    Endpoint('user-list', 'get', '/api/users/', 2),
+    Endpoint('user-detail', 'get', '/api/users/{user}/', 1),
+    Endpoint('project-list', 'get', '/api/projects/', 3),
+    Endpoint('project-detail', 'get', '/api/projects/{project}/', 2),
+    Endpoint('sprint-list', 'get', '/api/sprints/?project={project}', 3),
+    Endpoint('sprint-detail', 'get', '/api/sprints/{sprint}/', 1),
+    Endpoint('sprint-timeline', 'get', '/api/sprints/{sprint}/timeline/', 4),
+    Endpoint('sprint-completion', 'get', '/api/sprints/{previous_sprint}/completion/', 2),
+    Endpoint('task-list', 'get', '/api/tasks/?project={project}', 4),
+    Endpoint('task-list-cursor', 'get', '/api/tasks/?project={project}&pagination=cursor', 3),
+    Endpoint('task-detail', 'get', '/api/tasks/{task}/', 2),
+    Endpoint('task-export', 'get', '/api/tasks/export/?project={project}', 2),
+    Endpoint('task-partial-update', 'patch', '/api/tasks/{task}/', 8, {'priority': 'HIGH'}),
+    Endpoint('task-bulk-transition', 'post', '/api/tasks/bulk_transition/', 9,
+             {'ids': '{task_ids}', 'status': 'IN_PROGRESS'}),
+    Endpoint('bug-list', 'get', '/api/bugs/?project={project}', 3),
+    Endpoint('bug-detail', 'get', '/api/bugs/{bug}/', 1),
+    Endpoint('bug-export', 'get', '/api/bugs/export/?project={project}', 2),
+    Endpoint('import-list', 'get', '/api/imports/', 2),
+    Endpoint('import-detail', 'get', '/api/imports/{import_job}/', 1),
+    Endpoint('report-list', 'get', '/api/reports/?project={project}', 2),
+    Endpoint('report-detail', 'get', '/api/reports/{report}/', 1),
+    Endpoint('report-create', 'post', '/api/reports/', 3, {'project': '{project}'}),
+]
+
+# Router actions deliberately left out: one-shot writes that would change the
+# dataset under the following measurements, or need an uploaded file
+EXCLUDED_ACTIONS = {
+    'user-create', 'user-update', 'user-destroy',
+    'project-create', 'project-update', 'project-destroy',
+    'sprint-create', 'sprint-update', 'sprint-destroy', 'sprint-complete',
+    'task-create', 'task-update', 'task-destroy', 'task-bulk-create', 'task-bulk-update', 'task-import-file',
+    'bug-create', 'bug-update', 'bug-partial-update', 'bug-destroy', 'bug-import-file',
+    'user-partial-update', 'project-partial-update', 'sprint-partial-update',
+}
+
+
+def router_actions():
+    """
+    Names (`<basename>-<action>`) of every view action routed by BENCHMARKED_URLCONFS.
+    """
+    names = set()
+    for urlconf in BENCHMARKED_URLCONFS:
+        for _, viewset, basename in import_module(urlconf).router.registry:
+            actions = {'list', 'retrieve', 'create', 'update', 'partial_update', 'destroy'}
+            actions &= {name for name in dir(viewset) if callable(getattr(viewset, name, None))}
+            actions |= {extra.__name__ for extra in viewset.get_extra_actions()}
+            for action in actions:
+                action = {'list': 'list', 'retrieve': 'detail'}.get(action, action)
+                names.add(f'{basename}-{action.replace("_", "-")}')
+    return names
+
+
+def uncovered_actions():
+    """
+    Routed actions that are neither benchmarked nor explicitly excluded.
+    """
+    covered = {endpoint.name for endpoint in ENDPOINTS}
+    return sorted(router_actions() - covered - EXCLUDED_ACTIONS)
+
+
+def seed(tasks_per_project, projects=5, users=20, seed=42):
+    """
+    Builds the dataset for one size with fill_db (which truncates project data first).
+    Callers confirm the truncation themselves, see benchmark_api.
+    """
+    call_command(
+        'fill_db', users=users, projects=projects, tasks_per_project=tasks_per_project,
+        sprints=4, bug_ratio=0.3, seed=seed, interactive=False, force=True, stdout=StringIO()
+    )
+
+
+def benchmark_fixtures():
+    """
+    Picks the acting user (manager of the first project) and the ids used in ENDPOINTS.
+    """
+    project = Project.objects.order_by('id').first()
+    user = project.manager
+    sprint = Sprint.objects.filter(project=project, is_active=True).first()
+    task = Task.objects.filter(sprint=sprint).order_by('id').first()
+
+    import_job = ImportJob.objects.create(
+        kind=ImportJob.Kind.TASKS, file_format=ImportJob.Format.CSV, source='imports/benchmark.csv',
+        created_by=user, status=ImportJob.Status.DONE
+    )
+    report = ProjectReport.objects.create(project=project, generated_by=user, is_ready=True)
+    previous_sprint = Sprint.objects.filter(project=project, is_active=False).first() or sprint
+    SprintCompletion.objects.create(sprint=previous_sprint, requested_by=user, status=SprintCompletion.Status.DONE)
+
+    return user, {
+        'user': user.id,
+        'project': project.id,
+        'sprint': sprint.id,
+        'previous_sprint': previous_sprint.id,
+        'task': task.id,
+        'task_ids': list(Task.objects.filter(sprint=sprint).order_by('id').values_list('id', flat=True)[:20]),
+        'bug': BugReport.objects.filter(project=project).order_by('id').values_list('id', flat=True).first(),
+        'import_job': import_job.id,
+        'report': report.id,
+    }
+
+
+def _format(value, fixtures):
+    if isinstance(value, str):
+        if value.startswith('{') and value.endswith('}') and value[1:-1] in fixtures:
+            return fixtures[value[1:-1]]
+        return value.format(**fixtures)
+    return value
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile of a non-empty list.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def run_endpoint(client, endpoint, fixtures, iterations):
+    """
+    Issues one warm-up request and `iterations` timed ones.
+    Returns the result row recorded in the benchmark JSON.
+    """
+    path = endpoint.path.format(**fixtures)
+    data = {name: _format(value, fixtures) for name, value in endpoint.data.items()}
+    request = getattr(client, endpoint.method)
+
+    def call():
+        response = request(path, data, format='json') if endpoint.method != 'get' else request(path)
+        if getattr(response, 'streaming', False):
+            b''.join(response.streaming_content)
+        return response
+
+    status_code = call().status_code
+    timings = []
+    queries = 0
+
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = call()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, len(ctx))
+        status_code = response.status_code
+
+    return {
+        'method': endpoint.method.upper(),
+        'path': endpoint.path,
+        'status': status_code,
+        'queries': queries,
+        'budget': endpoint.budget,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+    }
+
+
+def run_benchmarks(sizes, iterations, endpoints=None):
+    """
+    Seeds every size and benchmarks the endpoints against it.
+    The response cache is disabled, so every request measures the database path.
+    Returns ({size: {endpoint: result}}, [violations]).
+    """
+    results = {}
+    violations = []
+
+    with override_settings(RESPONSE_CACHE_ENABLED=False):
+        for size in sizes:
+            seed(size)
+            user, fixtures = benchmark_fixtures()
+            # A real access token, so authentication is part of the measurement
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}'
+            )
+
+            results[str(size)] = {}
+            for endpoint in endpoints or ENDPOINTS:
+                result = run_endpoint(client, endpoint, fixtures, iterations)
+                results[str(size)][endpoint.name] = result
+
+                if result['status'] >= 400:
+                    violations.append(f'{endpoint.name} @ {size}: HTTP {result["status"]}')
+                if result['queries'] > endpoint.budget:
+                    violations.append(
+                        f'{endpoint.name} @ {size}: {result["queries"]} queries, budget {endpoint.budget}'
+                    )
+
+    return results, violations
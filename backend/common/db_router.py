@@ -0,0 +1,152 @@
+"""
+Read-replica routing.
+
+When REPLICA_DATABASE names a DATABASES alias, reads issued inside a replica
+context go to that alias; every write, and every read outside such a
+context, uses `default`. Replica contexts are opened by
+common.middleware.ReplicaRoutingMiddleware for safe-method requests and by
+the Celery hooks below for REPLICA_TASKS (report generation).
+
+A context sticks to the primary once it writes, so a request reads its own
+writes. Across requests, writes mark their projects (and user data) as
+recently written for REPLICA_LAG_SECONDS; `fresh_reads()` sends reads about
+them to the primary in that window. Anything filled from database reads and
+invalidated on commit (access scopes, token versions, cached responses,
+ETags, reports) must read through `primary()` or `fresh_reads()`, otherwise a
+lagging replica would store stale data under a fresh key.
+"""
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from celery.signals import task_prerun, task_postrun
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+WRITTEN_CACHE_KEY = 'replica_lag:written:{}'
+USERS_WRITTEN = 'users'
+
+_routing = ContextVar('database_routing', default=None)
+
+
+class Routing:
+    """
+    Routing state of a request or task.
+    """
+
+    def __init__(self, replica):
+        self.replica = replica
+        self.wrote = False
+        self.primary_depth = 0
+
+    @property
+    def use_replica(self):
+        return self.replica and not self.wrote and not self.primary_depth
+
+
+def replica_alias():
+    return settings.REPLICA_DATABASE or None
+
+
+@contextmanager
+def routing(replica):
+    """
+    Routes the reads of the enclosed code to the replica (when `replica` and
+    one is configured) or to the primary.
+    """
+    token = _routing.set(Routing(replica and replica_alias() is not None))
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+@contextmanager
+def primary():
+    """
+    Reads the enclosed code's data from the primary.
+    """
+    current = _routing.get()
+    if current is None:
+        yield
+        return
+
+    current.primary_depth += 1
+    try:
+        yield
+    finally:
+        current.primary_depth -= 1
+
+
+def mark_written(*keys):
+    """
+    Records writes to the given project ids (or USERS_WRITTEN) for REPLICA_LAG_SECONDS.
+    """
+    if replica_alias() and keys:
+        cache.set_many({WRITTEN_CACHE_KEY.format(key): True for key in keys}, settings.REPLICA_LAG_SECONDS)
+
+
+def fresh_reads(project_ids, users=True):
+    """
+    primary() if the replica may still lag behind writes to these projects
+    (or to user data, when `users`), otherwise a no-op.
+    """
+    current = _routing.get()
+    if current is None or not current.use_replica:
+        return nullcontext()
+
+    keys = [WRITTEN_CACHE_KEY.format(project_id) for project_id in project_ids]
+    if users:
+        keys.append(WRITTEN_CACHE_KEY.format(USERS_WRITTEN))
+    return primary() if keys and cache.get_many(keys) else nullcontext()
+
+
+class ReplicaRouter:
+    """
+    DATABASE_ROUTERS entry: replica reads inside replica contexts, everything else on `default`.
+    """
+
+    def db_for_read(self, model, **hints):
+        current = _routing.get()
+        if current is not None and current.use_replica:
+            return replica_alias() or DEFAULT_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        current = _routing.get()
+        if current is not None:
+            current.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows, so objects read from either may be related
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+def _task_started(task=None, **kwargs):
+    current = _routing.get()
+    # Eager tasks run inside the caller's context; keep a pinned caller on the primary
+    if task.name in settings.REPLICA_TASKS and replica_alias() and (current is None or current.use_replica):
+        task.request.database_routing_token = _routing.set(Routing(True))
+
+
+def _task_finished(task=None, **kwargs):
+    token = getattr(task.request, 'database_routing_token', None)
+    if token is not None:
+        task.request.database_routing_token = None
+        _routing.reset(token)
+
+
+def install():
+    """
+    Connects the Celery task hooks. Called from CommonConfig.ready(); the hooks
+    do nothing unless REPLICA_DATABASE is set.
+    """
+    task_prerun.connect(_task_started, weak=False, dispatch_uid='replica_task_started')
+    task_postrun.connect(_task_finished, weak=False, dispatch_uid='replica_task_finished')
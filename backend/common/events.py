@@ -0,0 +1,128 @@
+"""
+Per-project change events, streamed to clients by common.views.project_events.
+
+Writes publish small notifications ("task.updated", "report.ready", ...) after
+their transaction commits; clients refetch only what an event points at
+instead of polling whole lists. Events are fanned out across processes through
+the EVENTS_BACKEND: Redis pub/sub in deployments, an in-process backend in tests.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def channel_name(project_id):
+    return f'{settings.EVENTS_CHANNEL_PREFIX}project:{project_id}'
+
+
+class InMemoryEventBackend:
+    """
+    Delivers events to subscribers of the same process only.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    async def subscribe(self, channel, timeout):
+        """
+        Yields None once subscribed, then published messages, or None after
+        `timeout` seconds without one.
+        """
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        try:
+            yield None
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), timeout)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+
+class RedisEventBackend:
+    """
+    Redis pub/sub; every stream holds one subscription connection.
+    """
+
+    def __init__(self):
+        self.url = settings.EVENTS_REDIS_URL
+        self._client = redis.Redis.from_url(self.url)
+
+    def publish(self, channel, message):
+        self._client.publish(channel, message)
+
+    async def subscribe(self, channel, timeout):
+        """
+        Yields None once subscribed, then published messages, or None after
+        `timeout` seconds without one.
+        """
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            # Wait for the confirmation, so events published from now on are received
+            await pubsub.get_message(timeout=timeout)
+            yield None
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+                yield message['data'].decode() if message else None
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.EVENTS_BACKEND)()
+
+
+def _send(project_id, message):
+    try:
+        get_backend().publish(channel_name(project_id), message)
+    except redis.RedisError:
+        # Live updates are best effort, clients resync on reconnect
+        logger.warning('Could not publish event for project %s', project_id, exc_info=True)
+
+
+def publish(project_id, event, **data):
+    """
+    Sends `{"event": event, "project": project_id, **data}` to the project's
+    subscribers once the current transaction commits.
+    """
+    message = json.dumps({'event': event, 'project': project_id, **data}, default=str)
+    transaction.on_commit(lambda: _send(project_id, message))
+
+
+def publish_changes(event, objects):
+    """
+    One `event` per project listing the ids of the given (bulk written) objects.
+    """
+    ids_by_project = defaultdict(list)
+    for obj in objects:
+        ids_by_project[obj.project_id].append(obj.pk)
+    for project_id, ids in ids_by_project.items():
+        publish(project_id, event, ids=ids)
@@ -0,0 +1,51 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class _Echo:
+    """
+    File-like object for csv.writer that hands each written line back instead of buffering it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _column_name(lookup):
+    return lookup.replace('__', '_')
+
+
+def _csv_rows(rows, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([_column_name(field) for field in fields])
+    for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
+def _ndjson_rows(rows, fields):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode({_column_name(field): row[field] for field in fields}) + '\n'
+
+
+def stream_export(queryset, fields, export_format, filename, chunk_size):
+    """
+    Streams a `values()` projection of the queryset as CSV or NDJSON.
+
+    Rows are read with QuerySet.iterator(), so memory use depends on
+    chunk_size and not on the number of exported rows.
+    """
+    rows = queryset.values(*fields).iterator(chunk_size=chunk_size)
+    render = _csv_rows if export_format == 'csv' else _ndjson_rows
+
+    response = StreamingHttpResponse(render(rows, fields), content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
@@ -0,0 +1,60 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Search filter backed by a trigger-maintained `search_vector` column.
+
+    On PostgreSQL the `search` terms are matched against the tsvector through
+    its GIN index and results are ordered by rank (title weighs more than
+    description). On other databases it falls back to the default
+    `icontains` search over `search_fields`.
+
+    Pair it with SearchRankOrderingFilter, so `?ordering=` and cursor
+    pagination keep the rank as the primary ordering key.
+    """
+    search_vector_field = 'search_vector'
+    rank_field = 'search_rank'
+    # Must match the text search configuration used by the trigger in tasks migration 0005
+    search_config = 'simple'
+
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        query = SearchQuery(' '.join(search_terms), config=self.search_config, search_type='websearch')
+
+        # ts_rank() returns a real; as double precision it round-trips through cursor positions
+        rank = Cast(SearchRank(F(self.search_vector_field), query), FloatField())
+
+        return queryset.filter(
+            **{self.search_vector_field: query}
+        ).annotate(
+            **{self.rank_field: rank}
+        ).order_by(f'-{self.rank_field}', '-id')
+
+
+class SearchRankOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter that keeps the search rank first on ranked querysets:
+    `?ordering=` fields only break ties between equally ranked rows.
+
+    CursorPagination takes its ordering from here as well, so keyset pages
+    of search results are walked by rank too.
+    """
+    rank_field = FullTextSearchFilter.rank_field
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if self.rank_field not in queryset.query.annotations:
+            return ordering
+
+        return [f'-{self.rank_field}', *(ordering or []), '-id']
@@ -0,0 +1,86 @@
+"""
+Django command to benchmark the API endpoints against query budgets
+"""
+import json
+import platform
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from common.benchmarks import ENDPOINTS, run_benchmarks, uncovered_actions
+from common.management.commands.fill_db import add_truncate_arguments, confirm_truncate
+from sprintmaster.celery import app as celery_app
+
+LOCAL_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class Command(BaseCommand):
+    """
+    Seeds the database with `fill_db` at each --sizes value (tasks per project),
+    drives every endpoint in common.benchmarks.ENDPOINTS through the DRF test
+    client and writes queries and p50/p95/p99 latency per endpoint to --output.
+
+    Requests authenticate with a bearer access token. Budgets assume the
+    default stateless JWT authentication; --database-auth measures the
+    per-request user lookup instead, for comparison (its budget violations are
+    reported but do not fail the command).
+
+    Runs without Redis or a Celery broker (local-memory cache, eager tasks).
+    WARNING: like fill_db, it truncates all project data in the configured
+    database, and takes the same --noinput and --force options.
+    """
+    help = "Benchmarks API endpoints and checks per-endpoint query budgets"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,1000',
+                            help='Comma-separated tasks-per-project values to seed')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per endpoint')
+        parser.add_argument('--output', default='benchmark-results.json', help='JSON file to write')
+        parser.add_argument('--only', action='append', help='Only run these endpoint names')
+        parser.add_argument('--database-auth', action='store_true',
+                            help='Load the user from the database on every request (JWT_STATELESS_AUTH off)')
+        add_truncate_arguments(parser)
+
+    def handle(self, *args, **options):
+        missing = uncovered_actions()
+        if missing:
+            raise CommandError(f'Endpoints without a benchmark or exclusion: {", ".join(missing)}')
+        confirm_truncate(options['interactive'], options['force'])
+
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        endpoints = [endpoint for endpoint in ENDPOINTS if not options['only'] or endpoint.name in options['only']]
+
+        celery_app.conf.task_always_eager = True
+        stateless_auth = not options['database_auth']
+        with override_settings(CACHES=LOCAL_CACHES, DEBUG=False, JWT_STATELESS_AUTH=stateless_auth):
+            results, violations = run_benchmarks(sizes, options['iterations'], endpoints)
+
+        report = {
+            'meta': {
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'iterations': options['iterations'],
+                'stateless_auth': stateless_auth,
+                'generated_at': timezone.now().isoformat(timespec='seconds'),
+            },
+            'results': results,
+        }
+        Path(options['output']).write_text(json.dumps(report, indent=2, sort_keys=True) + '\n')
+
+        for size, rows in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{size} tasks per project'))
+            for name, row in rows.items():
+                self.stdout.write(
+                    f'  {name:<24} {row["queries"]:>3}/{row["budget"]:<3} queries  '
+                    f'p50 {row["p50_ms"]:>8.2f} ms  p95 {row["p95_ms"]:>8.2f} ms  p99 {row["p99_ms"]:>8.2f} ms'
+                )
+
+        if violations and not stateless_auth:
+            self.stdout.write(self.style.WARNING('Budget violations:\n' + '\n'.join(violations)))
+        elif violations:
+            raise CommandError('Benchmark budget violations:\n' + '\n'.join(violations))
+
+        self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
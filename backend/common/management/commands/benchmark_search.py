@@ -0,0 +1,58 @@
+"""
+Django command to compare icontains and full-text search on seeded data
+"""
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from common.filters import FullTextSearchFilter
+from tasks.models import Task, BugReport
+
+
+class Command(BaseCommand):
+    """
+    Times the legacy `ILIKE '%term%'` search and FullTextSearchFilter
+    for the same terms over Task and BugReport (first page of 20 rows).
+    Intended to be run against a large corpus (see `fill_db`).
+    """
+    help = "Benchmarks icontains search against the full-text search backend"
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='+', help='Search terms to benchmark')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+
+    def _time(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset[:20])
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                'Full-text search is PostgreSQL-only; both runs below use icontains.'
+            ))
+
+        search_filter = FullTextSearchFilter()
+        view = SimpleNamespace(search_fields=['title', 'description'])
+
+        for model in (Task, BugReport):
+            for term in options['terms']:
+                request = Request(RequestFactory().get('/', {'search': term}))
+
+                legacy = model.objects.filter(Q(title__icontains=term) | Q(description__icontains=term))
+                full_text = search_filter.filter_queryset(request, model.objects.all(), view)
+
+                self.stdout.write(
+                    f'{model.__name__} "{term}": '
+                    f'icontains {self._time(legacy, options["repeat"]):.2f} ms, '
+                    f'full-text {self._time(full_text, options["repeat"]):.2f} ms'
+                )
@@ -0,0 +1,56 @@
+"""
+Django command to compare query plans of the row-level security filters
+"""
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+
+from common.access import get_accessible_project_ids
+from tasks.models import Task, BugReport
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Prints EXPLAIN output and timings for the legacy OR-join + DISTINCT filter
+    and the project id-set filter used by ProjectRelatedQuerySetMixin.
+    Intended to be run against a seeded database (see `fill_db`).
+    """
+    help = "Compares query plans of the legacy and id-set project access filters"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User whose access scope is benchmarked')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+        parser.add_argument('--analyze', action='store_true', help='Use EXPLAIN ANALYZE (PostgreSQL only)')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist")
+
+        explain_options = {'analyze': True} if options['analyze'] and connection.vendor == 'postgresql' else {}
+
+        for model in (Task, BugReport):
+            legacy = model.objects.filter(
+                Q(project__manager=user) | Q(project__members=user)
+            ).distinct()
+            id_set = model.objects.filter(project_id__in=get_accessible_project_ids(user))
+
+            for label, queryset in (('legacy', legacy), ('id-set', id_set)):
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    rows = queryset.count()
+                    timings.append((time.perf_counter() - started) * 1000)
+
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f'{model.__name__} [{label}]: {rows} rows, '
+                    f'median {statistics.median(timings):.2f} ms over {options["repeat"]} runs'
+                ))
+                self.stdout.write(queryset.explain(**explain_options))
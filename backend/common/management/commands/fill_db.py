@@ -1,96 +1,348 @@
+"""
+Django command to populate the database with a synthetic dataset
+"""
 import random
-from datetime import timedelta
-from django.core.management.base import BaseCommand
-from django.utils import timezone
+import re
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from common.access import invalidate_accessible_project_ids
 from projects.models import Project
-from sprints.models import Sprint
-from tasks.models import Task, BugReport
+from reports.models import ProjectReport, ProjectStats
+from reports.stats import rebuild_stats
+from reports.versions import bump_data_version
+from sprints.models import Sprint, SprintCompletion
+from tasks.models import Task, BugReport, ImportJob
 
 User = get_user_model()
 
+GENERATED_USER_PREFIX = 'user_'
+# Marks generated accounts (.invalid is reserved, RFC 2606); only these are deleted on truncation
+GENERATED_EMAIL_DOMAIN = 'fill-db.invalid'
+SPRINT_LENGTH_DAYS = 14
+BACKLOG_SHARE = 0.2
+
+# Child tables first, so the DELETE fallback of non-PostgreSQL backends respects FKs
+TRUNCATED_MODELS = [
+    BugReport, ImportJob, Task, ProjectStats, ProjectReport, SprintCompletion, Sprint,
+    Project.members.through, Project,
+]
+
+ROLE_WEIGHTS = {'DEV': 60, 'QA': 25, 'PM': 15}
+STORY_POINT_WEIGHTS = {1: 20, 2: 25, 3: 25, 5: 15, 8: 10, 13: 4, 21: 1}
+PRIORITY_WEIGHTS = {'LOW': 25, 'MEDIUM': 45, 'HIGH': 22, 'CRITICAL': 8}
+
+# Task status mix by where the task lives
+STATUS_WEIGHTS = {
+    'closed_sprint': {'DONE': 70, 'CLOSED': 20, 'IN_PROGRESS': 5, 'NEW': 5},
+    'active_sprint': {'NEW': 25, 'IN_PROGRESS': 30, 'REVIEW': 15, 'TESTING': 10, 'DONE': 15, 'CLOSED': 5},
+    'backlog': {'NEW': 90, 'IN_PROGRESS': 5, 'CLOSED': 5},
+}
+BUG_STATUS_WEIGHTS = {'NEW': 30, 'CONFIRMED': 20, 'IN_PROGRESS': 15, 'FIXED': 20, 'CLOSED': 15}
+
+
+def add_truncate_arguments(parser):
+    parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                        help='Truncate the project data without asking for confirmation')
+    parser.add_argument('--force', action='store_true', help='Allow truncating the project data with DEBUG off')
+
+
+def confirm_truncate(interactive, force):
+    """
+    Raises CommandError unless the project data may be truncated: DEBUG is on
+    (or `force` is set) and, when `interactive`, the user typed 'yes'.
+    """
+    if not settings.DEBUG and not force:
+        raise CommandError('DEBUG is off; pass --force to truncate the project data of this database.')
+
+    if interactive:
+        answer = input(
+            f'This will TRUNCATE all project data in the "{connection.settings_dict["NAME"]}" database.\n'
+            "Type 'yes' to continue, or 'no' to cancel: "
+        )
+        if answer != 'yes':
+            raise CommandError('Cancelled, no data was deleted.')
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _bulk_create_with_timestamps(model, objects, batch_size):
+    """
+    bulk_create() that keeps the generated created_at/updated_at: auto_now
+    fields are set to now() on insert, so they are written back with one
+    bulk_update() pass (which leaves them alone).
+    """
+    timestamps = [(obj.created_at, obj.updated_at) for obj in objects]
+    model.objects.bulk_create(objects, batch_size=batch_size)
+
+    for obj, (created_at, updated_at) in zip(objects, timestamps):
+        obj.created_at, obj.updated_at = created_at, updated_at
+    model.objects.bulk_update(objects, ['created_at', 'updated_at'], batch_size=batch_size)
+
 
 class Command(BaseCommand):
-    help = "Populates the database with dummy data for testing"
+    """
+    Generates users, projects (with members), consecutive two-week sprints,
+    tasks and bug reports with bulk_create. Distributions of roles, statuses,
+    priorities, story points and dates are weighted and fully determined by --seed.
+
+    Existing project data is truncated first (TRUNCATE on PostgreSQL) and
+    ProjectStats are rebuilt once at the end, since bulk inserts bypass signals.
+    Like `flush`, it asks for confirmation unless --noinput is passed, and it
+    refuses to run with DEBUG off unless --force is passed.
+    """
+    help = "Populates the database with a deterministic synthetic dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5, help='Number of generated users')
+        parser.add_argument('--projects', type=int, default=3, help='Number of projects')
+        parser.add_argument('--tasks-per-project', type=int, default=10, help='Tasks per project')
+        parser.add_argument('--sprints', type=int, default=2, help='Sprints per project, the last one is active')
+        parser.add_argument('--bug-ratio', type=float, default=0.3, help='Bug reports per task')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create')
+        add_truncate_arguments(parser)
 
     def handle(self, *args, **options):
+        if options['users'] < 1 or options['projects'] < 0 or options['sprints'] < 0:
+            raise CommandError('--users must be positive, --projects and --sprints not negative.')
+        confirm_truncate(options['interactive'], options['force'])
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        started = time.perf_counter()
+
+        self._check_user_names(options['users'])
+
         self.stdout.write('Deleting old data...')
-        Task.objects.all().delete()
-        Sprint.objects.all().delete()
-        Project.objects.all().delete()
-        # User.objects.exclude(is_superuser=True).delete()
+        self._truncate()
 
         self.stdout.write('Creating Users...')
-        roles = ['PM', 'DEV', 'QA']
+        users = self._create_users(options['users'])
+        admin = User.objects.filter(is_superuser=True).first()
+
+        self.stdout.write('Creating Projects...')
+        projects = self._create_projects(options['projects'], users, admin)
+
+        self.stdout.write('Creating Sprints...')
+        sprints = self._create_sprints(projects, options['sprints'])
+
+        self.stdout.write('Creating Tasks & Bugs...')
+        tasks_count, bugs_count = self._create_tasks(
+            projects, sprints, options['tasks_per_project'], options['bug_ratio']
+        )
+
+        self.stdout.write('Rebuilding ProjectStats...')
+        for project in projects:
+            rebuild_stats(project.id)
+            for sprint in sprints[project.id]:
+                rebuild_stats(project.id, sprint.id)
+
+        invalidate_accessible_project_ids(*User.objects.values_list('id', flat=True))
+        bump_data_version(*(project.id for project in projects))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Database populated successfully: {len(users)} users, {len(projects)} projects, '
+            f'{tasks_count} tasks, {bugs_count} bugs in {time.perf_counter() - started:.1f}s.'
+        ))
+
+    def _truncate(self):
+        """
+        Empties the project tables in one statement instead of collecting ORM cascades.
+        """
+        tables = [model._meta.db_table for model in TRUNCATED_MODELS]
+        statements = connection.ops.sql_flush(no_style(), tables, reset_sequences=True, allow_cascade=True)
+
+        with transaction.atomic():
+            connection.ops.execute_sql_flush(statements)
+            User.objects.filter(
+                username__startswith=GENERATED_USER_PREFIX, email__endswith=f'@{GENERATED_EMAIL_DOMAIN}',
+                is_superuser=False
+            ).delete()
+
+    def _check_user_names(self, count):
+        """
+        Refuses to run when an account that was not generated holds one of the generated user names.
+        """
+        pattern = re.compile(rf'^{GENERATED_USER_PREFIX}(?:dev|qa|pm)_(\d+)$')
+        accounts = User.objects.filter(username__startswith=GENERATED_USER_PREFIX).exclude(
+            email__endswith=f'@{GENERATED_EMAIL_DOMAIN}'
+        )
+        taken = [
+            username for username in accounts.values_list('username', flat=True)
+            if (match := pattern.match(username)) and int(match.group(1)) < count
+        ]
+        if taken:
+            raise CommandError(f'Accounts not generated by fill_db use the names {", ".join(sorted(taken))}.')
+
+    def _create_users(self, count):
+        password = make_password('password123')
         users = []
-        for i in range(5):
-            role = random.choice(roles)
-            u = User.objects.create_user(
-                username=f'user_{role.lower()}_{i}',
-                email=f'user{i}@test.com',
-                password='password123',
+
+        for i in range(count):
+            role = _weighted(self.rng, ROLE_WEIGHTS)
+            users.append(User(
+                username=f'{GENERATED_USER_PREFIX}{role.lower()}_{i}',
+                email=f'user{i}@{GENERATED_EMAIL_DOMAIN}',
+                password=password,
                 role=role,
                 first_name=f'Name{i}',
                 last_name=f'Surname{i}'
-            )
-            users.append(u)
+            ))
 
-        admin = User.objects.filter(is_superuser=True).first() or users[0]
+        return User.objects.bulk_create(users, batch_size=self.batch_size)
 
-        self.stdout.write('Creating Projects...')
-        projects = []
-        for i in range(3):
-            p = Project.objects.create(
+    def _create_projects(self, count, users, admin):
+        managers = [user for user in users if user.role == 'PM'] or [admin or users[0]]
+        today = self.now.date()
+
+        projects = Project.objects.bulk_create([
+            Project(
                 name=f'Project Alpha {i + 1}',
                 description=f'This is a test project description {i + 1}',
-                start_date=timezone.now().date(),
-                manager=admin,
-                status=random.choice(['ACTIVE', 'ON_HOLD'])
+                start_date=today - timedelta(days=self.rng.randint(30, 720)),
+                manager=self.rng.choice(managers),
+                status=_weighted(self.rng, {'ACTIVE': 80, 'ON_HOLD': 15, 'ARCHIVED': 5})
             )
-            p.members.set(users)
-            projects.append(p)
+            for i in range(count)
+        ], batch_size=self.batch_size)
 
-        self.stdout.write('Creating Sprints & Tasks...')
+        self.members = {}
+        memberships = []
         for project in projects:
-
-            s1 = Sprint.objects.create(
-                name='Sprint #1 (Closed)',
-                project=project,
-                start_date=timezone.now().date() - timedelta(days=14),
-                end_date=timezone.now().date() - timedelta(days=1),
-                is_active=False
+            team = self.rng.sample(users, min(len(users), self.rng.randint(3, 15)))
+            self.members[project.id] = [user for user in team if user.role in ('DEV', 'QA')] or team
+            memberships.extend(
+                Project.members.through(project_id=project.id, user_id=user.id) for user in team
             )
 
-            s2 = Sprint.objects.create(
-                name='Sprint #2 (Active)',
-                project=project,
-                start_date=timezone.now().date(),
-                end_date=timezone.now().date() + timedelta(days=14),
-                is_active=True
-            )
+        Project.members.through.objects.bulk_create(memberships, batch_size=self.batch_size)
+        return projects
+
+    def _create_sprints(self, projects, count):
+        """
+        Consecutive sprints ending with an active one that covers today.
+        """
+        today = self.now.date()
+        new_sprints = []
 
-            for j in range(10):
-                task_status = random.choice(Task.Status.values)
-                t = Task.objects.create(
-                    title=f'Task {j} for {project.name}',
-                    description='Lorem ipsum dolor sit amet...',
+        for project in projects:
+            for i in range(count):
+                start = today - timedelta(days=SPRINT_LENGTH_DAYS * (count - i - 1) + self.rng.randint(0, 6))
+                is_active = i == count - 1
+                new_sprints.append(Sprint(
+                    name=f'Sprint #{i + 1} ({"Active" if is_active else "Closed"})',
                     project=project,
-                    sprint=s2,
-                    assignee=random.choice(users),
-                    status=task_status,
-                    priority=random.choice(Task.Priority.values),
-                    story_points=random.choice([1, 2, 3, 5, 8])
-                )
-
-                if j % 3 == 0:
-                    BugReport.objects.create(
-                        title=f'Bug in {t.title}',
-                        description='Something went wrong here...',
-                        project=project,
-                        task=t,
-                        reporter=random.choice(users),
-                        status='NEW',
-                        priority='HIGH'
-                    )
-
-        self.stdout.write(self.style.SUCCESS('Database populated successfully!'))
\ No newline at end of file
+                    start_date=start,
+                    end_date=start + timedelta(days=SPRINT_LENGTH_DAYS - 1),
+                    is_active=is_active
+                ))
+
+        sprints = {project.id: [] for project in projects}
+        for sprint in Sprint.objects.bulk_create(new_sprints, batch_size=self.batch_size):
+            sprints[sprint.project_id].append(sprint)
+        return sprints
+
+    def _random_datetime(self, start, end):
+        start = timezone.make_aware(datetime.combine(start, datetime.min.time()))
+        end = min(timezone.make_aware(datetime.combine(end, datetime.max.time())), self.now)
+        if end <= start:
+            return start
+        return start + timedelta(seconds=self.rng.randint(0, int((end - start).total_seconds())))
+
+    def _new_task(self, project, sprint, number):
+        if sprint is None:
+            placement, start, end = 'backlog', project.start_date, self.now.date()
+        else:
+            placement = 'active_sprint' if sprint.is_active else 'closed_sprint'
+            start, end = sprint.start_date, sprint.end_date
+
+        created_at = self._random_datetime(start, end)
+        status = _weighted(self.rng, STATUS_WEIGHTS[placement])
+        updated_at = created_at
+        if status != 'NEW':
+            updated_at = self._random_datetime(created_at.date(), end)
+
+        return Task(
+            title=f'Task {number} for {project.name}',
+            description='Lorem ipsum dolor sit amet...',
+            project_id=project.id,
+            sprint_id=sprint.id if sprint else None,
+            assignee_id=self.rng.choice(self.members[project.id]).id,
+            status=status,
+            priority=_weighted(self.rng, PRIORITY_WEIGHTS),
+            story_points=_weighted(self.rng, STORY_POINT_WEIGHTS),
+            due_date=sprint.end_date if sprint else None,
+            created_at=created_at,
+            updated_at=max(created_at, updated_at)
+        )
+
+    def _new_bug(self, task):
+        created_at = self._random_datetime(task.created_at.date(), self.now.date())
+        status = _weighted(self.rng, BUG_STATUS_WEIGHTS)
+        return BugReport(
+            title=f'Bug in {task.title}',
+            description='Something went wrong here...',
+            project_id=task.project_id,
+            task_id=task.id,
+            reporter_id=self.rng.choice(self.members[task.project_id]).id,
+            status=status,
+            priority=_weighted(self.rng, PRIORITY_WEIGHTS),
+            is_resolved=status in ('FIXED', 'CLOSED'),
+            created_at=created_at,
+            updated_at=created_at
+        )
+
+    def _flush(self, tasks, bug_ratio):
+        """
+        Inserts a batch of tasks, then bug reports for a bug_ratio share of them.
+        """
+        _bulk_create_with_timestamps(Task, tasks, self.batch_size)
+
+        bugs = []
+        for task in tasks:
+            # bug_ratio > 1 yields several bugs for some tasks
+            expected = bug_ratio
+            while expected > 0:
+                if self.rng.random() < expected:
+                    bugs.append(self._new_bug(task))
+                expected -= 1
+
+        _bulk_create_with_timestamps(BugReport, bugs, self.batch_size)
+        return len(bugs)
+
+    def _create_tasks(self, projects, sprints, tasks_per_project, bug_ratio):
+        tasks_count = bugs_count = 0
+        batch = []
+
+        for project in projects:
+            project_sprints = sprints[project.id]
+
+            for number in range(tasks_per_project):
+                sprint = None
+                if project_sprints and self.rng.random() >= BACKLOG_SHARE:
+                    sprint = self.rng.choice(project_sprints)
+                batch.append(self._new_task(project, sprint, number))
+
+                if len(batch) >= self.batch_size:
+                    bugs_count += self._flush(batch, bug_ratio)
+                    tasks_count += len(batch)
+                    batch = []
+                    self.stdout.write(f'  {tasks_count} tasks...')
+
+        if batch:
+            bugs_count += self._flush(batch, bug_ratio)
+            tasks_count += len(batch)
+
+        return tasks_count, bugs_count
@@ -0,0 +1,75 @@
+"""
+Django command to rank slow query log entries by fingerprint
+"""
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common.benchmarks import percentile
+from common.slow_queries import fingerprint
+
+ORDERINGS = {
+    'total': lambda group: sum(group['durations']),
+    'count': lambda group: len(group['durations']),
+    'max': lambda group: max(group['durations']),
+    'p95': lambda group: percentile(group['durations'], 95),
+}
+
+
+class Command(BaseCommand):
+    """
+    Reads the slow query log written by common.slow_queries (including rotated
+    files), groups entries by statement fingerprint and prints the top groups
+    with their duration stats, most frequent call sites and request/task contexts.
+    """
+    help = "Groups and ranks slow query log entries by fingerprint"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=settings.SLOW_QUERY_LOG_FILE, help='Slow query log to read')
+        parser.add_argument('--top', type=int, default=10, help='Number of groups to show')
+        parser.add_argument('--order', choices=ORDERINGS, default='total', help='Ranking criterion')
+
+    def _entries(self, path):
+        # RotatingFileHandler backups: <name>.1 is the newest, read oldest first
+        backups = [backup for backup in path.parent.glob(f'{path.name}.*') if backup.suffix[1:].isdigit()]
+        backups.sort(key=lambda backup: int(backup.suffix[1:]), reverse=True)
+        for log_file in [*backups, path]:
+            with log_file.open() as lines:
+                for line in lines:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def handle(self, *args, **options):
+        path = Path(options['file'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist; is SLOW_QUERY_LOG_ENABLED set?')
+
+        groups = defaultdict(lambda: {'durations': [], 'call_sites': Counter(), 'contexts': Counter(), 'sql': ''})
+        for entry in self._entries(path):
+            key, normalized = fingerprint(entry['sql'])
+            group = groups[key]
+            group['durations'].append(entry['duration_ms'])
+            group['call_sites'][entry.get('call_site') or '<unknown>'] += 1
+            group['contexts'][entry.get('context') or '<none>'] += 1
+            group['sql'] = normalized
+
+        ranked = sorted(groups.items(), key=lambda item: ORDERINGS[options['order']](item[1]), reverse=True)
+
+        for key, group in ranked[:options['top']]:
+            durations = group['durations']
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{key}: {len(durations)} queries, total {sum(durations):.0f} ms, '
+                f'p95 {percentile(durations, 95):.0f} ms, max {max(durations):.0f} ms'
+            ))
+            self.stdout.write(f'  {group["sql"][:300]}')
+            for call_site, count in group['call_sites'].most_common(3):
+                self.stdout.write(f'  call site: {call_site} ({count})')
+            for context, count in group['contexts'].most_common(3):
+                self.stdout.write(f'  context:   {context} ({count})')
+
+        self.stdout.write(self.style.SUCCESS(f'{len(groups)} fingerprint(s) in the slow query log.'))
@@ -0,0 +1,155 @@
+"""
+In-process request metrics rendered in the Prometheus text exposition format.
+
+Metrics are kept per worker process; scrape every process (or run a single
+worker per container) to get complete numbers.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, counts in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip((*self.buckets, '+Inf'), counts):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else _number(bound)
+                    lines.append(
+                        f'{self.name}_bucket{_labels(self.labelnames, labels, [("le", le)])} {cumulative}'
+                    )
+                lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(counts[-1])}')
+                lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+REQUESTS = Counter('sprintmaster_http_requests_total', 'HTTP requests.', ('view', 'method', 'status'))
+REQUEST_DURATION = Histogram(
+    'sprintmaster_http_request_duration_seconds', 'Wall time of HTTP requests.', ('view', 'method'), DURATION_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'sprintmaster_http_request_db_queries', 'Database queries per HTTP request.', ('view',), QUERY_COUNT_BUCKETS
+)
+DB_DURATION = Histogram(
+    'sprintmaster_http_request_db_duration_seconds', 'Database time per HTTP request.', ('view',), DURATION_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'sprintmaster_http_response_size_bytes', 'Serialized response body size (non-streaming).', ('view',), SIZE_BUCKETS
+)
+CACHE_LOOKUPS = Counter(
+    'sprintmaster_cache_lookups_total', 'Application cache lookups by result.', ('view', 'cache', 'result')
+)
+
+METRICS = [REQUESTS, REQUEST_DURATION, DB_QUERIES, DB_DURATION, RESPONSE_SIZE, CACHE_LOOKUPS]
+
+
+class RequestMetrics:
+    """
+    Per-request collector; also the `connection.execute_wrapper` that times queries.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_lookups = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+    def activate(self):
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current.reset(token)
+
+
+def record_cache_lookup(cache_name, hit):
+    """
+    Counts a hit or miss of an application cache against the current request, if any.
+    """
+    collector = _current.get()
+    if collector is not None:
+        key = (cache_name, 'hit' if hit else 'miss')
+        collector.cache_lookups[key] = collector.cache_lookups.get(key, 0) + 1
+
+
+def observe_request(view, method, status, duration, collector, response_size=None):
+    REQUESTS.inc((view, method, str(status)))
+    REQUEST_DURATION.observe((view, method), duration)
+    DB_QUERIES.observe((view,), collector.queries)
+    DB_DURATION.observe((view,), collector.db_time)
+    if response_size is not None:
+        RESPONSE_SIZE.observe((view,), response_size)
+    for (cache_name, result), count in collector.cache_lookups.items():
+        CACHE_LOOKUPS.inc((view, cache_name, result), count)
+
+
+def render_metrics():
+    return '\n'.join(line for metric in METRICS for line in metric.render()) + '\n'
@@ -0,0 +1,133 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from . import db_router
+from .metrics import RequestMetrics, observe_request
+from .profiling import Profile, requested, sampled
+from .slow_queries import logging_queries, reset_context, set_context
+
+
+class MetricsMiddleware:
+    """
+    Records wall time, DB query count and time, application cache hits and misses
+    and response size per request, labelled by the resolved view name.
+    Exposed by common.views.metrics at /api/metrics/.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        collector = RequestMetrics()
+        token = collector.activate()
+        started = time.perf_counter()
+
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(collector))
+                response = self.get_response(request)
+        finally:
+            RequestMetrics.deactivate(token)
+
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        size = None if response.streaming else len(response.content)
+
+        observe_request(view, request.method, response.status_code, duration, collector, size)
+        return response
+
+
+class SlowQueryContextMiddleware:
+    """
+    Logs the slow queries of the request (see common.slow_queries), labelled
+    with the request method and path.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SLOW_QUERY_LOG_ENABLED:
+            return self.get_response(request)
+
+        token = set_context(f'{request.method} {request.path}')
+        try:
+            with logging_queries():
+                return self.get_response(request)
+        finally:
+            reset_context(token)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a PROFILING_SAMPLE_RATE share of requests, and requests sending
+    PROFILING_HEADER with PROFILING_TOKEN, with cProfile (see common.profiling).
+    The profile name is returned in the X-Profile-Id header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not (requested(request) or sampled(settings.PROFILING_SAMPLE_RATE)):
+            return self.get_response(request)
+
+        profile = Profile(f'{request.method} {request.path}')
+        if not profile.start():
+            return self.get_response(request)
+
+        try:
+            response = self._profiled(request)
+        finally:
+            name = profile.stop()
+
+        response['X-Profile-Id'] = name
+        return response
+
+    def _profiled(self, request):
+        # Single root frame above Django's mutually recursive middleware chain
+        return self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sends the reads of safe-method requests to the read replica (see
+    common.db_router); other requests, and safe ones after they write, use
+    the primary. Streaming bodies (exports) are read from the replica as well.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not db_router.replica_alias():
+            return self.get_response(request)
+
+        replica = request.method in SAFE_METHODS
+        with db_router.routing(replica):
+            response = self.get_response(request)
+
+        if replica and response.streaming and not response.is_async:
+            response.streaming_content = self._on_replica(response.streaming_content)
+        return response
+
+    @staticmethod
+    def _on_replica(chunks):
+        # The routing context is entered per chunk: under ASGI every chunk may be
+        # produced in a different thread and context
+        chunks = iter(chunks)
+        while True:
+            with db_router.routing(True):
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
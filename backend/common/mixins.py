@@ -1,4 +1,24 @@
-from django.db.models import Q
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.utils.cache import parse_etags, patch_cache_control, patch_vary_headers
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+from projects.models import Project
+from reports.versions import get_data_versions, get_users_version
+from .access import get_request_project_ids
+from .db_router import fresh_reads
+from .export import EXPORT_FORMATS, stream_export
+from .metrics import record_cache_lookup
+
+RESPONSE_CACHE_KEY = 'response:{}'
 
 
 class ProjectRelatedQuerySetMixin:
@@ -7,24 +27,275 @@ class ProjectRelatedQuerySetMixin:
     Ensures users only retrieve data for projects they are assigned to.
     """
 
+    def get_scope_project_ids(self):
+        """
+        Projects the request user may read, or None if they are not restricted.
+        """
+        user = self.request.user
+
+        if user.is_staff or getattr(user, 'role', '') == 'ADMIN':
+            return None
+
+        return get_request_project_ids(self.request)
+
     def get_queryset(self):
         queryset = super().get_queryset()
-        user = self.request.user
 
-        if not user.is_authenticated:
+        if not self.request.user.is_authenticated:
             return queryset.none()
 
-        if user.is_staff or getattr(user, 'role', '') == 'ADMIN':
+        project_ids = self.get_scope_project_ids()
+        if project_ids is None:
             return queryset
 
         if queryset.model.__name__ == 'Project':
-            return queryset.filter(
-                Q(manager=user) | Q(members=user)
-            ).distinct()
+            return queryset.filter(id__in=project_ids)
 
         if hasattr(queryset.model, 'project'):
-            return queryset.filter(
-                Q(project__manager=user) | Q(project__members=user)
-            ).distinct()
+            return queryset.filter(project_id__in=project_ids)
+
+        return queryset
+
+
+def _collect_serializer_lookups(serializer, model):
+    """
+    Walks the serializer fields and maps them onto the model relations.
+
+    Returns a tuple of (only_fields, select_related, prefetches), where
+    only_fields is None if the serializer reads something that cannot be
+    resolved to a concrete column (methods, properties, source='*').
+    """
+    only_fields = {model._meta.pk.name}
+    select_related = []
+    prefetches = {}
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+
+        if field.source == '*':
+            only_fields = None
+            continue
+
+        name = field.source.split('.')[0]
+
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            only_fields = None
+            continue
+
+        if model_field.many_to_many or model_field.one_to_many:
+            if isinstance(field, ListSerializer):
+                queryset = model_field.related_model._default_manager.all()
+                extra_fields = [model_field.remote_field.name] if model_field.one_to_many else []
+                prefetches[name] = Prefetch(
+                    name, queryset=optimize_queryset(queryset, field.child, extra_fields=extra_fields)
+                )
+            elif name not in prefetches:
+                prefetches[name] = Prefetch(name)
+
+        elif model_field.many_to_one or model_field.one_to_one:
+            if not model_field.concrete:
+                only_fields = None
+                continue
+
+            if only_fields is not None:
+                only_fields.add(name)
+
+            if isinstance(field, BaseSerializer):
+                nested_only, nested_select, nested_prefetches = _collect_serializer_lookups(
+                    field, model_field.related_model
+                )
+                select_related.append(name)
+                select_related.extend(f'{name}__{lookup}' for lookup in nested_select)
+
+                if only_fields is not None and nested_only is not None:
+                    only_fields.update(f'{name}__{lookup}' for lookup in nested_only)
+
+                for lookup, prefetch in nested_prefetches.items():
+                    prefetch.add_prefix(name)
+                    prefetches[f'{name}__{lookup}'] = prefetch
+
+            elif '.' in field.source:
+                select_related.append(name)
+
+        elif only_fields is not None:
+            only_fields.add(name)
+
+    return only_fields, select_related, prefetches
+
+
+def optimize_queryset(queryset, serializer, restrict_fields=True, extra_fields=()):
+    """
+    Applies select_related, prefetch_related and only() derived from the
+    serializer's declared fields to the given queryset.
+    """
+    only_fields, select_related, prefetches = _collect_serializer_lookups(serializer, queryset.model)
+
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches.values())
+
+    if restrict_fields and only_fields is not None:
+        queryset = queryset.only(*only_fields, *extra_fields)
+
+    return queryset
+
+
+class SerializerOptimizedQuerySetMixin:
+    """
+    Mixin to avoid N+1 queries on list/detail endpoints.
+    Joins and prefetches every relation the serializer renders, and for
+    read-only requests loads only the columns the serializer needs.
+
+    Must be placed before ProjectRelatedQuerySetMixin so the scoped
+    queryset is the one being optimized.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+
+        return optimize_queryset(
+            queryset,
+            serializer,
+            restrict_fields=self.request.method in SAFE_METHODS
+        )
+
+    def perform_update(self, serializer):
+        """
+        UpdateModelMixin drops the prefetch cache after saving, which would make
+        the response load nested relations row by row; re-read the instance
+        through the optimized queryset instead.
+        """
+        super().perform_update(serializer)
+        serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
+
+
+class ConditionalGetMixin:
+    """
+    Weak ETags for list and retrieve, answered with 304 Not Modified when the
+    client's If-None-Match still matches.
+
+    The validator is computed without touching the rows: it hashes the request
+    (path, query, format, user), the user's project scope and the data version
+    of every project in it (see reports.versions), plus the version of the
+    embedded user data. Any task, bug, sprint, project or membership write
+    bumps a version, so a stale ETag never matches.
+
+    Must be placed before ProjectRelatedQuerySetMixin.
+    """
+
+    def get_etag_project_ids(self, request):
+        """
+        Projects whose data the response may contain. A `?project=` filtered
+        list only depends on that project: membership changes bump its version,
+        so the user's access to it is covered as well.
+        """
+        project = request.query_params.get('project', '')
+        if self.action == 'list' and 'project' in getattr(self, 'filterset_fields', ()) and project.isdigit():
+            return [int(project)]
+
+        project_ids = self.get_scope_project_ids()
+        if project_ids is None:
+            project_ids = Project.objects.values_list('id', flat=True)
+        return project_ids
+
+    def get_etag(self, request, project_ids):
+        versions = get_data_versions(project_ids)
+        parts = [
+            request.get_full_path(), request.accepted_renderer.format, request.user.pk, get_users_version(),
+            *(f'{project_id}:{versions[project_id]}' for project_id in sorted(versions)),
+        ]
+        return f'W/"{hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()}"'
+
+    def _conditional(self, request, handler, *args, **kwargs):
+        project_ids = list(self.get_etag_project_ids(request))
+        etag = self.get_etag(request, project_ids)
+        client_etags = parse_etags(request.headers.get('If-None-Match', ''))
+
+        if etag in client_etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            # Data read from a lagging replica must not be labelled with the fresh ETag
+            with fresh_reads(project_ids):
+                response = self.get_fresh_response(request, etag, handler, *args, **kwargs)
+
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            # Per-user content: browsers may keep it, but must revalidate and shared caches must not
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Authorization'])
+        return response
+
+    def get_fresh_response(self, request, etag, handler, *args, **kwargs):
+        return handler(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, super().retrieve, *args, **kwargs)
+
+
+class CachedResponseMixin(ConditionalGetMixin):
+    """
+    Caches the serialized data of list and retrieve responses in CACHES['default'],
+    keyed by the ETag. The key thereby covers the user's access scope, the
+    query params and the data version ("generation") of every project in scope;
+    writes, including bulk paths such as update_tasks(), bump the version and so
+    move readers to a new key instead of deleting entries.
+
+    Versions are bumped both when a write happens and again on commit, so data
+    read before a commit is never served once the commit is visible.
+    Lookups are counted in the `response` cache metric.
+    """
+
+    def get_fresh_response(self, request, etag, handler, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return handler(request, *args, **kwargs)
+
+        key = RESPONSE_CACHE_KEY.format(etag.removeprefix('W/').strip('"'))
+        data = cache.get(key)
+        record_cache_lookup('response', data is not None)
+
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+
+class StreamingExportMixin:
+    """
+    Adds an `export` list action that streams every row matching the list
+    filters as CSV (default) or NDJSON, selected with `?export_format=`.
+
+    Rows are a flat `values()` projection of `export_fields`, so nested
+    serializers, prefetches and pagination are skipped entirely.
+    """
+    export_fields = None
+    export_filename = 'export'
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        export_format = request.query_params.get('export_format', 'csv')
+
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"detail": f"Unsupported export format. Choose one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        if not queryset.query.order_by:
+            queryset = queryset.order_by('id')
 
-        return queryset
\ No newline at end of file
+        return stream_export(
+            queryset, self.export_fields, export_format, self.export_filename, settings.EXPORT_CHUNK_SIZE
+        )
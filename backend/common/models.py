@@ -1,3 +1,40 @@
 from django.db import models
 
-# Create your models here.
+
+class ProjectMoveMixin(models.Model):
+    """
+    Remembers the project a row was loaded with, so moving it to another
+    project can be detected without a query.
+
+    Rows referencing it (a sprint's tasks, a task's bugs) must stay in the
+    same project; on PostgreSQL the triggers of tasks migration 0008 enforce
+    this at commit, clean() and the serializers report it as a validation error.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_project_id = instance.__dict__.get('project_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_project_id = self.project_id
+
+    def project_changed(self, project_id):
+        """
+        True if a saved row is assigned `project_id` instead of its stored project.
+        """
+        if self.pk is None:
+            return False
+        loaded = getattr(self, '_loaded_project_id', None)
+        return loaded is None or loaded != project_id
+
+    def referenced_from_other_projects(self, related_name, project_id):
+        """
+        True if rows of `related_name` referencing this row belong to another project than `project_id`.
+        """
+        return getattr(self, related_name).exclude(project_id=project_id).exists()
@@ -1,4 +1,4 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -9,3 +9,61 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+class KeysetResultsSetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination over (created_at, id), newest first.
+    Does not run COUNT(*) or OFFSET, so deep pages cost the same as the first one.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class OptionalCursorPagination(StandardResultsSetPagination):
+    """
+    Page-number pagination by default, keyset pagination on request.
+
+    Clients opt in with `?pagination=cursor` (or by following a `cursor` link),
+    so existing consumers of the page-number format keep working.
+    """
+    mode_query_param = 'pagination'
+    cursor_class = KeysetResultsSetPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator:
+            return self.cursor_paginator.get_paginated_response(data)
+
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        cursor_parameters = [
+            parameter for parameter in self.cursor_class().get_schema_operation_parameters(view)
+            if parameter['name'] == self.cursor_class.cursor_query_param
+        ]
+        mode_parameter = {
+            'name': self.mode_query_param,
+            'required': False,
+            'in': 'query',
+            'description': "Set to 'cursor' to use keyset pagination.",
+            'schema': {'type': 'string', 'enum': ['cursor']},
+        }
+        return super().get_schema_operation_parameters(view) + cursor_parameters + [mode_parameter]
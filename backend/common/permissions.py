@@ -1,5 +1,7 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from .access import get_request_project_ids, has_full_access
+
 
 class IsProjectManager(BasePermission):
     """
@@ -33,26 +35,24 @@ class IsProjectParticipant(BasePermission):
 
     Logic:
     1. Admins/Superusers have full access.
-    2. For Project instances: checks if user is manager or in members list.
-    3. For related objects (Task, Sprint, Report): checks the parent project's permissions.
+    2. For Project instances: checks if the project is in the user's accessible set.
+    3. For related objects (Task, Sprint, Report): checks the parent project id,
+       without loading the project itself.
     """
 
     def has_object_permission(self, request, view, obj):
-        if request.user.is_superuser or getattr(request.user, 'role', '') == 'ADMIN':
+        if has_full_access(request.user):
             return True
 
-        project = None
+        project_id = None
 
         if hasattr(obj, 'members') and hasattr(obj, 'manager'):
-            project = obj
+            project_id = obj.pk
 
-        elif hasattr(obj, 'project'):
-            project = obj.project
+        elif hasattr(obj, 'project_id'):
+            project_id = obj.project_id
 
-        if not project:
+        if not project_id:
             return False
 
-        is_manager = project.manager == request.user
-        is_member = project.members.filter(id=request.user.id).exists()
-
-        return is_manager or is_member
+        return project_id in get_request_project_ids(request)
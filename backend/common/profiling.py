@@ -0,0 +1,183 @@
+"""
+Sampling cProfile hooks for requests and Celery tasks.
+
+A PROFILING_SAMPLE_RATE share of requests (or any request sending the
+PROFILING_HEADER with PROFILING_TOKEN) and a PROFILING_TASK_SAMPLE_RATE share
+of Celery tasks are profiled. Each profile is written to PROFILING_DIR as a
+`.prof` file (open with pstats or snakeviz) and a `.collapsed` file of
+"frame;frame;frame microseconds" lines for flamegraph.pl or speedscope.
+The oldest profiles are pruned to respect PROFILING_MAX_FILES and PROFILING_MAX_BYTES.
+"""
+import cProfile
+import pstats
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from celery.signals import task_prerun, task_postrun
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+
+# Deepest call chain written to the collapsed output
+MAX_STACK_DEPTH = 128
+# Call paths carrying less than this share of the profiled time are dropped from the collapsed output
+MIN_COLLAPSED_SHARE = 1e-4
+
+_active = ContextVar('active_profile', default=None)
+_prune_lock = threading.Lock()
+
+
+def requested(request):
+    """
+    True if the request asks to be profiled with the privileged header.
+    """
+    token = settings.PROFILING_TOKEN
+    value = request.headers.get(settings.PROFILING_HEADER)
+    return bool(token and value) and constant_time_compare(value, token)
+
+
+def sampled(rate):
+    return rate > 0 and random.random() < rate
+
+
+def _frame_name(func):
+    filename, lineno, name = func
+    if filename == '~':
+        # Built-ins are reported as ('~', 0, '<built-in method ...>')
+        return name
+    base_dir = str(settings.BASE_DIR)
+    if filename.startswith(base_dir):
+        filename = filename[len(base_dir):].lstrip('/')
+    elif 'site-packages/' in filename:
+        filename = filename.split('site-packages/', 1)[1]
+    return f'{name} ({filename}:{lineno})'
+
+
+def collapsed_stacks(stats):
+    """
+    Folds pstats data into {"root;...;leaf": seconds}.
+
+    cProfile only records caller -> callee edges, not whole stacks, so time is
+    split across call paths in proportion to each edge's cumulative time and
+    recursive calls are folded into their outermost frame. Functions entered
+    only from outside the profile are the roots, so callers should enter the
+    profiled code through a frame that is not part of a recursive cycle.
+    The per-path split is an approximation.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+
+    roots = [(func, entry[3]) for func, entry in stats.stats.items() if not entry[4]]
+    min_time = sum(cumulative_time for _, cumulative_time in roots) * MIN_COLLAPSED_SHARE
+    stacks = {}
+
+    def walk(func, stack, amount):
+        _, _, own_time, cumulative_time, _ = stats.stats[func]
+        if cumulative_time <= 0:
+            return
+        ratio = min(amount / cumulative_time, 1.0)
+        key = ';'.join(stack)
+        stacks[key] = stacks.get(key, 0.0) + own_time * ratio
+
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        for callee in callees.get(func, ()):
+            edge_time = stats.stats[callee][4][func][3] * ratio
+            name = _frame_name(callee)
+            if edge_time >= min_time and name not in stack:
+                walk(callee, [*stack, name], edge_time)
+
+    for func, cumulative_time in roots:
+        walk(func, [_frame_name(func)], cumulative_time)
+
+    return stacks
+
+
+def _prune(directory):
+    """
+    Deletes the oldest profiles until PROFILING_MAX_FILES and PROFILING_MAX_BYTES hold.
+    """
+    with _prune_lock:
+        files = sorted(
+            (path for path in directory.iterdir() if path.suffix in ('.prof', '.collapsed')),
+            key=lambda path: path.stat().st_mtime
+        )
+        total = sum(path.stat().st_size for path in files)
+        while files and (len(files) > settings.PROFILING_MAX_FILES or total > settings.PROFILING_MAX_BYTES):
+            oldest = files.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
+
+
+class Profile:
+    """
+    One profiling run. `start()` returns False when another profile is already
+    running in this context (e.g. an eagerly executed task inside a profiled request).
+    """
+
+    def __init__(self, label):
+        self.label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_')[:100] or 'root'
+        self.profiler = cProfile.Profile()
+        self._token = None
+        self.name = None
+
+    def start(self):
+        if _active.get() is not None:
+            return False
+        try:
+            self.profiler.enable()
+        except ValueError:
+            # Python 3.12+ refuses a second profiler in the same thread
+            return False
+        self._token = _active.set(self)
+        return True
+
+    def stop(self):
+        """
+        Writes `<name>.prof` and `<name>.collapsed` and returns the name.
+        """
+        self.profiler.disable()
+        _active.reset(self._token)
+
+        directory = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.name = f'{time.strftime("%Y%m%dT%H%M%S")}_{time.time_ns() % 10**9:09d}_{self.label}'
+
+        self.profiler.dump_stats(directory / f'{self.name}.prof')
+        stats = pstats.Stats(self.profiler)
+        with open(directory / f'{self.name}.collapsed', 'w') as output:
+            for stack, seconds in sorted(collapsed_stacks(stats).items()):
+                microseconds = round(seconds * 1_000_000)
+                if microseconds:
+                    output.write(f'{stack} {microseconds}\n')
+
+        _prune(directory)
+        return self.name
+
+
+def _task_started(task=None, **kwargs):
+    if sampled(settings.PROFILING_TASK_SAMPLE_RATE):
+        profile = Profile(f'task_{task.name}')
+        if profile.start():
+            task.request.profile = profile
+
+
+def _task_finished(task=None, **kwargs):
+    profile = getattr(task.request, 'profile', None)
+    if profile is not None:
+        task.request.profile = None
+        profile.stop()
+
+
+def install():
+    """
+    Connects the Celery task hooks. Called from CommonConfig.ready() when
+    PROFILING_TASK_SAMPLE_RATE is set.
+    """
+    task_prerun.connect(_task_started, weak=False, dispatch_uid='profiling_task_started')
+    task_postrun.connect(_task_finished, weak=False, dispatch_uid='profiling_task_finished')
@@ -0,0 +1,156 @@
+"""
+Opt-in slow query log with application call-site attribution.
+
+Every query slower than SLOW_QUERY_THRESHOLD_MS is written as one JSON line to
+SLOW_QUERY_LOG_FILE (rotated by size) with its SQL, parameters, duration,
+fingerprint, the first stack frame inside the project and the request path or
+Celery task that issued it. `manage.py slow_query_report` ranks the entries.
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from celery.signals import task_prerun, task_postrun
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('sprintmaster.slow_queries')
+
+_context = ContextVar('slow_query_context', default=None)
+
+_FINGERPRINT_RULES = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(?+)'),
+    (re.compile(r'"s\w+_x\w+"'), '"savepoint"'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def fingerprint(sql):
+    """
+    Normalizes literals, placeholders, IN lists and savepoint names so the same
+    statement shape always hashes to the same value.
+    """
+    normalized = sql
+    for pattern, replacement in _FINGERPRINT_RULES:
+        normalized = pattern.sub(replacement, normalized)
+    normalized = normalized.strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+def set_context(value):
+    """
+    Labels the queries issued from now on in this thread/task (request path or task name).
+    """
+    return _context.set(value)
+
+
+def reset_context(token):
+    _context.reset(token)
+
+
+def _call_site():
+    """
+    Innermost stack frame that belongs to the project rather than Django or a library.
+    """
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(base_dir) and 'site-packages' not in frame.filename \
+                and not frame.filename.endswith('slow_queries.py'):
+            return f'{Path(frame.filename).relative_to(base_dir)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+def slow_query_logger(execute, sql, params, many, context):
+    """
+    connection.execute_wrapper that logs queries over SLOW_QUERY_THRESHOLD_MS.
+    """
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+            query_fingerprint, _ = fingerprint(sql)
+            logger.warning('slow query', extra={'slow_query': {
+                'fingerprint': query_fingerprint,
+                'duration_ms': round(duration_ms, 3),
+                'sql': sql,
+                'params': repr(params)[:settings.SLOW_QUERY_MAX_PARAMS_LENGTH],
+                'many': many,
+                'database': context['connection'].alias,
+                'call_site': _call_site(),
+                'context': _context.get(),
+            }})
+
+
+class JsonLineFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'), **getattr(record, 'slow_query', {})}
+        return json.dumps(entry, default=str)
+
+
+@contextmanager
+def logging_queries():
+    """
+    Attaches the logger to every database connection for the enclosed block.
+
+    Wrappers are entered and exited in LIFO order together with other scoped
+    wrappers (e.g. MetricsMiddleware's), since execute_wrapper() removes the
+    last wrapper on exit.
+    """
+    with ExitStack() as stack:
+        for connection in connections.all():
+            # Eager tasks run inside a request that already logs
+            if slow_query_logger not in connection.execute_wrappers:
+                stack.enter_context(connection.execute_wrapper(slow_query_logger))
+        yield
+
+
+def _task_started(task=None, **kwargs):
+    task.request.slow_query_context_token = set_context(f'task:{task.name}')
+    stack = task.request.slow_query_wrappers = ExitStack()
+    stack.enter_context(logging_queries())
+
+
+def _task_finished(task=None, **kwargs):
+    stack = getattr(task.request, 'slow_query_wrappers', None)
+    if stack is not None:
+        task.request.slow_query_wrappers = None
+        stack.close()
+
+    token = getattr(task.request, 'slow_query_context_token', None)
+    if token is not None:
+        task.request.slow_query_context_token = None
+        reset_context(token)
+
+
+def install():
+    """
+    Sets up the log file and attaches the logger to every Celery task.
+    Called from CommonConfig.ready() when SLOW_QUERY_LOG_ENABLED is set;
+    requests are covered by common.middleware.SlowQueryContextMiddleware.
+    """
+    if not logger.handlers:
+        path = Path(settings.SLOW_QUERY_LOG_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            path, maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES, backupCount=settings.SLOW_QUERY_LOG_BACKUP_COUNT,
+            delay=True
+        )
+        handler.setFormatter(JsonLineFormatter())
+        logger.addHandler(handler)
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
+
+    task_prerun.connect(_task_started, weak=False, dispatch_uid='slow_query_task_started')
+    task_postrun.connect(_task_finished, weak=False, dispatch_uid='slow_query_task_finished')
@@ -0,0 +1,22 @@
+"""
+Fixtures shared by the test modules of several apps.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from sprints.models import Sprint
+
+
+def create_sprint(project, days, **fields):
+    """
+    Creates a sprint of `days` days that ends today.
+    """
+    today = timezone.now().date()
+    return Sprint.objects.create(
+        name=f'Sprint {days}d',
+        project=project,
+        start_date=today - timedelta(days=days - 1),
+        end_date=today,
+        **fields
+    )
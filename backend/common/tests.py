@@ -0,0 +1,708 @@
+import asyncio
+import json
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from projects.models import Project
+from reports.models import ProjectReport
+from reports.stats import update_tasks
+from reports.tasks import generate_report_task
+from sprints.models import Sprint
+from tasks.models import BugReport, Task
+from users.models import User
+from users.serializers import CustomTokenObtainPairSerializer
+
+from . import db_router
+from .access import get_accessible_project_ids
+from .benchmarks import ENDPOINTS, percentile, router_actions, run_benchmarks, uncovered_actions
+from .slow_queries import fingerprint, reset_context, set_context, slow_query_logger
+
+
+class ApiBenchmarkTests(TestCase):
+    """
+    Runs the API benchmark suite at small sizes to enforce the per-endpoint query budgets.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_every_routed_endpoint_is_benchmarked_or_excluded(self):
+        self.assertIn('task-export', router_actions())
+        self.assertEqual(uncovered_actions(), [])
+
+    def test_query_budgets_hold_at_every_size(self):
+        results, violations = run_benchmarks(sizes=[5, 60], iterations=2)
+
+        self.assertEqual(violations, [])
+        self.assertEqual(
+            {name: row['queries'] for name, row in results['5'].items()},
+            {name: row['queries'] for name, row in results['60'].items()}
+        )
+
+    def test_stateless_authentication_saves_the_user_query(self):
+        endpoints = [endpoint for endpoint in ENDPOINTS if endpoint.name in ('task-detail', 'project-list')]
+        stateless, _ = run_benchmarks(sizes=[5], iterations=1, endpoints=endpoints)
+        with override_settings(JWT_STATELESS_AUTH=False):
+            database, _ = run_benchmarks(sizes=[5], iterations=1, endpoints=endpoints)
+
+        for endpoint in endpoints:
+            self.assertEqual(database['5'][endpoint.name]['queries'], stateless['5'][endpoint.name]['queries'] + 1)
+
+    def test_percentile_uses_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual((percentile(values, 50), percentile(values, 95), percentile(values, 99)), (50, 95, 99))
+        self.assertEqual(percentile([3.0], 99), 3.0)
+
+
+class FillDbGuardTests(TestCase):
+    """
+    Tests that fill_db only truncates project data (and generated accounts) when allowed and confirmed.
+    """
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        Project.objects.create(name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager)
+
+    def _fill_db(self, **options):
+        call_command('fill_db', users=1, projects=1, tasks_per_project=1, sprints=1, stdout=StringIO(), **options)
+
+    def test_debug_off_requires_force(self):
+        with self.assertRaisesMessage(CommandError, '--force'):
+            self._fill_db(interactive=False)
+        with self.assertRaisesMessage(CommandError, '--force'):
+            call_command('benchmark_api', '--noinput', stdout=StringIO())
+
+        self.assertTrue(Project.objects.filter(name='Alpha').exists())
+
+    def test_only_generated_accounts_are_deleted(self):
+        real = User.objects.create_user(username='user_admin', password='password123', email='admin@example.com')
+        self._fill_db(interactive=False, force=True)
+        self._fill_db(interactive=False, force=True)
+
+        self.assertTrue(User.objects.filter(id=real.id).exists())
+        self.assertEqual(User.objects.filter(email__endswith='@fill-db.invalid').count(), 1)
+
+        User.objects.create_user(username='user_dev_0', password='password123', email='dev@example.com')
+        with self.assertRaisesMessage(CommandError, 'user_dev_0'):
+            self._fill_db(interactive=False, force=True)
+
+    def test_generated_timestamps_are_kept(self):
+        call_command(
+            'fill_db', users=3, projects=1, tasks_per_project=20, sprints=3, bug_ratio=1,
+            interactive=False, force=True, stdout=StringIO()
+        )
+
+        today = timezone.now().date()
+        self.assertTrue(Task.objects.filter(created_at__date__lt=today).exists())
+        self.assertFalse(Task.objects.filter(updated_at__lt=F('created_at')).exists())
+        self.assertTrue(Task._meta.get_field('created_at').auto_now_add)
+        self.assertTrue(BugReport._meta.get_field('updated_at').auto_now)
+
+    @override_settings(DEBUG=True)
+    def test_truncation_must_be_confirmed(self):
+        with patch('builtins.input', return_value='no'), self.assertRaisesMessage(CommandError, 'Cancelled'):
+            self._fill_db()
+        self.assertTrue(Project.objects.filter(name='Alpha').exists())
+
+        with patch('builtins.input', return_value='yes'):
+            self._fill_db()
+        self.assertFalse(Project.objects.filter(name='Alpha').exists())
+
+
+@override_settings(METRICS_TOKEN='secret')
+class MetricsEndpointTests(TestCase):
+    """
+    Tests for the request metrics middleware and the Prometheus endpoint.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='pm', password='password123', role='PM')
+        Project.objects.create(name='Alpha', description='...', start_date=timezone.now().date(), manager=self.user)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _samples(self):
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if line and not line.startswith('#'):
+                name, value = line.rsplit(' ', 1)
+                samples[name] = float(value)
+        return samples
+
+    def test_requests_are_recorded_per_view(self):
+        before = self._samples()
+        self.client.get('/api/projects/')
+        self.client.get('/api/projects/')
+        after = self._samples()
+
+        def delta(name):
+            return after.get(name, 0) - before.get(name, 0)
+
+        self.assertEqual(delta('sprintmaster_http_requests_total{view="project-list",method="GET",status="200"}'), 2)
+        self.assertEqual(delta('sprintmaster_http_request_duration_seconds_count{view="project-list",method="GET"}'), 2)
+        self.assertGreater(delta('sprintmaster_http_request_db_queries_sum{view="project-list"}'), 0)
+        self.assertGreater(delta('sprintmaster_http_response_size_bytes_sum{view="project-list"}'), 0)
+        self.assertEqual(
+            delta('sprintmaster_cache_lookups_total{view="project-list",cache="project_access",result="miss"}'), 1
+        )
+        self.assertEqual(
+            delta('sprintmaster_cache_lookups_total{view="project-list",cache="project_access",result="hit"}'), 1
+        )
+
+    def test_token_protects_the_endpoint(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_endpoint_without_token_is_served_in_debug_only(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 404)
+
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get('/api/metrics/').status_code, 200)
+
+
+class SlowQueryLogTests(TestCase):
+    def test_fingerprint_ignores_literals_and_in_list_length(self):
+        short, _ = fingerprint('SELECT * FROM tasks_task WHERE id IN (1, 2) AND title = \'a\'')
+        long, normalized = fingerprint('SELECT * FROM tasks_task WHERE id IN (%s, %s, %s) AND title = %s')
+
+        self.assertEqual(short, long)
+        self.assertEqual(normalized, 'SELECT * FROM tasks_task WHERE id IN (?+) AND title = ?')
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_queries_are_logged_with_call_site_and_context(self):
+        token = set_context('GET /api/tasks/')
+        try:
+            with self.assertLogs('sprintmaster.slow_queries', 'WARNING') as logs, \
+                    connection.execute_wrapper(slow_query_logger):
+                User.objects.filter(username='nobody').exists()
+        finally:
+            reset_context(token)
+
+        entry = logs.records[0].slow_query
+        self.assertIn('users_user', entry['sql'])
+        self.assertEqual(entry['context'], 'GET /api/tasks/')
+        self.assertTrue(entry['call_site'].startswith('common/tests.py:'))
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=10_000)
+    def test_fast_queries_are_not_logged(self):
+        with self.assertNoLogs('sprintmaster.slow_queries'), connection.execute_wrapper(slow_query_logger):
+            User.objects.exists()
+
+    @override_settings(SLOW_QUERY_LOG_ENABLED=True, SLOW_QUERY_THRESHOLD_MS=0)
+    def test_requests_on_a_fresh_connection_log_and_restore_the_wrappers(self):
+        user = User.objects.create_user(username='pm', password='password123', role='PM')
+        result = {}
+
+        def request():
+            # A new thread opens its own connection inside the request
+            try:
+                client = APIClient()
+                client.force_authenticate(user)
+                with self.assertLogs('sprintmaster.slow_queries', 'WARNING') as logs:
+                    result['status'] = client.get('/api/projects/').status_code
+                result['logged'] = len(logs.records)
+                result['wrappers'] = list(connections['default'].execute_wrappers)
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=request)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(result['status'], 200)
+        self.assertGreater(result['logged'], 0)
+        self.assertEqual(result['wrappers'], [])
+
+    def test_report_ranks_fingerprints_across_rotated_files(self):
+        def entry(sql, duration_ms, call_site):
+            return json.dumps({'sql': sql, 'duration_ms': duration_ms, 'call_site': call_site, 'context': 'GET /'})
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'slow.jsonl'
+            path.write_text('\n'.join([
+                entry('SELECT * FROM tasks_task WHERE id = 1', 300, 'tasks/views.py:10 in list'),
+                entry('SELECT * FROM tasks_task WHERE id = 2', 400, 'tasks/views.py:10 in list'),
+                'not json',
+            ]) + '\n')
+            Path(f'{path}.1').write_text(entry('SELECT COUNT(*) FROM reports_projectstats', 500, None) + '\n')
+
+            out = StringIO()
+            call_command('slow_query_report', file=str(path), order='total', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('2 queries, total 700 ms', output)
+        self.assertLess(output.index('tasks_task'), output.index('reports_projectstats'))
+        self.assertIn('call site: tasks/views.py:10 in list (2)', output)
+        self.assertIn('2 fingerprint(s)', output)
+
+
+@override_settings(PROFILING_TOKEN='secret', PROFILING_SAMPLE_RATE=0)
+class ProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.user = User.objects.create_user(username='pm', password='password123', role='PM')
+        Project.objects.create(name='Alpha', description='...', start_date=timezone.now().date(), manager=self.user)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_privileged_header_writes_profile_and_collapsed_stacks(self):
+        with self.settings(PROFILING_DIR=self.directory.name):
+            response = self.client.get('/api/projects/', HTTP_X_PROFILE='secret')
+
+        self.assertEqual(response.status_code, 200)
+        name = response['X-Profile-Id']
+        self.assertTrue(name.endswith('GET_api_projects'))
+
+        directory = Path(self.directory.name)
+        self.assertTrue((directory / f'{name}.prof').stat().st_size > 0)
+        stacks = (directory / f'{name}.collapsed').read_text().splitlines()
+        self.assertTrue(any('(projects/views.py:' in line for line in stacks))
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in stacks))
+
+    def test_unsampled_requests_are_not_profiled(self):
+        with self.settings(PROFILING_DIR=self.directory.name):
+            response = self.client.get('/api/projects/', HTTP_X_PROFILE='wrong')
+
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(list(Path(self.directory.name).iterdir()), [])
+
+    def test_oldest_profiles_are_pruned(self):
+        with self.settings(PROFILING_DIR=self.directory.name, PROFILING_SAMPLE_RATE=1, PROFILING_MAX_FILES=2):
+            self.client.get('/api/projects/')
+            last = self.client.get('/api/projects/')['X-Profile-Id']
+
+        self.assertEqual(
+            sorted(path.name for path in Path(self.directory.name).iterdir()),
+            [f'{last}.collapsed', f'{last}.prof']
+        )
+
+    def test_sampled_tasks_are_profiled(self):
+        from reports.tasks import generate_report_task
+        from reports.models import ProjectReport
+
+        from .profiling import install
+        install()
+
+        report = ProjectReport.objects.create(project=Project.objects.get(), generated_by=self.user)
+        with self.settings(PROFILING_DIR=self.directory.name, PROFILING_TASK_SAMPLE_RATE=1):
+            generate_report_task.delay(report.id)
+
+        names = [path.name for path in Path(self.directory.name).iterdir()]
+        self.assertEqual(len(names), 2)
+        self.assertTrue(all('task_reports.tasks.generate_report_task' in name for name in names))
+
+
+class ProjectEventsTests(TestCase):
+    """
+    Tests for the per-project Server-Sent Events stream.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='dev', password='password123', role='DEV')
+        manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=manager
+        )
+        self.project.members.add(self.user)
+        self.other_project = Project.objects.create(
+            name='Beta', description='...', start_date=timezone.now().date(), manager=manager
+        )
+        self.task = Task.objects.create(title='A', description='...', project=self.project)
+        self.token = str(CustomTokenObtainPairSerializer.get_token(self.user).access_token)
+
+    def _ticket(self, project):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        return client.post(f'/api/projects/{project.id}/events/ticket/')
+
+    def test_stream_requires_access(self):
+        response = self.client.get(f'/api/projects/{self.project.id}/events/')
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.get(
+            f'/api/projects/{self.other_project.id}/events/', headers={'Authorization': f'Bearer {self.token}'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(
+            f'/api/projects/{self.project.id}/events/', headers={'Authorization': 'Bearer invalid'}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_tickets_are_single_use_and_bound_to_the_project(self):
+        self.assertEqual(self._ticket(self.other_project).status_code, 404)
+
+        response = self._ticket(self.project)
+        self.assertEqual(response.status_code, 201)
+        ticket = response.json()['ticket']
+        self.assertNotIn(self.token, ticket)
+
+        response = self.client.get(f'/api/projects/{self.other_project.id}/events/', {'ticket': ticket})
+        self.assertEqual(response.status_code, 401)
+        # Consumed by the rejected request
+        response = self.client.get(f'/api/projects/{self.project.id}/events/', {'ticket': ticket})
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.get(f'/api/projects/{self.project.id}/events/', {'ticket': 'unknown'})
+        self.assertEqual(response.status_code, 401)
+
+    def _move_task(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.status = 'IN_PROGRESS'
+            self.task.save()
+            # Not delivered: another project's channel
+            Sprint.objects.create(
+                name='S', project=self.other_project, start_date=timezone.now().date(),
+                end_date=timezone.now().date()
+            )
+            update_tasks(Task.objects.filter(id=self.task.id), status='REVIEW')
+
+    @override_settings(EVENTS_HEARTBEAT_SECONDS=30)
+    async def test_changes_are_pushed_to_subscribers(self):
+        response = await self.async_client.get(
+            f'/api/projects/{self.project.id}/events/', headers={'Authorization': f'Bearer {self.token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+
+        await sync_to_async(self._move_task)()
+
+        event, data = (await asyncio.wait_for(anext(stream), 5)).decode().split('\n')[:2]
+        self.assertEqual(event, 'event: task.updated')
+        self.assertEqual(
+            json.loads(data.removeprefix('data: ')),
+            {'event': 'task.updated', 'project': self.project.id, 'id': self.task.id, 'sprint': None}
+        )
+        self.assertTrue((await asyncio.wait_for(anext(stream), 5)).startswith(b'event: tasks.changed\n'))
+
+    @override_settings(EVENTS_HEARTBEAT_SECONDS=0.01)
+    async def test_idle_stream_sends_keepalives(self):
+        ticket = (await sync_to_async(self._ticket)(self.project)).json()['ticket']
+        response = await self.async_client.get(f'/api/projects/{self.project.id}/events/', {'ticket': ticket})
+        self.assertEqual(response.status_code, 200)
+        stream = aiter(response.streaming_content)
+
+        await anext(stream)
+        self.assertEqual(await asyncio.wait_for(anext(stream), 5), b': keepalive\n\n')
+
+    async def _assert_stream_closes(self, revoke):
+        response = await self.async_client.get(
+            f'/api/projects/{self.project.id}/events/', headers={'Authorization': f'Bearer {self.token}'}
+        )
+        stream = aiter(response.streaming_content)
+        await anext(stream)
+        self.assertEqual(await asyncio.wait_for(anext(stream), 5), b': keepalive\n\n')
+
+        await sync_to_async(revoke)()
+
+        with self.assertRaises(StopAsyncIteration):
+            await asyncio.wait_for(anext(stream), 5)
+
+    @override_settings(EVENTS_HEARTBEAT_SECONDS=0.01)
+    async def test_stream_closes_when_membership_is_removed(self):
+        await self._assert_stream_closes(lambda: self.project.members.remove(self.user))
+
+    @override_settings(EVENTS_HEARTBEAT_SECONDS=0.01)
+    async def test_stream_closes_when_the_token_is_revoked(self):
+        def revoke():
+            self.user.role = 'QA'
+            self.user.save()
+
+        await self._assert_stream_closes(revoke)
+
+    @override_settings(EVENTS_HEARTBEAT_SECONDS=0.01)
+    async def test_stream_closes_when_the_token_expires(self):
+        expired = timezone.now() + timedelta(days=1)
+        await self._assert_stream_closes(
+            lambda: self.enterContext(patch('rest_framework_simplejwt.tokens.aware_utcnow', return_value=expired))
+        )
+
+
+class ConditionalGetTests(TestCase):
+    """
+    Tests for the ETag validators of the list and detail endpoints.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.dev = User.objects.create_user(username='dev', password='password123', role='DEV')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.other_project = Project.objects.create(
+            name='Beta', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.task = Task.objects.create(title='A', description='...', project=self.project, assignee=self.manager)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager)
+
+    def _etag(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        return response['ETag']
+
+    def _assert_not_modified(self, path, etag):
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_unchanged_resources_are_not_modified_without_queries(self):
+        for path in ['/api/tasks/', f'/api/tasks/{self.task.id}/', '/api/bugs/', '/api/sprints/', '/api/projects/']:
+            etag = self._etag(path)
+            with self.assertNumQueries(0):
+                self._assert_not_modified(path, etag)
+
+    def test_writes_change_the_etag(self):
+        path = f'/api/tasks/?project={self.project.id}'
+        etag = self._etag(path)
+
+        self.task.status = 'DONE'
+        self.task.save()
+        changed = self._etag(path)
+        self.assertNotEqual(changed, etag)
+
+        # Logins do not touch rendered user data, renames do
+        self.manager.save(update_fields=['last_login'])
+        self._assert_not_modified(path, changed)
+        self.manager.first_name = 'Renamed'
+        self.manager.save()
+        self.assertNotEqual(self._etag(path), changed)
+
+        self.assertNotEqual(self._etag(f'/api/tasks/?project={self.other_project.id}'), self._etag(path))
+
+    def test_etag_follows_user_scope(self):
+        self.client.force_authenticate(self.dev)
+        etag = self._etag('/api/projects/')
+        self.assertEqual(self.client.get('/api/projects/').data['count'], 0)
+
+        self.project.members.add(self.dev)
+
+        response = self.client.get('/api/projects/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+
+        self.client.force_authenticate(self.manager)
+        self.assertNotEqual(self._etag('/api/projects/'), response['ETag'])
+
+
+class ResponseCacheTests(TestCase):
+    """
+    Tests for the per-user, per-project-version response cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.dev = User.objects.create_user(username='dev', password='password123', role='DEV')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.project.members.add(self.dev)
+        self.other_project = Project.objects.create(
+            name='Beta', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.sprint = Sprint.objects.create(
+            name='S1', project=self.project, start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timezone.timedelta(days=14)
+        )
+        self.task = Task.objects.create(title='A', description='...', project=self.project, assignee=self.manager)
+        Task.objects.create(title='B', description='...', project=self.other_project, assignee=self.manager)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager)
+
+    def test_repeated_requests_are_served_from_the_cache(self):
+        for path in ['/api/tasks/', f'/api/tasks/{self.task.id}/', '/api/bugs/', '/api/sprints/', '/api/projects/']:
+            first = self.client.get(path)
+            self.assertEqual(first.status_code, 200)
+            with self.assertNumQueries(0):
+                second = self.client.get(path)
+            self.assertEqual(second.status_code, 200)
+            self.assertEqual(second.json(), first.json())
+            self.assertEqual(second['ETag'], first['ETag'])
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_lookups_are_counted(self):
+        def sample(result):
+            name = f'sprintmaster_cache_lookups_total{{view="task-list",cache="response",result="{result}"}}'
+            response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+            for line in response.content.decode().splitlines():
+                if line.startswith(name + ' '):
+                    return float(line.rsplit(' ', 1)[1])
+            return 0
+
+        hits, misses = sample('hit'), sample('miss')
+        self.client.get('/api/tasks/')
+        self.client.get('/api/tasks/')
+        self.assertEqual(sample('miss') - misses, 1)
+        self.assertEqual(sample('hit') - hits, 1)
+
+    def test_writes_invalidate_only_the_affected_project(self):
+        path = f'/api/tasks/?project={self.project.id}'
+        other_path = f'/api/tasks/?project={self.other_project.id}'
+        self.client.get(path)
+        self.client.get(other_path)
+
+        self.task.status = 'DONE'
+        self.task.save()
+        self.assertEqual(self.client.get(path).data['results'][0]['status'], 'DONE')
+        with self.assertNumQueries(0):
+            self.client.get(other_path)
+
+        # Bulk paths bypass model signals but bump the version as well
+        update_tasks(Task.objects.filter(id=self.task.id), sprint_id=self.sprint.id)
+        self.assertEqual(self.client.get(path).data['results'][0]['sprint'], self.sprint.id)
+
+    def test_data_read_before_commit_is_not_served_after_it(self):
+        path = f'/api/tasks/{self.task.id}/'
+        self.client.get(path)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.title = 'Renamed'
+            self.task.save()
+            # A concurrent reader caches the in-flight state under the bumped version
+            self.client.get(path)
+
+        self.assertEqual(self.client.get(path).data['title'], 'Renamed')
+        with self.assertNumQueries(0):
+            self.client.get(path)
+
+    def test_entries_are_per_user_scope(self):
+        self.assertEqual(self.client.get('/api/tasks/').data['count'], 2)
+
+        self.client.force_authenticate(self.dev)
+        self.assertEqual(self.client.get('/api/tasks/').data['count'], 1)
+
+        self.client.force_authenticate(self.manager)
+        self.assertEqual(self.client.get('/api/tasks/').data['count'], 2)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_cache_can_be_disabled(self):
+        self.client.get('/api/tasks/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/tasks/')
+        self.assertGreater(len(queries), 0)
+
+
+@override_settings(REPLICA_DATABASE='replica')
+class ReplicaRoutingTests(TestCase):
+    """
+    Tests for the read-replica router, with a second SQLite database standing
+    in for the replica. Nothing is replicated, so reads routed to it find no rows.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.task = Task.objects.create(title='A', description='...', project=self.project)
+        get_accessible_project_ids(self.manager)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager)
+
+    def _queries(self):
+        return CaptureQueriesContext(connections['default']), CaptureQueriesContext(connections['replica'])
+
+    def test_safe_requests_read_from_the_replica(self):
+        primary, replica = self._queries()
+        with primary, replica:
+            response = self.client.get('/api/tasks/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(len(primary), 0)
+        self.assertGreater(len(replica), 0)
+
+        primary, replica = self._queries()
+        with primary, replica:
+            response = self.client.get('/api/tasks/export/')
+            b''.join(response.streaming_content)
+        self.assertEqual(len(primary), 0)
+        self.assertGreater(len(replica), 0)
+
+    def test_writes_use_the_primary(self):
+        primary, replica = self._queries()
+        with primary, replica:
+            response = self.client.patch(f'/api/tasks/{self.task.id}/', {'priority': 'HIGH'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['priority'], 'HIGH')
+        self.assertEqual(len(replica), 0)
+
+    def test_context_sticks_to_the_primary_after_a_write(self):
+        with db_router.routing(True):
+            self.assertEqual(Task.objects.count(), 0)
+            with db_router.primary():
+                self.assertEqual(Task.objects.count(), 1)
+            self.assertEqual(Task.objects.count(), 0)
+
+            Task.objects.create(title='B', description='...', project=self.project)
+            self.assertEqual(Task.objects.count(), 2)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_recently_written_projects_are_read_from_the_primary(self):
+        path = '/api/tasks/'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.title = 'Renamed'
+            self.task.save()
+
+        response = self.client.get(path)
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed')
+
+        # Once the lag window is over, reads move back to the replica
+        cache.delete(db_router.WRITTEN_CACHE_KEY.format(self.project.id))
+        cache.delete(db_router.WRITTEN_CACHE_KEY.format(db_router.USERS_WRITTEN))
+        self.assertEqual(self.client.get(path).data['count'], 0)
+
+    def test_report_generation_reads_from_the_replica(self):
+        report = ProjectReport.objects.create(project=self.project, generated_by=self.manager)
+
+        primary, replica = self._queries()
+        with primary, replica:
+            generate_report_task.apply(args=[report.id])
+        self.assertGreater(len(replica), 0)
+
+        report.refresh_from_db()
+        self.assertTrue(report.is_ready)
+        self.assertEqual(report.data['project_name'], 'Alpha')
+
+        # A recently written project is read from the primary
+        db_router.mark_written(self.project.id)
+        report = ProjectReport.objects.create(project=self.project, generated_by=self.manager)
+        primary, replica = self._queries()
+        with primary, replica:
+            generate_report_task.apply(args=[report.id])
+        self.assertEqual(len(replica), 0)
@@ -0,0 +1,134 @@
+import hmac
+import json
+import secrets
+from contextlib import aclosing
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound, JsonResponse, StreamingHttpResponse
+from rest_framework.decorators import api_view
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
+
+from projects.models import Project
+from users.authentication import StatelessJWTAuthentication
+from .access import get_accessible_project_ids, has_full_access
+from .events import channel_name, get_backend
+from .metrics import render_metrics
+
+STREAM_TICKET_CACHE_KEY = 'events_ticket:{}'
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint.
+    Requests must send `Authorization: Bearer <METRICS_TOKEN>`; without a
+    token the endpoint is only served when DEBUG is on.
+    """
+    if settings.METRICS_TOKEN:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseNotFound()
+
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _can_access_project(user, project_id):
+    if has_full_access(user):
+        return Project.objects.filter(id=project_id).exists()
+    return project_id in get_accessible_project_ids(user)
+
+
+@api_view(['POST'])
+def project_events_ticket(request, project_id):
+    """
+    Issues a ticket for one project_events connection.
+
+    Browsers' EventSource cannot send headers, and an access token in the URL
+    would end up in access logs and proxies; the ticket in the `ticket` query
+    parameter replaces it. It expires after EVENTS_TICKET_TIMEOUT seconds and
+    is consumed by the first stream that presents it.
+    """
+    if request.auth is None or not _can_access_project(request.user, project_id):
+        return Response({'detail': "Not found."}, status=404)
+
+    ticket = secrets.token_urlsafe(32)
+    grant = {'project': project_id, 'token': str(request.auth)}
+    cache.set(STREAM_TICKET_CACHE_KEY.format(ticket), grant, settings.EVENTS_TICKET_TIMEOUT)
+    return Response({'ticket': ticket}, status=201)
+
+
+def _stream_token(request, project_id):
+    """
+    Raw access token of a stream request, taken from its ticket or the
+    Authorization header, or None.
+    """
+    if 'ticket' in request.GET:
+        key = STREAM_TICKET_CACHE_KEY.format(request.GET['ticket'])
+        grant = cache.get(key)
+        # delete() succeeds for one of concurrent requests presenting the same ticket
+        if grant is None or not cache.delete(key) or grant['project'] != project_id:
+            return None
+        return grant['token']
+
+    authentication = StatelessJWTAuthentication()
+    header = authentication.get_header(request)
+    return authentication.get_raw_token(header) if header is not None else None
+
+
+def _authorize_stream(raw_token, project_id):
+    """
+    Returns the error response for a stream of the token's user, or None if it may proceed.
+    Checked on connect and again on every message, so streams end once the
+    token expires or is revoked, or the user loses access to the project.
+    """
+    if raw_token is None:
+        return JsonResponse({'detail': "Authentication credentials were not provided."}, status=401)
+
+    authentication = StatelessJWTAuthentication()
+    try:
+        user = authentication.get_user(authentication.get_validated_token(raw_token))
+    except AuthenticationFailed as exc:
+        return JsonResponse({'detail': str(exc.detail)}, status=401)
+
+    if not _can_access_project(user, project_id):
+        return JsonResponse({'detail': "Not found."}, status=404)
+
+    return None
+
+
+async def _event_stream(raw_token, project_id):
+    subscribed = False
+    subscription = get_backend().subscribe(channel_name(project_id), settings.EVENTS_HEARTBEAT_SECONDS)
+    async with aclosing(subscription) as messages:
+        async for message in messages:
+            if subscribed and await sync_to_async(_authorize_stream)(raw_token, project_id) is not None:
+                # Reconnects need a new ticket or token, and are refused the same way
+                return
+            if message is None:
+                # The first None confirms the subscription, later ones keep proxies
+                # from closing an idle connection
+                yield ': keepalive\n\n' if subscribed else f'retry: {settings.EVENTS_RETRY_MS}\n\n'
+                subscribed = True
+            else:
+                yield f'event: {json.loads(message)["event"]}\ndata: {message}\n\n'
+
+
+async def project_events(request, project_id):
+    """
+    Server-Sent Events stream of the changes in one project (see common.events).
+    Must be served over ASGI; each event names what to refetch. Authenticated by
+    a project_events_ticket or the Authorization header.
+    """
+    raw_token = await sync_to_async(_stream_token)(request, project_id)
+    error = await sync_to_async(_authorize_stream)(raw_token, project_id)
+    if error is not None:
+        return error
+
+    response = StreamingHttpResponse(_event_stream(raw_token, project_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
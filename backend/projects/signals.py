@@ -0,0 +1,71 @@
+from django.db.models.signals import m2m_changed, pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from common.access import invalidate_accessible_project_ids
+from reports.versions import bump_data_version
+from .models import Project
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def invalidate_members_access(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Drops cached access scopes of users added to or removed from a project
+    and bumps the data version of the projects whose member list changed.
+    """
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_member_ids = [instance.pk]
+            instance._cleared_project_ids = list(instance.projects.values_list('id', flat=True))
+        else:
+            instance._cleared_member_ids = list(instance.members.values_list('id', flat=True))
+            instance._cleared_project_ids = [instance.pk]
+
+    elif action == 'post_clear':
+        invalidate_accessible_project_ids(*getattr(instance, '_cleared_member_ids', []))
+        bump_data_version(*getattr(instance, '_cleared_project_ids', []))
+
+    elif action in ('post_add', 'post_remove'):
+        if reverse:
+            invalidate_accessible_project_ids(instance.pk)
+            bump_data_version(*pk_set)
+        else:
+            invalidate_accessible_project_ids(*pk_set)
+            bump_data_version(instance.pk)
+
+
+@receiver(pre_save, sender=Project)
+def remember_previous_manager(sender, instance, **kwargs):
+    """
+    Stores the manager the project had before this save.
+    """
+    if instance.pk:
+        instance._previous_manager_id = (
+            Project.objects.filter(pk=instance.pk).values_list('manager_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Project)
+def invalidate_manager_access(sender, instance, created, **kwargs):
+    """
+    Drops cached access scopes of the old and the new project manager.
+    """
+    previous_manager_id = getattr(instance, '_previous_manager_id', None)
+
+    if created or previous_manager_id != instance.manager_id:
+        invalidate_accessible_project_ids(instance.manager_id, previous_manager_id)
+
+
+@receiver(pre_delete, sender=Project)
+def remember_project_participants(sender, instance, **kwargs):
+    """
+    Stores everyone with access before the membership rows are cascaded away.
+    """
+    instance._participant_ids = [instance.manager_id, *instance.members.values_list('id', flat=True)]
+
+
+@receiver(post_delete, sender=Project)
+def invalidate_participants_access(sender, instance, **kwargs):
+    """
+    Drops cached access scopes of everyone who had access to a deleted project.
+    """
+    invalidate_accessible_project_ids(*getattr(instance, '_participant_ids', []))
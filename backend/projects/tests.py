@@ -1,3 +1,125 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from common.access import ACCESS_CACHE_KEY, get_accessible_project_ids
+from tasks.models import Task
+from users.models import User
+
+from .models import Project
+
+
+class ProjectListQueryTests(TestCase):
+    """
+    Tests that the project list endpoint does not issue per-row queries.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.members = [
+            User.objects.create_user(username=f'dev_{i}', password='password123', role='DEV')
+            for i in range(3)
+        ]
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager)
+
+    def _create_projects(self, count):
+        for i in range(count):
+            project = Project.objects.create(
+                name=f'Project {i}',
+                description='...',
+                start_date=timezone.now().date(),
+                manager=self.manager
+            )
+            project.members.set(self.members)
+
+    def _count_queries(self):
+        # Warm up the cached access scope so only the list queries are counted
+        self.client.get('/api/projects/?page_size=100')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/projects/?page_size=100')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx), response
+
+    def test_project_list_query_count_is_constant(self):
+        self._create_projects(2)
+        small_page, _ = self._count_queries()
+
+        self._create_projects(20)
+        full_page, response = self._count_queries()
+
+        self.assertEqual(small_page, full_page)
+
+        project = response.data['results'][0]
+        self.assertEqual(project['manager_details']['username'], 'pm')
+        self.assertEqual(sorted(project['members']), sorted(user.id for user in self.members))
+        self.assertEqual(len(project['members_details']), 3)
+
+
+class ProjectAccessCacheTests(TestCase):
+    """
+    Tests for the cached per-user project access scope.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.dev = User.objects.create_user(username='dev', password='password123', role='DEV')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.task = Task.objects.create(title='Task', description='...', project=self.project)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.dev)
+
+    def test_detail_view_does_not_query_membership_when_cached(self):
+        self.project.members.add(self.dev)
+        self.assertEqual(self.client.get(f'/api/tasks/{self.task.id}/').status_code, 200)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/tasks/{self.task.id}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('projects_project' in query['sql'] for query in ctx))
+
+    def test_membership_changes_invalidate_cache(self):
+        self.assertEqual(self.client.get(f'/api/projects/{self.project.id}/').status_code, 404)
+
+        self.project.members.add(self.dev)
+        self.assertEqual(self.client.get(f'/api/projects/{self.project.id}/').status_code, 200)
+
+        self.dev.projects.remove(self.project)
+        self.assertEqual(self.client.get(f'/api/projects/{self.project.id}/').status_code, 404)
+
+        self.project.members.add(self.dev)
+        self.project.members.clear()
+        self.assertEqual(self.client.get(f'/api/projects/{self.project.id}/').status_code, 404)
+
+    def test_scope_cached_before_commit_is_dropped_on_commit(self):
+        self.project.members.add(self.dev)
+        self.assertEqual(get_accessible_project_ids(self.dev), {self.project.id})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.members.remove(self.dev)
+            # A concurrent request still sees the committed membership
+            cache.set(ACCESS_CACHE_KEY.format(self.dev.id), {self.project.id})
+
+        self.assertIsNone(cache.get(ACCESS_CACHE_KEY.format(self.dev.id)))
+        self.assertEqual(get_accessible_project_ids(self.dev), set())
+
+    def test_manager_change_invalidates_cache(self):
+        self.assertEqual(self.client.get(f'/api/tasks/{self.task.id}/').status_code, 404)
+
+        self.project.manager = self.dev
+        self.project.save()
+        self.assertEqual(self.client.get(f'/api/tasks/{self.task.id}/').status_code, 200)
+
+        self.client.force_authenticate(self.manager)
+        self.assertEqual(self.client.get(f'/api/tasks/{self.task.id}/').status_code, 404)
@@ -3,12 +3,15 @@ from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from common.pagination import StandardResultsSetPagination
 from common.permissions import IsProjectParticipant, IsProjectManager
-from common.mixins import ProjectRelatedQuerySetMixin
+from common.mixins import CachedResponseMixin, ProjectRelatedQuerySetMixin, SerializerOptimizedQuerySetMixin
 from .models import Project
 from .serializers import ProjectSerializer
 
 
-class ProjectViewSet(ProjectRelatedQuerySetMixin, viewsets.ModelViewSet):
+class ProjectViewSet(CachedResponseMixin,
+                     SerializerOptimizedQuerySetMixin,
+                     ProjectRelatedQuerySetMixin,
+                     viewsets.ModelViewSet):
     """
     Projects CRUD.
 
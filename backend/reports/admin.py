@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import ProjectReport
+from .models import ProjectReport, ProjectStats
 
 admin.site.register(ProjectReport)
+admin.site.register(ProjectStats)
@@ -0,0 +1,37 @@
+from .models import ProjectReport
+from .versions import get_report_version, acquire_generation_lock
+
+
+def request_report(project, create):
+    """
+    Creates a report of the current project data through `create(**fields)`.
+
+    Reuses the last ready report if the project data has not changed since.
+    Otherwise returns True as the second value when the caller has to enqueue
+    generate_report_task, i.e. unless a generation is already in flight for
+    the same data version (the running task fills every pending report).
+    """
+    version = get_report_version(project.id)
+
+    ready_report = _ready_report(project, version)
+    if ready_report:
+        return create(data_version=version, data=ready_report.data, is_ready=True), False
+
+    report = create(data_version=version)
+    if acquire_generation_lock(project.id, version):
+        return report, True
+
+    # The generation in flight may have filled the waiting reports before this
+    # one was created, while still holding the lock
+    ready_report = _ready_report(project, version)
+    if ready_report:
+        ProjectReport.objects.filter(id=report.id).update(data=ready_report.data, is_ready=True)
+        report.data, report.is_ready = ready_report.data, True
+
+    return report, False
+
+
+def _ready_report(project, version):
+    return ProjectReport.objects.filter(
+        project=project, data_version=version, is_ready=True
+    ).order_by('-created_at').first()
@@ -0,0 +1,47 @@
+"""
+Django command to repair drift in the incrementally maintained ProjectStats
+"""
+from django.core.management.base import BaseCommand
+
+from projects.models import Project
+from reports.models import ProjectStats
+from reports.stats import COUNTER_FIELDS, rebuild_stats
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the project and sprint stats rows from the task and bug tables
+    and reports every row whose stored counters had drifted.
+    """
+    help = "Rebuilds ProjectStats rows from scratch and reports drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, action='append', help='Only reconcile these project ids')
+
+    def handle(self, *args, **options):
+        projects = Project.objects.order_by('id')
+        if options['project']:
+            projects = projects.filter(id__in=options['project'])
+
+        drifted = 0
+
+        for project in projects.prefetch_related('sprints'):
+            existing = {
+                stats.sprint_id: stats
+                for stats in ProjectStats.objects.filter(project=project)
+            }
+
+            for sprint_id in [None, *(sprint.id for sprint in project.sprints.all())]:
+                before = existing.get(sprint_id)
+                after = rebuild_stats(project.id, sprint_id)
+
+                changed = [
+                    field for field in COUNTER_FIELDS
+                    if before is None or getattr(before, field) != getattr(after, field)
+                ]
+                if changed:
+                    drifted += 1
+                    scope = f'sprint {sprint_id}' if sprint_id else 'project'
+                    self.stdout.write(f'{project.name} ({scope}): fixed {", ".join(changed)}')
+
+        self.stdout.write(self.style.SUCCESS(f'Reconciled ProjectStats, {drifted} row(s) repaired.'))
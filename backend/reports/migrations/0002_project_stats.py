@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_initial'),
+        ('reports', '0001_initial'),
+        ('sprints', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tasks_new', models.IntegerField(default=0)),
+                ('tasks_in_progress', models.IntegerField(default=0)),
+                ('tasks_review', models.IntegerField(default=0)),
+                ('tasks_testing', models.IntegerField(default=0)),
+                ('tasks_done', models.IntegerField(default=0)),
+                ('tasks_closed', models.IntegerField(default=0)),
+                ('story_points_total', models.IntegerField(default=0)),
+                ('story_points_done', models.IntegerField(default=0)),
+                ('bugs_low', models.IntegerField(default=0)),
+                ('bugs_medium', models.IntegerField(default=0)),
+                ('bugs_high', models.IntegerField(default=0)),
+                ('bugs_critical', models.IntegerField(default=0)),
+                ('active_bugs_low', models.IntegerField(default=0)),
+                ('active_bugs_medium', models.IntegerField(default=0)),
+                ('active_bugs_high', models.IntegerField(default=0)),
+                ('active_bugs_critical', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='projects.project')),
+                ('sprint', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='sprints.sprint')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('sprint__isnull', True)), fields=('project',), name='unique_project_stats'), models.UniqueConstraint(fields=('project', 'sprint'), name='unique_sprint_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_initial'),
+        ('reports', '0002_project_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectreport',
+            name='data_version',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='projectreport',
+            index=models.Index(fields=['project', 'data_version'], name='reports_pro_project_e98c76_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_report_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectreport',
+            name='is_failed',
+            field=models.BooleanField(default=False, verbose_name='Помилка генерації'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_report_is_failed'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='projectreport',
+            name='data_version',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 from projects.models import Project
 
@@ -15,8 +16,71 @@ class ProjectReport(models.Model):
 
     data = models.JSONField(default=dict, verbose_name="Дані звіту")
 
+    # Project data version and day the report was generated from (see reports.versions.get_report_version)
+    data_version = models.CharField(max_length=64, blank=True, default='')
+
     created_at = models.DateTimeField(auto_now_add=True)
     is_ready = models.BooleanField(default=False, verbose_name="Готовий")
+    is_failed = models.BooleanField(default=False, verbose_name="Помилка генерації")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'data_version']),
+        ]
 
     def __str__(self):
         return f"{self.get_report_type_display()} - {self.project.name}"
+
+
+class ProjectStats(models.Model):
+    """
+    Incrementally maintained counters of a project (sprint is NULL) or one of its sprints.
+
+    Updated in the same transaction as Task/BugReport writes (see reports.signals
+    and reports.stats.update_tasks); `reconcile_project_stats` repairs drift.
+    Bug counters are kept on the project row only, bugs are not attached to sprints.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="stats")
+    sprint = models.ForeignKey('sprints.Sprint', on_delete=models.CASCADE, null=True, blank=True, related_name="stats")
+
+    tasks_new = models.IntegerField(default=0)
+    tasks_in_progress = models.IntegerField(default=0)
+    tasks_review = models.IntegerField(default=0)
+    tasks_testing = models.IntegerField(default=0)
+    tasks_done = models.IntegerField(default=0)
+    tasks_closed = models.IntegerField(default=0)
+
+    story_points_total = models.IntegerField(default=0)
+    story_points_done = models.IntegerField(default=0)
+
+    bugs_low = models.IntegerField(default=0)
+    bugs_medium = models.IntegerField(default=0)
+    bugs_high = models.IntegerField(default=0)
+    bugs_critical = models.IntegerField(default=0)
+
+    active_bugs_low = models.IntegerField(default=0)
+    active_bugs_medium = models.IntegerField(default=0)
+    active_bugs_high = models.IntegerField(default=0)
+    active_bugs_critical = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project'], condition=Q(sprint__isnull=True), name='unique_project_stats'
+            ),
+            models.UniqueConstraint(fields=['project', 'sprint'], name='unique_sprint_stats'),
+        ]
+
+    @property
+    def tasks_total(self):
+        return (
+            self.tasks_new + self.tasks_in_progress + self.tasks_review
+            + self.tasks_testing + self.tasks_done + self.tasks_closed
+        )
+
+    @property
+    def active_bugs_total(self):
+        return self.active_bugs_low + self.active_bugs_medium + self.active_bugs_high + self.active_bugs_critical
+
+    def __str__(self):
+        return f"Stats - {self.project_id}" + (f" / sprint {self.sprint_id}" if self.sprint_id else "")
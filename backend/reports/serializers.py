@@ -5,5 +5,5 @@ from .models import ProjectReport
 class ProjectReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProjectReport
-        fields = ['id', 'project', 'report_type', 'data', 'created_at', 'is_ready']
-        read_only_fields = ['data', 'created_at', 'is_ready', 'generated_by']
+        fields = ['id', 'project', 'report_type', 'data', 'created_at', 'is_ready', 'is_failed']
+        read_only_fields = ['data', 'created_at', 'is_ready', 'is_failed', 'generated_by']
@@ -0,0 +1,101 @@
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from projects.models import Project
+from sprints.models import Sprint
+from tasks.models import Task, BugReport
+from .stats import task_state, bug_state, record_task_change, record_bug_change
+from .versions import bump_data_version
+
+TASK_STATE_FIELDS = ('project_id', 'sprint_id', 'status', 'story_points')
+BUG_STATE_FIELDS = ('project_id', 'status', 'priority')
+
+
+def _loaded_state(instance, fields, state_func):
+    """
+    Snapshot of the stats-relevant fields as loaded from the database,
+    or None if some of them are deferred.
+    """
+    if all(field in instance.__dict__ for field in fields):
+        return state_func(instance)
+    return None
+
+
+@receiver(post_init, sender=Task)
+def remember_task_state(sender, instance, **kwargs):
+    instance._stats_state = _loaded_state(instance, TASK_STATE_FIELDS, task_state) if instance.pk else None
+
+
+@receiver(pre_save, sender=Task)
+def load_task_state(sender, instance, raw=False, **kwargs):
+    """
+    Fetches the stored state when the instance was loaded with deferred fields.
+    """
+    if raw or not instance.pk or instance._stats_state is not None:
+        return
+    instance._stats_state = Task.objects.filter(pk=instance.pk).values_list(*TASK_STATE_FIELDS).first()
+
+
+@receiver(post_save, sender=Task)
+def update_task_stats(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    new_state = task_state(instance)
+    record_task_change(instance._stats_state, new_state)
+    instance._stats_state = new_state
+
+
+@receiver(post_delete, sender=Task)
+def remove_task_stats(sender, instance, **kwargs):
+    old_state = instance._stats_state or task_state(instance)
+    record_task_change(old_state, None, create_missing=False)
+
+
+@receiver(post_init, sender=BugReport)
+def remember_bug_state(sender, instance, **kwargs):
+    instance._stats_state = _loaded_state(instance, BUG_STATE_FIELDS, bug_state) if instance.pk else None
+
+
+@receiver(pre_save, sender=BugReport)
+def load_bug_state(sender, instance, raw=False, **kwargs):
+    """
+    Fetches the stored state when the instance was loaded with deferred fields.
+    """
+    if raw or not instance.pk or instance._stats_state is not None:
+        return
+    instance._stats_state = BugReport.objects.filter(pk=instance.pk).values_list(*BUG_STATE_FIELDS).first()
+
+
+@receiver(post_save, sender=BugReport)
+def update_bug_stats(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    new_state = bug_state(instance)
+    record_bug_change(instance._stats_state, new_state)
+    instance._stats_state = new_state
+
+
+@receiver(post_delete, sender=BugReport)
+def remove_bug_stats(sender, instance, **kwargs):
+    old_state = instance._stats_state or bug_state(instance)
+    record_bug_change(old_state, None, create_missing=False)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=BugReport)
+@receiver(post_delete, sender=BugReport)
+@receiver(post_save, sender=Sprint)
+@receiver(post_delete, sender=Sprint)
+def bump_project_data_version(sender, instance, **kwargs):
+    """
+    Any task, bug or sprint write invalidates previously generated reports.
+    """
+    if not kwargs.get('raw'):
+        bump_data_version(instance.project_id)
+
+
+@receiver(post_save, sender=Project)
+def bump_data_version_on_project_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_data_version(instance.pk)
@@ -0,0 +1,232 @@
+from collections import Counter, defaultdict
+
+from django.db import models, transaction
+from django.db.models import Count, F, Sum
+
+from common.db_router import primary
+from common.events import publish
+from tasks.models import Task, BugReport
+from .models import ProjectStats
+from .versions import bump_data_version
+
+DONE_STATUSES = ('DONE', 'CLOSED')
+RESOLVED_BUG_STATUSES = ('CLOSED', 'FIXED')
+
+# Task fields (as accepted by QuerySet.update) that affect ProjectStats
+TRACKED_TASK_FIELDS = {
+    'project': 'project_id',
+    'project_id': 'project_id',
+    'sprint': 'sprint_id',
+    'sprint_id': 'sprint_id',
+    'status': 'status',
+    'story_points': 'story_points',
+}
+
+COUNTER_FIELDS = [
+    field.name for field in ProjectStats._meta.concrete_fields
+    if field.name not in ('id', 'project', 'sprint')
+]
+
+
+def task_state(task):
+    """
+    The part of a task that contributes to ProjectStats.
+    """
+    return task.project_id, task.sprint_id, task.status, task.story_points
+
+
+def bug_state(bug):
+    """
+    The part of a bug report that contributes to ProjectStats.
+    """
+    return bug.project_id, bug.status, bug.priority
+
+
+def _task_counters(status, count, story_points):
+    counters = {
+        f'tasks_{status.lower()}': count,
+        'story_points_total': story_points,
+    }
+    if status in DONE_STATUSES:
+        counters['story_points_done'] = story_points
+    return counters
+
+
+def _bug_counters(status, priority, count):
+    counters = {f'bugs_{priority.lower()}': count}
+    if status not in RESOLVED_BUG_STATUSES:
+        counters[f'active_bugs_{priority.lower()}'] = count
+    return counters
+
+
+def _compute_counters(project_id, sprint_id=None):
+    values = dict.fromkeys(COUNTER_FIELDS, 0)
+
+    tasks = Task.objects.filter(project_id=project_id)
+    if sprint_id:
+        tasks = tasks.filter(sprint_id=sprint_id)
+
+    for row in tasks.order_by().values('status').annotate(count=Count('id'), story_points=Sum('story_points')):
+        for name, value in _task_counters(row['status'], row['count'], row['story_points'] or 0).items():
+            values[name] += value
+
+    if not sprint_id:
+        bugs = BugReport.objects.filter(project_id=project_id).order_by()
+        for row in bugs.values('status', 'priority').annotate(count=Count('id')):
+            for name, value in _bug_counters(row['status'], row['priority'], row['count']).items():
+                values[name] += value
+
+    return values
+
+
+def rebuild_stats(project_id, sprint_id=None):
+    """
+    Recomputes a stats row from scratch and stores it.
+    """
+    with primary():
+        stats, _ = ProjectStats.objects.update_or_create(
+            project_id=project_id,
+            sprint_id=sprint_id,
+            defaults=_compute_counters(project_id, sprint_id)
+        )
+    return stats
+
+
+def get_stats(project_id, sprint_id=None):
+    """
+    Returns the stats row of a project or sprint, building it on first access.
+    """
+    stats = ProjectStats.objects.filter(project_id=project_id, sprint_id=sprint_id).first()
+    return stats or rebuild_stats(project_id, sprint_id)
+
+
+def _apply_deltas(deltas, create_missing=True):
+    """
+    Adds counter deltas to stats rows with a single UPDATE per row.
+
+    A missing row is rebuilt from the current table contents instead, which
+    already include the write being recorded. Deletes pass create_missing=False
+    so rows of a project being cascaded away are not recreated.
+    """
+    for (project_id, sprint_id), counters in deltas.items():
+        changes = {name: F(name) + value for name, value in counters.items() if value}
+        if not changes:
+            continue
+
+        updated = ProjectStats.objects.filter(project_id=project_id, sprint_id=sprint_id).update(**changes)
+
+        if not updated and create_missing:
+            rebuild_stats(project_id, sprint_id)
+
+
+def _task_deltas(groups):
+    """
+    Folds (project_id, sprint_id, status, count, story_points, sign) groups
+    into per-row counter deltas for the project row and the sprint row.
+    """
+    deltas = defaultdict(Counter)
+
+    for project_id, sprint_id, status, count, story_points, sign in groups:
+        targets = [(project_id, None)]
+        if sprint_id:
+            targets.append((project_id, sprint_id))
+
+        for target in targets:
+            for name, value in _task_counters(status, count, story_points).items():
+                deltas[target][name] += sign * value
+
+    return deltas
+
+
+def record_task_changes(changes, create_missing=True):
+    """
+    Moves the contribution of many tasks at once, with one UPDATE per affected
+    stats row. `changes` is an iterable of (old_state, new_state) pairs where
+    either state may be None for inserts and deletes.
+    """
+    groups = []
+    for old_state, new_state in changes:
+        if old_state == new_state:
+            continue
+        if old_state:
+            project_id, sprint_id, status, story_points = old_state
+            groups.append((project_id, sprint_id, status, 1, story_points, -1))
+        if new_state:
+            project_id, sprint_id, status, story_points = new_state
+            groups.append((project_id, sprint_id, status, 1, story_points, 1))
+
+    if groups:
+        _apply_deltas(_task_deltas(groups), create_missing)
+
+
+def record_task_change(old_state, new_state, create_missing=True):
+    """
+    Moves a single task's contribution from old_state to new_state.
+    """
+    record_task_changes([(old_state, new_state)], create_missing)
+
+
+def record_bug_changes(changes, create_missing=True):
+    """
+    Bug report counterpart of record_task_changes().
+    """
+    deltas = defaultdict(Counter)
+    for old_state, new_state in changes:
+        if old_state == new_state:
+            continue
+        for state, sign in ((old_state, -1), (new_state, 1)):
+            if not state:
+                continue
+            project_id, status, priority = state
+            for name, value in _bug_counters(status, priority, 1).items():
+                deltas[(project_id, None)][name] += sign * value
+
+    if deltas:
+        _apply_deltas(deltas, create_missing)
+
+
+def record_bug_change(old_state, new_state, create_missing=True):
+    """
+    Moves a single bug report's contribution from old_state to new_state.
+    """
+    record_bug_changes([(old_state, new_state)], create_missing)
+
+
+def update_tasks(queryset, **changes):
+    """
+    QuerySet.update() for tasks that keeps ProjectStats in sync.
+
+    Bulk updates bypass model signals, so the affected rows are grouped before
+    the update and their contribution is moved in the same transaction.
+    Returns the number of updated tasks.
+    """
+    new_values = {}
+    for name, value in changes.items():
+        if name in TRACKED_TASK_FIELDS:
+            new_values[TRACKED_TASK_FIELDS[name]] = value.pk if isinstance(value, models.Model) else value
+
+    with transaction.atomic():
+        groups = list(
+            queryset.order_by().values('project_id', 'sprint_id', 'status').annotate(
+                count=Count('id'), story_points=Sum('story_points')
+            )
+        )
+        updated = queryset.update(**changes)
+
+        moves = []
+        for group in groups:
+            count, story_points = group['count'], group['story_points'] or 0
+            moves.append((group['project_id'], group['sprint_id'], group['status'], count, story_points, -1))
+
+            new = {**group, **new_values}
+            if 'story_points' in new_values:
+                story_points = new_values['story_points'] * count
+            moves.append((new['project_id'], new['sprint_id'], new['status'], count, story_points, 1))
+
+        _apply_deltas(_task_deltas(moves))
+        bump_data_version(*{move[0] for move in moves})
+        # The updated ids are not known without another query: clients refetch the project's tasks
+        for project_id in {move[0] for move in moves}:
+            publish(project_id, 'tasks.changed')
+
+    return updated
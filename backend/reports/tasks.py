@@ -1,106 +1,186 @@
-from celery import shared_task
-from django.db.models import Count, Sum, Q
+from celery import chord, shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from datetime import timedelta
+from .generation import request_report
 from .models import ProjectReport
+from .stats import get_stats
+from .versions import get_report_version, release_generation_lock
+from common.db_router import fresh_reads, primary
+from common.events import publish
+from projects.models import Project
+from sprintmaster.celery import PRIORITY_LOW
 from tasks.models import Task, BugReport
 from sprints.models import Sprint
 
-
-@shared_task
+User = get_user_model()
+
+
+def _report_data(project, today):
+    project_stats = get_stats(project.id)
+
+    total_tasks = project_stats.tasks_total
+    completed_sp = project_stats.story_points_done
+    active_bugs_count = project_stats.active_bugs_total
+
+    total_sp = project_stats.story_points_total
+    progress_percent = round((completed_sp / total_sp) * 100, 1) if total_sp else 0
+
+    bugs_breakdown = [
+        {'name': priority, 'value': getattr(project_stats, f'bugs_{priority.lower()}')}
+        for priority in BugReport.Priority.values
+        if getattr(project_stats, f'bugs_{priority.lower()}')
+    ]
+
+    burndown_data = []
+
+    active_sprint = Sprint.objects.filter(project=project, is_active=True).first()
+    if not active_sprint:
+        active_sprint = Sprint.objects.filter(project=project).last()
+
+    if active_sprint and active_sprint.start_date and active_sprint.end_date:
+        sprint_total_sp = get_stats(project.id, active_sprint.id).story_points_total
+
+        start_date = active_sprint.start_date
+        end_date = active_sprint.end_date
+        duration = (end_date - start_date).days + 1
+
+        ideal_burn_rate = sprint_total_sp / duration if duration > 0 else 0
+        current_remaining = sprint_total_sp
+
+        # One grouped query for the whole sprint instead of one aggregate per day
+        completed_per_day = Task.objects.filter(
+            sprint=active_sprint,
+            status__in=['DONE', 'CLOSED'],
+            updated_at__date__range=(start_date, end_date)
+        ).annotate(day=TruncDate('updated_at')).values('day').annotate(s=Sum('story_points'))
+
+        completed_by_day = {item['day']: item['s'] for item in completed_per_day}
+
+        for i in range(duration):
+            current_date = start_date + timedelta(days=i)
+            day_label = f"Day {i + 1}"
+
+            ideal_remaining = max(0, sprint_total_sp - (ideal_burn_rate * (i + 1)))
+
+            completed_on_day = completed_by_day.get(current_date) or 0
+
+            if current_date <= today:
+                current_remaining -= completed_on_day
+                actual = max(0, current_remaining)
+            else:
+                actual = None
+
+            burndown_data.append({
+                "day": day_label,
+                "ideal": round(ideal_remaining, 1),
+                "remaining": actual,
+                "completedToday": completed_on_day
+            })
+
+    data = {
+        "project_name": project.name,
+        "tasks": {
+            "total": total_tasks,
+            "completed": project_stats.tasks_done + project_stats.tasks_closed,
+            "in_progress": project_stats.tasks_in_progress + project_stats.tasks_review
+        },
+        "story_points": {
+            "total": total_sp,
+            "burned": completed_sp,
+            "progress_percent": f"{progress_percent}%"
+        },
+        "quality": {
+            "active_bugs": active_bugs_count,
+            "health": "POOR" if active_bugs_count > 5 else "GOOD"
+        },
+        "bugs_breakdown": bugs_breakdown,
+        "burndown": burndown_data
+    }
+    return data
+
+
+# Idempotent, so it can be acknowledged late and redelivered if a worker dies mid-run
+@shared_task(
+    acks_late=True, reject_on_worker_lost=True,
+    soft_time_limit=settings.REPORT_TASK_SOFT_TIME_LIMIT, time_limit=settings.REPORT_TASK_TIME_LIMIT
+)
 def generate_report_task(report_id):
+    # Runs on the read replica (REPLICA_TASKS); the report was just created on the primary
     try:
-        report = ProjectReport.objects.get(id=report_id)
-        project = report.project
+        with primary():
+            report = ProjectReport.objects.select_related('project').get(id=report_id)
+    except ProjectReport.DoesNotExist:
+        return "Report not found"
 
-        total_tasks = Task.objects.filter(project=project).count()
+    project = report.project
+    requested_version = report.data_version
+    waiting = ProjectReport.objects.filter(
+        Q(id=report.id) | Q(project=project, data_version=requested_version, is_ready=False, is_failed=False)
+    )
 
-        stats = Task.objects.filter(project=project).aggregate(
-            completed=Count('id', filter=Q(status='DONE') | Q(status='CLOSED')),
-            in_progress=Count('id', filter=Q(status='IN_PROGRESS') | Q(status='REVIEW')),
-            total_sp=Sum('story_points'),
-            completed_sp=Sum('story_points', filter=Q(status='DONE') | Q(status='CLOSED'))
-        )
+    try:
+        # Read before the data, so a concurrent write always yields a newer version
+        today = timezone.localdate()
+        version = get_report_version(project.id, today)
+
+        with fresh_reads([project.id], users=False):
+            data = _report_data(project, today)
+
+        # Fill every report that waited on this generation
+        waiting.update(data=data, data_version=version, is_ready=True, is_failed=False)
 
-        active_bugs_count = BugReport.objects.filter(
-            project=project
-        ).exclude(status__in=['CLOSED', 'FIXED']).count()
-
-        completed_sp = stats['completed_sp'] or 0
-        total_sp = stats['total_sp'] or 1
-        progress_percent = round((completed_sp / total_sp) * 100, 1) if stats['total_sp'] else 0
-
-        bugs_by_priority = BugReport.objects.filter(project=project).values('priority').annotate(value=Count('id'))
-        bugs_breakdown = [
-            {'name': item['priority'], 'value': item['value']}
-            for item in bugs_by_priority
-        ]
-
-        burndown_data = []
-
-        active_sprint = Sprint.objects.filter(project=project, is_active=True).first()
-        if not active_sprint:
-            active_sprint = Sprint.objects.filter(project=project).last()
-
-        if active_sprint and active_sprint.start_date and active_sprint.end_date:
-            sprint_total_sp = Task.objects.filter(sprint=active_sprint).aggregate(s=Sum('story_points'))['s'] or 0
-
-            start_date = active_sprint.start_date
-            end_date = active_sprint.end_date
-            duration = (end_date - start_date).days + 1
-
-            ideal_burn_rate = sprint_total_sp / duration if duration > 0 else 0
-            current_remaining = sprint_total_sp
-
-            for i in range(duration):
-                current_date = start_date + timedelta(days=i)
-                day_label = f"Day {i + 1}"
-
-                ideal_remaining = max(0, sprint_total_sp - (ideal_burn_rate * (i + 1)))
-
-                completed_on_day = Task.objects.filter(
-                    sprint=active_sprint,
-                    status__in=['DONE', 'CLOSED'],
-                    updated_at__date=current_date
-                ).aggregate(s=Sum('story_points'))['s'] or 0
-
-                if current_date <= timezone.now().date():
-                    current_remaining -= completed_on_day
-                    actual = max(0, current_remaining)
-                else:
-                    actual = None
-
-                burndown_data.append({
-                    "day": day_label,
-                    "ideal": round(ideal_remaining, 1),
-                    "remaining": actual,
-                    "completedToday": completed_on_day
-                })
-
-        report.data = {
-            "project_name": project.name,
-            "tasks": {
-                "total": total_tasks,
-                "completed": stats['completed'],
-                "in_progress": stats['in_progress']
-            },
-            "story_points": {
-                "total": stats['total_sp'] or 0,
-                "burned": completed_sp,
-                "progress_percent": f"{progress_percent}%"
-            },
-            "quality": {
-                "active_bugs": active_bugs_count,
-                "health": "POOR" if active_bugs_count > 5 else "GOOD"
-            },
-            "bugs_breakdown": bugs_breakdown,
-            "burndown": burndown_data
-        }
-
-        report.is_ready = True
-        report.save()
+        ready_ids = ProjectReport.objects.filter(project=project, data_version=version, is_ready=True)
+        publish(project.id, 'report.ready', ids=list(ready_ids.values_list('id', flat=True)))
 
         return f"Report {report_id} generated for {project.name}"
 
-    except ProjectReport.DoesNotExist:
-        return "Report not found"
+    except Exception:
+        # Includes SoftTimeLimitExceeded; a later request for the version generates it anew
+        failed_ids = list(waiting.values_list('id', flat=True))
+        waiting.update(is_failed=True)
+        publish(project.id, 'report.failed', ids=failed_ids)
+        raise
+
+    finally:
+        release_generation_lock(project.id, requested_version)
+
+
+@shared_task
+def generate_manager_reports_task(manager_id):
+    """
+    Requests a report for every project managed by a user and generates the
+    missing ones in parallel: a chord of generate_report_task at low priority
+    (interactive requests on the reports queue go first), followed by
+    summarize_manager_reports_task once all of them have finished.
+    """
+    manager = User.objects.filter(id=manager_id).first()
+    if manager is None:
+        return "Manager not found"
+
+    report_ids = []
+    pending = []
+    for project in Project.objects.filter(manager=manager).order_by('id'):
+        report, generate = request_report(
+            project, lambda **fields: ProjectReport.objects.create(project=project, generated_by=manager, **fields)
+        )
+        report_ids.append(report.id)
+        if generate:
+            pending.append(report.id)
+
+    summary = summarize_manager_reports_task.si(manager_id, report_ids)
+    if pending:
+        chord([generate_report_task.si(report_id).set(priority=PRIORITY_LOW) for report_id in pending], summary).delay()
+    else:
+        summary.delay()
+
+    return f"{len(pending)} of {len(report_ids)} reports queued for manager {manager_id}"
+
+
+@shared_task
+def summarize_manager_reports_task(manager_id, report_ids):
+    ready = ProjectReport.objects.filter(id__in=report_ids, is_ready=True).count()
+    return {'manager': manager_id, 'reports': len(report_ids), 'ready': ready}
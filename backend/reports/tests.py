@@ -1,3 +1,380 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from celery.exceptions import SoftTimeLimitExceeded
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common.testing import create_sprint
+from projects.models import Project
+from sprints.models import Sprint
+from tasks.models import Task, BugReport
+from users.models import User
+
+from .generation import request_report
+from .models import ProjectReport, ProjectStats
+from .stats import COUNTER_FIELDS, rebuild_stats, update_tasks
+from sprintmaster.celery import PRIORITY_LOW, app
+from .tasks import generate_manager_reports_task, generate_report_task
+
+
+class GenerateReportTaskTests(TestCase):
+    """
+    Tests for the asynchronous report generation.
+    """
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.project = Project.objects.create(
+            name='Alpha',
+            description='Test project',
+            start_date=timezone.now().date(),
+            manager=self.manager
+        )
+
+    def _create_sprint(self, days):
+        return create_sprint(self.project, days, is_active=True)
+
+    def _complete_task(self, sprint, story_points, day):
+        task = Task.objects.create(
+            title=f'Task {story_points}',
+            description='...',
+            project=self.project,
+            sprint=sprint,
+            status='DONE',
+            story_points=story_points
+        )
+        completed_at = timezone.make_aware(datetime.combine(day, time(12, 0)))
+        Task.objects.filter(id=task.id).update(updated_at=completed_at)
+        return task
+
+    def _generate(self):
+        report = ProjectReport.objects.create(project=self.project, generated_by=self.manager)
+        generate_report_task(report.id)
+        report.refresh_from_db()
+        return report
+
+    def test_burndown_matches_completed_story_points_per_day(self):
+        sprint = self._create_sprint(days=3)
+        self._complete_task(sprint, 5, sprint.start_date)
+        self._complete_task(sprint, 3, sprint.start_date)
+        self._complete_task(sprint, 2, sprint.end_date)
+        Task.objects.create(
+            title='Open task', description='...', project=self.project, sprint=sprint, story_points=8
+        )
+
+        burndown = self._generate().data['burndown']
+
+        self.assertEqual(burndown, [
+            {"day": "Day 1", "ideal": 12.0, "remaining": 10, "completedToday": 8},
+            {"day": "Day 2", "ideal": 6.0, "remaining": 10, "completedToday": 0},
+            {"day": "Day 3", "ideal": 0, "remaining": 8, "completedToday": 2},
+        ])
+
+    def test_burndown_query_count_does_not_depend_on_sprint_length(self):
+        short_sprint = self._create_sprint(days=3)
+        self._complete_task(short_sprint, 3, short_sprint.end_date)
+
+        with CaptureQueriesContext(connection) as short_ctx:
+            self._generate()
+
+        short_sprint.delete()
+        long_sprint = self._create_sprint(days=60)
+        self._complete_task(long_sprint, 3, long_sprint.end_date)
+
+        with CaptureQueriesContext(connection) as long_ctx:
+            self._generate()
+
+        self.assertEqual(len(short_ctx), len(long_ctx))
+
+
+class ProjectStatsTests(TestCase):
+    """
+    Tests that ProjectStats counters follow task and bug writes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.sprint = Sprint.objects.create(
+            name='Sprint 1', project=self.project,
+            start_date=timezone.now().date(), end_date=timezone.now().date()
+        )
+
+    def _stored(self, sprint=None):
+        stats = ProjectStats.objects.get(project=self.project, sprint=sprint)
+        return {field: getattr(stats, field) for field in COUNTER_FIELDS}
+
+    def _recomputed(self, sprint=None):
+        ProjectStats.objects.filter(project=self.project, sprint=sprint).delete()
+        stats = rebuild_stats(self.project.id, sprint.id if sprint else None)
+        return {field: getattr(stats, field) for field in COUNTER_FIELDS}
+
+    def _assert_in_sync(self):
+        for sprint in (None, self.sprint):
+            stored = self._stored(sprint)
+            self.assertEqual(stored, self._recomputed(sprint))
+
+    def test_counters_follow_saves_and_deletes(self):
+        task = Task.objects.create(
+            title='A', description='...', project=self.project, sprint=self.sprint, story_points=5
+        )
+        Task.objects.create(title='B', description='...', project=self.project, story_points=3)
+        bug = BugReport.objects.create(
+            title='Bug', description='...', project=self.project, reporter=self.manager, priority='HIGH'
+        )
+        self._assert_in_sync()
+
+        task.status = 'DONE'
+        task.story_points = 8
+        task.save()
+        bug.status = 'FIXED'
+        bug.save()
+        self._assert_in_sync()
+
+        stats = ProjectStats.objects.get(project=self.project, sprint=None)
+        self.assertEqual(stats.tasks_total, 2)
+        self.assertEqual(stats.story_points_done, 8)
+        self.assertEqual(stats.bugs_high, 1)
+        self.assertEqual(stats.active_bugs_total, 0)
+
+        task.delete()
+        bug.delete()
+        self._assert_in_sync()
+
+    def test_counters_follow_deferred_instances_and_bulk_updates(self):
+        for i in range(3):
+            Task.objects.create(title=f'T{i}', description='...', project=self.project, sprint=self.sprint)
+
+        task = Task.objects.only('id', 'title').first()
+        task.status = 'TESTING'
+        task.save()
+        self._assert_in_sync()
+
+        moved = update_tasks(Task.objects.filter(sprint=self.sprint).exclude(status='TESTING'), sprint=None)
+        self.assertEqual(moved, 2)
+        self._assert_in_sync()
+
+    def test_sprint_complete_keeps_counters_in_sync(self):
+        Task.objects.create(title='Open', description='...', project=self.project, sprint=self.sprint)
+        Task.objects.create(title='Done', description='...', project=self.project, sprint=self.sprint, status='DONE')
+
+        client = APIClient()
+        client.force_authenticate(self.manager)
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(f'/api/sprints/{self.sprint.id}/complete/')
+        response = client.get(f'/api/sprints/{self.sprint.id}/completion/')
+
+        self.assertEqual(response.data['moved_tasks'], 1)
+        self.assertEqual(self._stored(self.sprint)['tasks_new'], 0)
+        self._assert_in_sync()
+
+    def test_fill_db_leaves_counters_in_sync(self):
+        options = {
+            'users': 8, 'projects': 2, 'tasks_per_project': 40, 'sprints': 3, 'bug_ratio': 0.5, 'seed': 7,
+            'interactive': False, 'force': True,
+        }
+        call_command('fill_db', stdout=StringIO(), **options)
+        first_run = list(Task.objects.order_by('id').values_list('status', 'story_points', 'sprint__name'))
+
+        call_command('fill_db', stdout=StringIO(), **options)
+
+        self.assertEqual(list(Task.objects.order_by('id').values_list('status', 'story_points', 'sprint__name')), first_run)
+        self.assertEqual(Task.objects.count(), 80)
+        self.assertFalse(Project.objects.filter(name='Alpha').exists())
+
+        for stats in ProjectStats.objects.all():
+            stored = {field: getattr(stats, field) for field in COUNTER_FIELDS}
+            stats.delete()
+            rebuilt = rebuild_stats(stats.project_id, stats.sprint_id)
+            self.assertEqual(stored, {field: getattr(rebuilt, field) for field in COUNTER_FIELDS})
+
+    def test_reconcile_command_repairs_drift(self):
+        Task.objects.create(title='A', description='...', project=self.project, sprint=self.sprint)
+        ProjectStats.objects.filter(project=self.project).update(tasks_new=42)
+
+        call_command('reconcile_project_stats', stdout=StringIO())
+
+        self.assertEqual(self._stored()['tasks_new'], 1)
+        self.assertEqual(self._stored(self.sprint)['tasks_new'], 1)
+
+
+class ReportDeduplicationTests(TestCase):
+    """
+    Tests for reuse of reports generated from an unchanged data version.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.task = Task.objects.create(title='A', description='...', project=self.project)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager)
+
+    def _request_report(self):
+        response = self.client.post('/api/reports/', {'project': self.project.id}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return ProjectReport.objects.get(id=response.data['id'])
+
+    def test_unchanged_project_reuses_ready_report(self):
+        with patch('reports.views.generate_report_task.delay', wraps=generate_report_task.delay) as delay:
+            first = self._request_report()
+            second = self._request_report()
+
+        self.assertEqual(delay.call_count, 1)
+        self.assertTrue(second.is_ready)
+        self.assertEqual(second.data, first.data)
+
+    def test_write_invalidates_reused_report(self):
+        self._request_report()
+        self.task.status = 'DONE'
+        self.task.save()
+
+        with patch('reports.views.generate_report_task.delay', wraps=generate_report_task.delay) as delay:
+            report = self._request_report()
+
+        self.assertEqual(delay.call_count, 1)
+        self.assertEqual(report.data['tasks']['completed'], 1)
+
+    def test_concurrent_requests_share_one_generation(self):
+        with patch('reports.views.generate_report_task.delay') as delay:
+            first = self._request_report()
+            second = self._request_report()
+
+        self.assertEqual(delay.call_count, 1)
+        self.assertFalse(second.is_ready)
+
+        generate_report_task(first.id)
+
+        second.refresh_from_db()
+        self.assertTrue(second.is_ready)
+        self.assertEqual(second.data['tasks']['total'], 1)
+
+    def test_reports_are_not_reused_on_the_next_day(self):
+        today = timezone.localdate()
+        sprint = Sprint.objects.create(
+            name='Sprint 1', project=self.project, start_date=today, end_date=today + timedelta(days=1), is_active=True
+        )
+        Task.objects.create(title='B', description='...', project=self.project, sprint=sprint, story_points=3)
+        first = self._request_report()
+        self.assertEqual([day['remaining'] for day in first.data['burndown']], [3, None])
+
+        tomorrow = timezone.now() + timedelta(days=1)
+        with patch('django.utils.timezone.now', return_value=tomorrow), \
+                patch('reports.views.generate_report_task.delay', wraps=generate_report_task.delay) as delay:
+            report = self._request_report()
+
+        self.assertEqual(delay.call_count, 1)
+        self.assertEqual([day['remaining'] for day in report.data['burndown']], [3, 3])
+
+    def test_report_created_while_the_generation_finishes_is_filled(self):
+        with patch('reports.views.generate_report_task.delay'):
+            first = self._request_report()
+
+        def create_after_generation(**fields):
+            # The generation fills the waiting reports between this request's
+            # ready check and its insert, and has not released its lock yet
+            with patch('reports.tasks.release_generation_lock'):
+                generate_report_task(first.id)
+            return ProjectReport.objects.create(project=self.project, generated_by=self.manager, **fields)
+
+        report, generate = request_report(self.project, create_after_generation)
+
+        self.assertFalse(generate)
+        self.assertTrue(report.is_ready)
+        report.refresh_from_db()
+        self.assertTrue(report.is_ready)
+        self.assertEqual(report.data['tasks']['total'], 1)
+
+    def test_timed_out_generation_marks_waiting_reports_failed(self):
+        with patch('reports.views.generate_report_task.delay'):
+            first = self._request_report()
+            second = self._request_report()
+
+        with patch('reports.tasks._report_data', side_effect=SoftTimeLimitExceeded()):
+            with self.assertRaises(SoftTimeLimitExceeded):
+                generate_report_task(first.id)
+
+        self.assertEqual(
+            list(ProjectReport.objects.order_by('id').values_list('is_ready', 'is_failed')),
+            [(False, True), (False, True)]
+        )
+
+        # The lock is released, so the next request generates the version again
+        with patch('reports.views.generate_report_task.delay', wraps=generate_report_task.delay) as delay:
+            report = self._request_report()
+
+        self.assertEqual(delay.call_count, 1)
+        self.assertTrue(report.is_ready)
+        second.refresh_from_db()
+        self.assertTrue(second.is_failed)
+
+
+class ReportFanOutTests(TestCase):
+    """
+    Tests for the queue routing and the per-manager report fan-out.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.projects = [
+            Project.objects.create(
+                name=f'Project {i}', description='...', start_date=timezone.now().date(), manager=self.manager
+            )
+            for i in range(3)
+        ]
+        Task.objects.create(title='A', description='...', project=self.projects[0], status='DONE')
+
+    def test_manager_reports_are_generated_in_one_chord(self):
+        # An up-to-date report is reused instead of being generated again
+        client = APIClient()
+        client.force_authenticate(self.manager)
+        client.post('/api/reports/', {'project': self.projects[2].id}, format='json')
+
+        result = generate_manager_reports_task.delay(self.manager.id)
+
+        self.assertEqual(result.get(), f'2 of 3 reports queued for manager {self.manager.id}')
+        reports = ProjectReport.objects.filter(generated_by=self.manager)
+        self.assertEqual(reports.count(), 4)
+        self.assertFalse(reports.filter(is_ready=False).exists())
+        self.assertEqual(reports.get(project=self.projects[0], data__tasks__total=1).data['tasks']['completed'], 1)
+
+    def test_tasks_are_routed_to_their_queues(self):
+        with app.connection_for_write('memory://') as connection:
+            channel = connection.default_channel
+            for queue in app.conf.task_queues:
+                queue.bind(channel).declare()
+
+            with self.settings(CELERY_TASK_ALWAYS_EAGER=False):
+                generate_report_task.apply_async(
+                    (1,), connection=connection, priority=PRIORITY_LOW, ignore_result=True
+                )
+                generate_manager_reports_task.apply_async(
+                    (self.manager.id,), connection=connection, ignore_result=True
+                )
+
+            message = channel.basic_get('reports', no_ack=True)
+            self.assertEqual(message.headers['task'], 'reports.tasks.generate_report_task')
+            self.assertEqual(message.properties['priority'], PRIORITY_LOW)
+            self.assertIsNone(channel.basic_get('reports', no_ack=True))
+            # The fan-out itself is light, only the generations it enqueues are long jobs
+            message = channel.basic_get('default', no_ack=True)
+            self.assertEqual(message.headers['task'], 'reports.tasks.generate_manager_reports_task')
 
-# Create your tests here.
+        self.assertEqual(app.amqp.router.route({}, 'tasks.tasks.import_rows_task')['queue'].name, 'bulk')
+        self.assertEqual(app.amqp.router.route({}, 'sprints.tasks.complete_sprint_task')['queue'].name, 'bulk')
+        self.assertTrue(generate_report_task.acks_late)
@@ -0,0 +1,106 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from common.db_router import USERS_WRITTEN, mark_written
+from common.metrics import record_cache_lookup
+
+VERSION_CACHE_KEY = 'report_data_version:project:{}'
+USERS_VERSION_CACHE_KEY = 'user_data_version'
+LOCK_CACHE_KEY = 'report_generation_lock:project:{}:{}'
+
+
+def get_data_version(project_id):
+    """
+    Returns the opaque data version of a project.
+
+    Versions are random tokens rather than counters, so a version lost on
+    cache eviction is replaced by a new one and never matches an old report.
+    """
+    key = VERSION_CACHE_KEY.format(project_id)
+    version = cache.get(key)
+    record_cache_lookup('report_data_version', version is not None)
+
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+
+    return version
+
+
+def get_report_version(project_id, day=None):
+    """
+    Version a report of the project is generated from and reused for: the
+    data version and the day (today by default), as the burndown of an open
+    sprint changes at midnight even when the data does not.
+    """
+    day = day or timezone.localdate()
+    return f'{get_data_version(project_id)}:{day.isoformat()}'
+
+
+def get_data_versions(project_ids):
+    """
+    get_data_version() for many projects with one cache round trip when all are set.
+    Returns {project_id: version}.
+    """
+    keys = {VERSION_CACHE_KEY.format(project_id): project_id for project_id in project_ids}
+    versions = {keys[key]: version for key, version in cache.get_many(keys).items()}
+
+    for project_id in keys.values():
+        if project_id not in versions:
+            versions[project_id] = get_data_version(project_id)
+
+    return versions
+
+
+def bump_data_version(*project_ids):
+    """
+    Marks project data as changed.
+
+    Bumped immediately and again on commit: the second bump invalidates any
+    report generated from the pre-commit snapshot in between.
+    """
+    def bump():
+        cache.set_many({VERSION_CACHE_KEY.format(project_id): uuid4().hex for project_id in project_ids}, None)
+
+    def bump_committed():
+        bump()
+        mark_written(*project_ids)
+
+    if project_ids:
+        bump()
+        transaction.on_commit(bump_committed)
+
+
+def acquire_generation_lock(project_id, version):
+    """
+    Allows a single report generation per project and data version to be in flight.
+    """
+    return cache.add(LOCK_CACHE_KEY.format(project_id, version), True, settings.REPORT_GENERATION_LOCK_TIMEOUT)
+
+
+def release_generation_lock(project_id, version):
+    cache.delete(LOCK_CACHE_KEY.format(project_id, version))
+
+
+def get_users_version():
+    """
+    Opaque version of the user data embedded in other resources (names, roles).
+    """
+    version = cache.get(USERS_VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(USERS_VERSION_CACHE_KEY, uuid4().hex, None)
+        version = cache.get(USERS_VERSION_CACHE_KEY)
+    return version
+
+
+def bump_users_version():
+    def bump_committed():
+        cache.set(USERS_VERSION_CACHE_KEY, uuid4().hex, None)
+        mark_written(USERS_WRITTEN)
+
+    cache.set(USERS_VERSION_CACHE_KEY, uuid4().hex, None)
+    transaction.on_commit(bump_committed)
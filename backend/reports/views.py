@@ -3,14 +3,16 @@ from rest_framework.permissions import IsAuthenticated
 
 from common.pagination import StandardResultsSetPagination
 from common.permissions import IsProjectParticipant
-from common.mixins import ProjectRelatedQuerySetMixin
+from common.mixins import ProjectRelatedQuerySetMixin, SerializerOptimizedQuerySetMixin
 
 from .models import ProjectReport
 from .serializers import ProjectReportSerializer
+from .generation import request_report
 from .tasks import generate_report_task
 
 
-class ReportViewSet(ProjectRelatedQuerySetMixin,
+class ReportViewSet(SerializerOptimizedQuerySetMixin,
+                    ProjectRelatedQuerySetMixin,
                     mixins.CreateModelMixin,
                     mixins.RetrieveModelMixin,
                     mixins.ListModelMixin,
@@ -25,5 +27,9 @@ class ReportViewSet(ProjectRelatedQuerySetMixin,
     permission_classes = [IsAuthenticated, IsProjectParticipant]
 
     def perform_create(self, serializer):
-        report = serializer.save(generated_by=self.request.user)
-        generate_report_task.delay(report.id)
+        report, generate = request_report(
+            serializer.validated_data['project'],
+            lambda **fields: serializer.save(generated_by=self.request.user, **fields)
+        )
+        if generate:
+            generate_report_task.delay(report.id)
@@ -1,6 +1,7 @@
 import os
 
 from celery import Celery
+from kombu import Queue
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sprintmaster.settings')
 
@@ -8,7 +9,33 @@ app = Celery('sprintmaster')
 
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
+# Redis priorities: 0 is the highest, 9 the lowest. Interactive work uses the
+# default, batch fan-outs (e.g. generate_manager_reports_task) PRIORITY_LOW
+PRIORITY_DEFAULT = 5
+PRIORITY_LOW = 9
 
+# Light, latency-sensitive tasks stay on `default`; long jobs get their own
+# queues (and workers started with -Q reports,bulk --prefetch-multiplier=1),
+# so a burst of report generations cannot delay anything else
 app.conf.task_default_queue = 'default'
+app.conf.task_queues = [
+    Queue('default', routing_key='default'),
+    Queue('reports', routing_key='reports'),
+    Queue('bulk', routing_key='bulk'),
+]
+app.conf.task_routes = {
+    'reports.tasks.generate_report_task': {'queue': 'reports'},
+    'tasks.tasks.import_rows_task': {'queue': 'bulk'},
+    'sprints.tasks.complete_sprint_task': {'queue': 'bulk'},
+}
+
+# priority_steps orders the messages within a queue; the queues a worker
+# consumes are polled in turn, so neither `reports` nor `bulk` can starve the other
+app.conf.task_default_priority = PRIORITY_DEFAULT
+app.conf.broker_transport_options = {
+    'queue_order_strategy': 'round_robin',
+    'priority_steps': list(range(10)),
+    'sep': ':',
+}
 
 app.autodiscover_tasks()
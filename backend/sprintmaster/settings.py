@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -48,6 +49,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'common.middleware.MetricsMiddleware',
+    'common.middleware.SlowQueryContextMiddleware',
+    'common.middleware.ProfilingMiddleware',
+    'common.middleware.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -89,6 +94,24 @@ DATABASES = {
     }
 }
 
+# Optional read replica (see common.db_router); unset SQL_REPLICA_* values default to the primary's
+if os.getenv('SQL_REPLICA_HOST') or os.getenv('SQL_REPLICA_DATABASE'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('SQL_REPLICA_HOST', DATABASES['default']['HOST']),
+        'NAME': os.getenv('SQL_REPLICA_DATABASE', DATABASES['default']['NAME']),
+        'USER': os.getenv('SQL_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('SQL_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'PORT': os.getenv('SQL_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['common.db_router.ReplicaRouter']
+REPLICA_DATABASE = 'replica' if 'replica' in DATABASES else None
+# How long after a commit reads about the written projects stay on the primary
+REPLICA_LAG_SECONDS = int(os.getenv("REPLICA_LAG_SECONDS", 5))
+REPLICA_TASKS = ['reports.tasks.generate_report_task']
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {"NAME": 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -98,7 +121,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.StatelessJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -117,6 +140,56 @@ CACHES = {
     }
 }
 
+TESTING = 'test' in sys.argv
+
+if TESTING:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+PROJECT_ACCESS_CACHE_TIMEOUT = int(os.getenv("PROJECT_ACCESS_CACHE_TIMEOUT", 300))
+JWT_STATELESS_AUTH = os.getenv("JWT_STATELESS_AUTH", "1") == "1"
+TOKEN_VERSION_CACHE_TIMEOUT = int(os.getenv("TOKEN_VERSION_CACHE_TIMEOUT", 300))
+TOKEN_USER_CACHE_TIMEOUT = int(os.getenv("TOKEN_USER_CACHE_TIMEOUT", 60))
+REPORT_GENERATION_LOCK_TIMEOUT = int(os.getenv("REPORT_GENERATION_LOCK_TIMEOUT", 300))
+TASK_BULK_MAX_ITEMS = int(os.getenv("TASK_BULK_MAX_ITEMS", 500))
+SPRINT_COMPLETION_CHUNK_SIZE = int(os.getenv("SPRINT_COMPLETION_CHUNK_SIZE", 500))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+TASK_IMPORT_BATCH_SIZE = int(os.getenv("TASK_IMPORT_BATCH_SIZE", 1000))
+# Uploads above this size are imported by a Celery worker instead of the request
+TASK_IMPORT_INLINE_MAX_BYTES = int(os.getenv("TASK_IMPORT_INLINE_MAX_BYTES", 1024 * 1024))
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Required by /api/metrics/ unless DEBUG is on
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "0") == "1"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", str(BASE_DIR / "logs" / "slow_queries.jsonl"))
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024))
+SLOW_QUERY_LOG_BACKUP_COUNT = int(os.getenv("SLOW_QUERY_LOG_BACKUP_COUNT", 5))
+SLOW_QUERY_MAX_PARAMS_LENGTH = int(os.getenv("SLOW_QUERY_MAX_PARAMS_LENGTH", 1000))
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 300))
+
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "common.events.RedisEventBackend")
+EVENTS_REDIS_URL = os.getenv("EVENTS_REDIS_URL", "redis://redis:6379/0")
+EVENTS_CHANNEL_PREFIX = os.getenv("EVENTS_CHANNEL_PREFIX", "sprintmaster:events:")
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
+EVENTS_RETRY_MS = int(os.getenv("EVENTS_RETRY_MS", 3000))
+EVENTS_TICKET_TIMEOUT = int(os.getenv("EVENTS_TICKET_TIMEOUT", 30))
+
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+PROFILING_TASK_SAMPLE_RATE = float(os.getenv("PROFILING_TASK_SAMPLE_RATE", 0))
+PROFILING_HEADER = os.getenv("PROFILING_HEADER", "X-Profile")
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_DIR = os.getenv("PROFILING_DIR", str(BASE_DIR / "logs" / "profiles"))
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", 200))
+PROFILING_MAX_BYTES = int(os.getenv("PROFILING_MAX_BYTES", 100 * 1024 * 1024))
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
@@ -138,5 +211,24 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = "UTC"
 CELERY_ENABLE_UTC = True
+CELERY_TASK_SOFT_TIME_LIMIT = int(os.getenv("CELERY_TASK_SOFT_TIME_LIMIT", 300))
+CELERY_TASK_TIME_LIMIT = int(os.getenv("CELERY_TASK_TIME_LIMIT", 360))
+
+# Per-task limits of the long jobs (seconds); on the soft limit the task marks its
+# report, import job or sprint completion failed, the hard limit kills the worker process
+REPORT_TASK_SOFT_TIME_LIMIT = int(os.getenv("REPORT_TASK_SOFT_TIME_LIMIT", 120))
+REPORT_TASK_TIME_LIMIT = int(os.getenv("REPORT_TASK_TIME_LIMIT", 150))
+IMPORT_TASK_SOFT_TIME_LIMIT = int(os.getenv("IMPORT_TASK_SOFT_TIME_LIMIT", 1800))
+IMPORT_TASK_TIME_LIMIT = int(os.getenv("IMPORT_TASK_TIME_LIMIT", 1860))
+SPRINT_COMPLETION_SOFT_TIME_LIMIT = int(os.getenv("SPRINT_COMPLETION_SOFT_TIME_LIMIT", 600))
+SPRINT_COMPLETION_TIME_LIMIT = int(os.getenv("SPRINT_COMPLETION_TIME_LIMIT", 660))
+
+if TESTING:
+    CELERY_TASK_ALWAYS_EAGER = True
+    EVENTS_BACKEND = "common.events.InMemoryEventBackend"
+    # SQLite stand-in for the replica, so routing tests can tell the databases apart;
+    # routing stays off unless a test sets REPLICA_DATABASE
+    DATABASES['replica'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'replica.sqlite3'}
+    REPLICA_DATABASE = None
 
 # CORS_ALLOW_ALL_ORIGINS = True
@@ -4,9 +4,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
-from rest_framework_simplejwt.views import TokenRefreshView
-
-from users.views import CustomTokenObtainPairView
+from common.views import metrics, project_events, project_events_ticket
+from users.views import CustomTokenObtainPairView, CustomTokenRefreshView
 
 api_patterns = [
     path('', include('users.urls')),
@@ -14,9 +13,13 @@ api_patterns = [
     path('', include('sprints.urls')),
     path('', include('tasks.urls')),
     path('', include('reports.urls')),
+    path('projects/<int:project_id>/events/', project_events, name='project-events'),
+    path('projects/<int:project_id>/events/ticket/', project_events_ticket, name='project-events-ticket'),
 
     path('auth/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('auth/token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
+
+    path('metrics/', metrics, name='metrics'),
 
     path('schema/', SpectacularAPIView.as_view(), name='schema'),
     path('docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
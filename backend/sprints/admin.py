@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import Sprint
+from .models import Sprint, SprintCompletion
 
 admin.site.register(Sprint)
+admin.site.register(SprintCompletion)
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sprints', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SprintCompletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Очікує'), ('RUNNING', 'Виконується'), ('DONE', 'Завершено'), ('FAILED', 'Помилка')], default='PENDING', max_length=20)),
+                ('total_tasks', models.PositiveIntegerField(default=0)),
+                ('moved_tasks', models.PositiveIntegerField(default=0)),
+                ('metrics', models.JSONField(default=dict, verbose_name='Підсумкові метрики')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('next_sprint', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='carried_over_completions', to='sprints.sprint')),
+                ('requested_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('sprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completions', to='sprints.sprint')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -1,10 +1,12 @@
 from django.core.exceptions import ValidationError
+from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from common.models import ProjectMoveMixin
 from projects.models import Project
 
 
-class Sprint(models.Model):
+class Sprint(ProjectMoveMixin, models.Model):
     """
     Time-boxed iteration within a specific project.
     """
@@ -30,14 +32,51 @@ class Sprint(models.Model):
 
     def clean(self):
         """
-        Validates logical consistency of sprint dates.
+        Validates logical consistency of sprint dates, and that a sprint with
+        tasks stays in their project.
         """
         if self.start_date and self.end_date and self.end_date < self.start_date:
             raise ValidationError(_("Дата завершення не може бути раніше дати початку."))
+        if self.project_changed(self.project_id) and self.referenced_from_other_projects('tasks', self.project_id):
+            raise ValidationError(_("Спринт із задачами не можна перенести в інший проєкт."))
 
     def save(self, *args, **kwargs):
         self.full_clean()
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.name} | {self.project.name}"
\ No newline at end of file
+        return f"{self.name} | {self.project.name}"
+
+
+class SprintCompletion(models.Model):
+    """
+    Progress and outcome of an asynchronous sprint completion (see sprints.tasks).
+
+    Unfinished tasks are moved to `next_sprint`, or to the backlog when it is
+    empty, in chunks; `metrics` holds the sprint's counters taken before the move.
+    """
+    class Status(models.TextChoices):
+        PENDING = "PENDING", _("Очікує")
+        RUNNING = "RUNNING", _("Виконується")
+        DONE = "DONE", _("Завершено")
+        FAILED = "FAILED", _("Помилка")
+
+    sprint = models.ForeignKey(Sprint, on_delete=models.CASCADE, related_name="completions")
+    next_sprint = models.ForeignKey(
+        Sprint, on_delete=models.SET_NULL, null=True, blank=True, related_name="carried_over_completions"
+    )
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
+
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    total_tasks = models.PositiveIntegerField(default=0)
+    moved_tasks = models.PositiveIntegerField(default=0)
+    metrics = models.JSONField(default=dict, verbose_name=_("Підсумкові метрики"))
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.sprint} - {self.get_status_display()}"
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Sprint
+from .models import Sprint, SprintCompletion
 
 class SprintSerializer(serializers.ModelSerializer):
     class Meta:
@@ -8,9 +8,42 @@ class SprintSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         """
-        Ensure end_date is logically after start_date.
+        Ensure end_date is logically after start_date, and that a sprint
+        with tasks is not moved to another project.
         """
         if data.get('start_date') and data.get('end_date'):
             if data['start_date'] > data['end_date']:
                 raise serializers.ValidationError("End date must occur after start date.")
-        return data
\ No newline at end of file
+
+        project = data.get('project')
+        if self.instance and project and self.instance.project_changed(project.id):
+            if self.instance.referenced_from_other_projects('tasks', project.id):
+                raise serializers.ValidationError(
+                    {'project': "A sprint with tasks cannot be moved to another project."}
+                )
+        return data
+
+
+class SprintCompletionSerializer(serializers.ModelSerializer):
+    """
+    Progress of an asynchronous sprint completion.
+    `next_sprint` is accepted on input; unfinished tasks go to the backlog when it is omitted.
+    """
+    class Meta:
+        model = SprintCompletion
+        fields = ['id', 'sprint', 'next_sprint', 'status', 'total_tasks', 'moved_tasks', 'metrics',
+                  'created_at', 'finished_at']
+        read_only_fields = ['sprint', 'status', 'total_tasks', 'moved_tasks', 'metrics', 'created_at', 'finished_at']
+
+    def validate_next_sprint(self, next_sprint):
+        """
+        Ensure unfinished tasks are carried over within the same project.
+        """
+        sprint = self.context['sprint']
+        if next_sprint is None:
+            return next_sprint
+        if next_sprint.id == sprint.id:
+            raise serializers.ValidationError("Next sprint must differ from the completed sprint.")
+        if next_sprint.project_id != sprint.project_id:
+            raise serializers.ValidationError("Next sprint must belong to the same project.")
+        return next_sprint
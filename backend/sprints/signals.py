@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from common.events import publish
+from .models import Sprint
+
+
+@receiver(post_save, sender=Sprint)
+def publish_sprint_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        publish(instance.project_id, 'sprint.created' if created else 'sprint.updated', id=instance.pk)
+
+
+@receiver(post_delete, sender=Sprint)
+def publish_sprint_deleted(sender, instance, **kwargs):
+    publish(instance.project_id, 'sprint.deleted', id=instance.pk)
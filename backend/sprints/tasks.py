@@ -0,0 +1,75 @@
+from celery import shared_task
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from reports.stats import COUNTER_FIELDS, DONE_STATUSES, get_stats, update_tasks
+from tasks.models import Task
+from .models import Sprint, SprintCompletion
+
+
+def snapshot_metrics(sprint):
+    """
+    Final counters of a sprint, taken before its unfinished tasks are moved out.
+    """
+    stats = get_stats(sprint.project_id, sprint.id)
+    # Bug counters live on the project row only
+    metrics = {field: getattr(stats, field) for field in COUNTER_FIELDS if field.startswith(('tasks_', 'story_points_'))}
+    metrics['tasks_total'] = stats.tasks_total
+    metrics['tasks_unfinished'] = stats.tasks_total - stats.tasks_done - stats.tasks_closed
+    return metrics
+
+
+@shared_task(
+    acks_late=True, reject_on_worker_lost=True,
+    soft_time_limit=settings.SPRINT_COMPLETION_SOFT_TIME_LIMIT, time_limit=settings.SPRINT_COMPLETION_TIME_LIMIT
+)
+def complete_sprint_task(completion_id):
+    """
+    Moves the unfinished tasks of a sprint in chunks of SPRINT_COMPLETION_CHUNK_SIZE.
+
+    Every chunk is its own transaction, so row locks are held only for one
+    chunk and progress is visible to clients polling the completion.
+    A redelivered run resumes with the tasks that are still unfinished.
+    """
+    try:
+        completion = SprintCompletion.objects.select_related('sprint').get(id=completion_id)
+    except SprintCompletion.DoesNotExist:
+        return "Sprint completion not found"
+
+    if completion.status in (SprintCompletion.Status.DONE, SprintCompletion.Status.FAILED):
+        return f"Sprint completion {completion_id} already finished"
+
+    sprint = completion.sprint
+    unfinished = Task.objects.filter(sprint=sprint).exclude(status__in=DONE_STATUSES)
+
+    try:
+        # Keep the snapshot of the interrupted run, some tasks were moved out since
+        if completion.status != SprintCompletion.Status.RUNNING:
+            metrics = snapshot_metrics(sprint)
+            SprintCompletion.objects.filter(id=completion.id).update(
+                status=SprintCompletion.Status.RUNNING, metrics=metrics, total_tasks=metrics['tasks_unfinished']
+            )
+
+        while True:
+            chunk = list(unfinished.order_by('id').values_list('id', flat=True)[:settings.SPRINT_COMPLETION_CHUNK_SIZE])
+            if not chunk:
+                break
+
+            # Re-checks the filter: tasks finished or moved since the ids were read stay put
+            moved = update_tasks(unfinished.filter(id__in=chunk), sprint_id=completion.next_sprint_id)
+            SprintCompletion.objects.filter(id=completion.id).update(moved_tasks=F('moved_tasks') + moved)
+
+        sprint.is_active = False
+        sprint.save(update_fields=['is_active'])
+
+        SprintCompletion.objects.filter(id=completion.id).update(
+            status=SprintCompletion.Status.DONE, finished_at=timezone.now()
+        )
+    except Exception:
+        SprintCompletion.objects.filter(id=completion.id).update(
+            status=SprintCompletion.Status.FAILED, finished_at=timezone.now()
+        )
+        raise
+
+    return f"Sprint {sprint.id} completed"
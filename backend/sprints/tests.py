@@ -1,3 +1,211 @@
-from django.test import TestCase
+from datetime import datetime, time, timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common.testing import create_sprint
+from projects.models import Project
+from reports.stats import update_tasks
+from tasks.models import Task, BugReport
+from users.models import User
+
+from .models import Sprint, SprintCompletion
+
+
+class SprintTimelineTests(TestCase):
+    """
+    Tests for the sprint timeline endpoint.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.dev = User.objects.create_user(username='dev', password='password123', role='DEV')
+        self.project = Project.objects.create(
+            name='Alpha',
+            description='Test project',
+            start_date=timezone.now().date(),
+            manager=self.manager
+        )
+        self.project.members.add(self.dev)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.dev)
+
+    def _create_sprint(self, days):
+        return create_sprint(self.project, days)
+
+    def _backdate(self, obj, day):
+        created_at = timezone.make_aware(datetime.combine(day, time(12, 0)))
+        type(obj).objects.filter(id=obj.id).update(created_at=created_at)
+
+    def _fill_sprint(self, sprint, tasks_count):
+        for i in range(tasks_count):
+            task = Task.objects.create(
+                title=f'Task {i}', description='...', project=self.project, sprint=sprint, assignee=self.dev
+            )
+            bug = BugReport.objects.create(
+                title=f'Bug {i}', description='...', project=self.project, task=task, reporter=self.dev
+            )
+            day = sprint.start_date + timedelta(days=i)
+            self._backdate(task, day)
+            self._backdate(bug, day)
+
+    def _get_timeline(self, sprint):
+        return self.client.get(f'/api/sprints/{sprint.id}/timeline/')
+
+    def test_sprint_with_tasks_cannot_move_to_another_project(self):
+        sprint = self._create_sprint(days=3)
+        other_project = Project.objects.create(
+            name='Beta', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.client.force_authenticate(self.manager)
+
+        self._fill_sprint(sprint, tasks_count=1)
+        response = self.client.patch(f'/api/sprints/{sprint.id}/', {'project': other_project.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('project', response.data)
+        self.assertEqual(Sprint.objects.get(id=sprint.id).project_id, self.project.id)
+
+        sprint.tasks.all().delete()
+        response = self.client.patch(f'/api/sprints/{sprint.id}/', {'project': other_project.id}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_timeline_groups_events_by_day(self):
+        sprint = self._create_sprint(days=5)
+        self._fill_sprint(sprint, tasks_count=2)
+
+        response = self._get_timeline(sprint)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [entry['date'] for entry in response.data],
+            [sprint.start_date, sprint.start_date + timedelta(days=1)]
+        )
+        first_day = response.data[0]
+        self.assertEqual([task['title'] for task in first_day['tasks']], ['Task 0'])
+        self.assertEqual([bug['title'] for bug in first_day['tasks'][0]['bugs']], ['Bug 0'])
+        self.assertEqual([bug['title'] for bug in first_day['bugs']], ['Bug 0'])
+        self.assertEqual(first_day['tasks'][0]['assignee_details']['username'], 'dev')
+
+    def test_timeline_query_count_does_not_depend_on_sprint_length(self):
+        short_sprint = self._create_sprint(days=3)
+        self._fill_sprint(short_sprint, tasks_count=2)
+
+        # Warm up the cached access scope so only the timeline queries are counted
+        self._get_timeline(short_sprint)
+
+        with CaptureQueriesContext(connection) as short_ctx:
+            self._get_timeline(short_sprint)
+
+        long_sprint = self._create_sprint(days=60)
+        self._fill_sprint(long_sprint, tasks_count=20)
+
+        with CaptureQueriesContext(connection) as long_ctx:
+            self._get_timeline(long_sprint)
+
+        self.assertEqual(len(short_ctx), len(long_ctx))
+
+
+class SprintCompletionTests(TestCase):
+    """
+    Tests for the asynchronous sprint completion.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        today = timezone.now().date()
+        self.sprint = Sprint.objects.create(
+            name='Sprint 1', project=self.project, start_date=today, end_date=today, is_active=True
+        )
+        self.next_sprint = Sprint.objects.create(
+            name='Sprint 2', project=self.project, start_date=today, end_date=today
+        )
+
+        for i in range(5):
+            Task.objects.create(
+                title=f'Open {i}', description='...', project=self.project, sprint=self.sprint, story_points=2
+            )
+        Task.objects.create(
+            title='Done', description='...', project=self.project, sprint=self.sprint, status='DONE', story_points=3
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager)
+
+    def _complete(self, **data):
+        # The job is enqueued on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/sprints/{self.sprint.id}/complete/', data, format='json')
+        return response
+
+    @override_settings(SPRINT_COMPLETION_CHUNK_SIZE=2)
+    def test_unfinished_tasks_are_carried_over_in_chunks(self):
+        self.assertEqual(self._complete(next_sprint=self.next_sprint.id).status_code, 202)
+
+        response = self.client.get(f'/api/sprints/{self.sprint.id}/completion/')
+        self.assertEqual(response.data['status'], 'DONE')
+        self.assertEqual((response.data['total_tasks'], response.data['moved_tasks']), (5, 5))
+        self.assertEqual(Task.objects.filter(sprint=self.next_sprint).count(), 5)
+        self.assertEqual(Task.objects.filter(sprint=self.sprint).count(), 1)
+
+        self.sprint.refresh_from_db()
+        self.assertFalse(self.sprint.is_active)
+
+        metrics = response.data['metrics']
+        self.assertEqual((metrics['tasks_total'], metrics['story_points_total']), (6, 13))
+        self.assertEqual(metrics['story_points_done'], 3)
+
+    def test_progress_is_exposed_for_polling(self):
+        self.assertEqual(self.client.get(f'/api/sprints/{self.sprint.id}/completion/').status_code, 404)
+
+        self._complete()
+
+        response = self.client.get(f'/api/sprints/{self.sprint.id}/completion/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['moved_tasks'], 5)
+        self.assertEqual(Task.objects.filter(sprint=None).count(), 5)
+
+    def test_in_flight_completion_is_returned_instead_of_a_new_one(self):
+        first = self.client.post(f'/api/sprints/{self.sprint.id}/complete/', {}, format='json')
+        second = self.client.post(f'/api/sprints/{self.sprint.id}/complete/', {}, format='json')
+
+        self.assertEqual(first.data['status'], 'PENDING')
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertEqual(SprintCompletion.objects.count(), 1)
+
+    def test_tasks_finished_during_the_carry_over_stay_in_the_sprint(self):
+        finished = Task.objects.filter(sprint=self.sprint).exclude(status='DONE').first()
+
+        def finish_then_update(queryset, **changes):
+            # A user completes a task between the id selection and the update
+            Task.objects.filter(id=finished.id).update(status='DONE')
+            return update_tasks(queryset, **changes)
+
+        with patch('sprints.tasks.update_tasks', side_effect=finish_then_update):
+            self._complete(next_sprint=self.next_sprint.id)
+
+        finished.refresh_from_db()
+        self.assertEqual((finished.sprint_id, finished.status), (self.sprint.id, 'DONE'))
+        self.assertEqual(Task.objects.filter(sprint=self.next_sprint).count(), 4)
+
+    def test_next_sprint_must_belong_to_the_same_project(self):
+        other_project = Project.objects.create(
+            name='Beta', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        foreign_sprint = Sprint.objects.create(
+            name='Sprint B', project=other_project, start_date=self.sprint.start_date, end_date=self.sprint.end_date
+        )
+
+        self.assertEqual(self._complete(next_sprint=foreign_sprint.id).status_code, 400)
+        self.assertEqual(self._complete(next_sprint=self.sprint.id).status_code, 400)
+        self.assertFalse(SprintCompletion.objects.exists())
@@ -1,4 +1,8 @@
-from datetime import timedelta, date
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
 
 from rest_framework import viewsets, filters, status
 from rest_framework.response import Response
@@ -9,16 +13,22 @@ from django_filters.rest_framework import DjangoFilterBackend
 
 from common.pagination import StandardResultsSetPagination
 from common.permissions import IsProjectManager, IsProjectParticipant
-from common.mixins import ProjectRelatedQuerySetMixin
+from common.mixins import (
+    CachedResponseMixin, ProjectRelatedQuerySetMixin, SerializerOptimizedQuerySetMixin, optimize_queryset
+)
 
 from tasks.models import Task, BugReport
 from tasks.serializers import TaskSerializer, BugReportSerializer
 
-from .models import Sprint
-from .serializers import SprintSerializer
+from .models import Sprint, SprintCompletion
+from .serializers import SprintSerializer, SprintCompletionSerializer
+from .tasks import complete_sprint_task
 
 
-class SprintViewSet(ProjectRelatedQuerySetMixin, viewsets.ModelViewSet):
+class SprintViewSet(CachedResponseMixin,
+                    SerializerOptimizedQuerySetMixin,
+                    ProjectRelatedQuerySetMixin,
+                    viewsets.ModelViewSet):
     """
     API endpoint for managing Sprints.
 
@@ -48,24 +58,45 @@ class SprintViewSet(ProjectRelatedQuerySetMixin, viewsets.ModelViewSet):
     def complete(self, request, pk=None):
         """
         Closing a sprint.
+        Unfinished tasks are moved by a background job; returns the completion to poll.
+        A completion already in flight for the sprint is returned instead of a new one.
         """
         sprint = self.get_object()
 
         if not (request.user.role == 'PM' or request.user.role == 'ADMIN'):
             return Response({"detail": "Only PM can complete sprints."}, status=status.HTTP_403_FORBIDDEN)
 
-        unfinished_tasks = sprint.tasks.exclude(status__in=['DONE', 'CLOSED'])
-        count = unfinished_tasks.count()
+        with transaction.atomic():
+            # The sprint row lock serializes concurrent requests, so only one starts a completion
+            sprint = Sprint.objects.select_for_update().get(pk=sprint.pk)
+
+            in_flight = sprint.completions.filter(
+                status__in=[SprintCompletion.Status.PENDING, SprintCompletion.Status.RUNNING]
+            ).first()
+            if in_flight:
+                return Response(SprintCompletionSerializer(in_flight).data, status=status.HTTP_202_ACCEPTED)
 
-        unfinished_tasks.update(sprint=None)
+            serializer = SprintCompletionSerializer(data=request.data, context={'sprint': sprint})
+            serializer.is_valid(raise_exception=True)
+            completion = serializer.save(sprint=sprint, requested_by=request.user)
 
-        sprint.is_active = False
-        sprint.save()
+            transaction.on_commit(lambda: complete_sprint_task.delay(completion.id))
 
-        return Response({
-            'status': 'Sprint completed',
-            'moved_tasks_count': count
-        })
+        completion.refresh_from_db()
+        return Response(SprintCompletionSerializer(completion).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def completion(self, request, pk=None):
+        """
+        Progress of the latest completion of the sprint.
+        """
+        sprint = self.get_object()
+        completion = sprint.completions.first()
+
+        if completion is None:
+            return Response({"detail": "Sprint has not been completed."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(SprintCompletionSerializer(completion).data)
 
     @action(detail=True, methods=['get'])
     def timeline(self, request, pk=None):
@@ -76,27 +107,37 @@ class SprintViewSet(ProjectRelatedQuerySetMixin, viewsets.ModelViewSet):
         start = sprint.start_date
         end = sprint.end_date or date.today()
 
-        timeline_data = []
+        sprint_tasks = optimize_queryset(
+            Task.objects.filter(
+                sprint=sprint,
+                created_at__date__range=(start, end)
+            ).order_by('created_at', 'id'),
+            TaskSerializer()
+        )
+
+        sprint_bugs = optimize_queryset(
+            BugReport.objects.filter(
+                project_id=sprint.project_id,
+                created_at__date__range=(start, end)
+            ),
+            BugReportSerializer()
+        )
+
+        tasks_by_day = defaultdict(list)
+        for task in sprint_tasks:
+            tasks_by_day[timezone.localdate(task.created_at)].append(task)
+
+        bugs_by_day = defaultdict(list)
+        for bug in sprint_bugs:
+            bugs_by_day[timezone.localdate(bug.created_at)].append(bug)
 
-        delta = end - start
-        for i in range(delta.days + 1):
-            day = start + timedelta(days=i)
+        timeline_data = []
 
-            day_tasks = Task.objects.filter(
-                sprint=sprint,
-                created_at__date=day
-            )
-
-            day_bugs = BugReport.objects.filter(
-                project=sprint.project,
-                created_at__date=day
-            )
-
-            if day_tasks.exists() or day_bugs.exists():
-                timeline_data.append({
-                    "date": day,
-                    "tasks": TaskSerializer(day_tasks, many=True).data,
-                    "bugs": BugReportSerializer(day_bugs, many=True).data
-                })
+        for day in sorted(tasks_by_day.keys() | bugs_by_day.keys()):
+            timeline_data.append({
+                "date": day,
+                "tasks": TaskSerializer(tasks_by_day[day], many=True).data,
+                "bugs": BugReportSerializer(bugs_by_day[day], many=True).data
+            })
 
         return Response(timeline_data)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Task, BugReport
+from .models import Task, BugReport, ImportJob
 
 admin.site.register(Task)
 admin.site.register(BugReport)
+admin.site.register(ImportJob)
@@ -0,0 +1,210 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from common.events import publish_changes
+from projects.models import Project
+from reports.stats import task_state, record_task_changes
+from reports.versions import bump_data_version
+from sprints.models import Sprint
+from .models import BugReport, Task
+from .serializers import TaskBulkItemSerializer
+
+User = get_user_model()
+
+# Serializer field -> model attribute for relations passed by id
+RELATION_FIELDS = {'project': 'project_id', 'sprint': 'sprint_id', 'assignee': 'assignee_id'}
+
+
+class BulkRequestError(Exception):
+    """
+    The request as a whole is malformed (not a list, too many items).
+    """
+
+
+def _check_batch(items):
+    if not isinstance(items, list):
+        raise BulkRequestError("Expected a list of items.")
+    if len(items) > settings.TASK_BULK_MAX_ITEMS:
+        raise BulkRequestError(f"A batch may contain at most {settings.TASK_BULK_MAX_ITEMS} items.")
+
+
+def _to_model_values(data):
+    return {RELATION_FIELDS.get(name, name): value for name, value in data.items() if name != 'id'}
+
+
+def _load_references(values_list, moved_task_ids=()):
+    """
+    Resolves every project, sprint and user referenced by the batch with one query each,
+    and the projects of the bug reports of tasks moved to another project.
+    """
+    project_ids = {values['project_id'] for values in values_list}
+    sprint_ids = {values['sprint_id'] for values in values_list if values.get('sprint_id')}
+    user_ids = {values['assignee_id'] for values in values_list if values.get('assignee_id')}
+
+    bug_projects = defaultdict(set)
+    moved_bugs = BugReport.objects.filter(task_id__in=moved_task_ids).values_list('task_id', 'project_id')
+    for task_id, project_id in moved_bugs:
+        bug_projects[task_id].add(project_id)
+
+    return {
+        'projects': set(Project.objects.filter(id__in=project_ids).values_list('id', flat=True)),
+        'sprints': dict(Sprint.objects.filter(id__in=sprint_ids).values_list('id', 'project_id')),
+        'users': set(User.objects.filter(id__in=user_ids).values_list('id', flat=True)),
+        'bug_projects': bug_projects,
+    }
+
+
+def check_references(values, references, allowed_project_ids, task=None):
+    """
+    Same integrity rules as Task.clean(), compared by FK ids against the maps
+    of _load_references() (or tasks.imports.ReferenceMaps for imports).
+    `task` is the stored task an update applies to.
+    """
+    errors = {}
+    project_id = values['project_id']
+
+    if project_id not in references['projects'] or (
+            allowed_project_ids is not None and project_id not in allowed_project_ids):
+        errors['project'] = ["Invalid project."]
+    elif task is not None and references['bug_projects'][task.id] - {project_id}:
+        errors['project'] = ["A task with bug reports cannot be moved to another project."]
+
+    sprint_id = values.get('sprint_id')
+    if sprint_id and references['sprints'].get(sprint_id) != project_id:
+        errors['sprint'] = ["Sprint must belong to the same project as the task."]
+
+    assignee_id = values.get('assignee_id')
+    if assignee_id and assignee_id not in references['users']:
+        errors['assignee'] = ["Invalid user."]
+
+    return errors
+
+
+def _collect_errors(errors_by_index):
+    return [{'index': index, 'errors': errors} for index, errors in sorted(errors_by_index.items()) if errors]
+
+
+def _validate_items(items, partial):
+    serializer = TaskBulkItemSerializer(data=items, many=True, partial=partial)
+    if serializer.is_valid():
+        return serializer.validated_data, {}
+    return None, dict(enumerate(serializer.errors))
+
+
+def _record_changes(changes):
+    record_task_changes(changes)
+    bump_data_version(*{state[0] for pair in changes for state in pair if state})
+
+
+def bulk_create_tasks(items, allowed_project_ids=None):
+    """
+    Validates and inserts a batch of tasks in one transaction.
+
+    `allowed_project_ids` is the user's accessible project set (None for full access).
+    Returns (tasks, errors); nothing is written if any item is invalid.
+    """
+    _check_batch(items)
+
+    validated, errors = _validate_items(items, partial=False)
+    if errors:
+        return [], _collect_errors(errors)
+
+    values_list = [_to_model_values(data) for data in validated]
+    references = _load_references(values_list)
+
+    errors = {
+        index: check_references(values, references, allowed_project_ids)
+        for index, values in enumerate(values_list)
+    }
+    if any(errors.values()):
+        return [], _collect_errors(errors)
+
+    tasks = [Task(**values) for values in values_list]
+
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks)
+        _record_changes([(None, task_state(task)) for task in tasks])
+        publish_changes('tasks.created', tasks)
+
+    return tasks, []
+
+
+def bulk_update_tasks(items, allowed_project_ids=None):
+    """
+    Validates and applies partial updates to a batch of tasks (each item carries `id`)
+    with a single bulk_update in one transaction.
+
+    Returns (tasks, errors); nothing is written if any item is invalid.
+    """
+    _check_batch(items)
+
+    validated, errors = _validate_items(items, partial=True)
+    if errors:
+        return [], _collect_errors(errors)
+
+    ids = [data.get('id') for data in validated]
+    existing = Task.objects.defer('search_vector').in_bulk([task_id for task_id in ids if task_id])
+
+    errors = {}
+    seen = set()
+    for index, task_id in enumerate(ids):
+        task = existing.get(task_id)
+        if task_id is None:
+            errors[index] = {'id': ["This field is required."]}
+        elif task_id in seen:
+            errors[index] = {'id': ["Duplicate task in batch."]}
+        elif task is None or (allowed_project_ids is not None and task.project_id not in allowed_project_ids):
+            errors[index] = {'id': ["Not found."]}
+        seen.add(task_id)
+
+    if errors:
+        return [], _collect_errors(errors)
+
+    merged = []
+    for data in validated:
+        task = existing[data['id']]
+        changed = _to_model_values(data)
+        values = {
+            'project_id': task.project_id,
+            'sprint_id': task.sprint_id,
+            'assignee_id': task.assignee_id,
+            **changed,
+        }
+        merged.append((task, values, changed))
+
+    moved_task_ids = [task.id for task, values, _ in merged if values['project_id'] != task.project_id]
+    references = _load_references([values for _, values, _ in merged], moved_task_ids)
+    errors = {
+        index: check_references(values, references, allowed_project_ids, task)
+        for index, (task, values, _) in enumerate(merged)
+    }
+    if any(errors.values()):
+        return [], _collect_errors(errors)
+
+    now = timezone.now()
+    fields = {'updated_at'}
+    changes = []
+
+    for task, _, changed in merged:
+        old_state = task._stats_state
+        for name, value in changed.items():
+            setattr(task, name, value)
+        task.updated_at = now
+        fields.update(changed)
+        changes.append((old_state, task_state(task)))
+
+    tasks = [task for task, _, _ in merged]
+
+    with transaction.atomic():
+        Task.objects.bulk_update(tasks, sorted(fields))
+        _record_changes(changes)
+        publish_changes('tasks.updated', tasks)
+
+    for task, (_, new_state) in zip(tasks, changes):
+        task._stats_state = new_state
+
+    return tasks, []
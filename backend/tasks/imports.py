@@ -0,0 +1,253 @@
+import csv
+import io
+import json
+import tempfile
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import serializers
+
+from common.access import get_accessible_project_ids, has_full_access
+from common.events import publish_changes
+from projects.models import Project
+from reports.stats import bug_state, task_state, record_bug_changes, record_task_changes
+from reports.versions import bump_data_version
+from sprints.models import Sprint
+from .bulk import RELATION_FIELDS, check_references
+from .models import Task, BugReport, ImportJob
+from .serializers import TaskBulkItemSerializer, BugBulkItemSerializer
+
+User = get_user_model()
+
+BUG_RELATION_FIELDS = {'project': 'project_id', 'task': 'task_id', 'reporter': 'reporter_id'}
+
+
+def read_rows(stream, file_format):
+    """
+    Yields (line_number, row, error) from a binary CSV or JSONL stream, one row at a time.
+    Empty CSV cells are treated as missing values.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if file_format == ImportJob.Format.CSV:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {name: value for name, value in row.items() if name and value != ''}, None
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, None, {'non_field_errors': ["Invalid JSON."]}
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, {'non_field_errors': ["Expected a JSON object."]}
+            continue
+        yield line_number, row, None
+
+
+class ReferenceMaps:
+    """
+    Projects, sprints, tasks and users referenced by the import, loaded once per id
+    with one query per relation and batch, in the shape tasks.bulk.check_references() expects.
+    """
+
+    def __init__(self):
+        self.maps = {'projects': set(), 'sprints': {}, 'tasks': {}, 'users': set()}
+        self._queried = defaultdict(set)
+
+    def _missing(self, name, ids):
+        ids = {value for value in ids if value} - self._queried[name]
+        self._queried[name].update(ids)
+        return ids
+
+    def load(self, values_list):
+        project_ids = self._missing('projects', (values.get('project_id') for values in values_list))
+        sprint_ids = self._missing('sprints', (values.get('sprint_id') for values in values_list))
+        task_ids = self._missing('tasks', (values.get('task_id') for values in values_list))
+        user_ids = self._missing('users', (
+            values.get('assignee_id') or values.get('reporter_id') for values in values_list
+        ))
+
+        if project_ids:
+            self.maps['projects'].update(Project.objects.filter(id__in=project_ids).values_list('id', flat=True))
+        if sprint_ids:
+            self.maps['sprints'].update(Sprint.objects.filter(id__in=sprint_ids).values_list('id', 'project_id'))
+        if task_ids:
+            self.maps['tasks'].update(Task.objects.filter(id__in=task_ids).values_list('id', 'project_id'))
+        if user_ids:
+            self.maps['users'].update(User.objects.filter(id__in=user_ids).values_list('id', flat=True))
+
+        return self.maps
+
+
+def _check_bug_references(values, references, allowed_project_ids):
+    """
+    Same integrity rules as BugReport.clean(), compared by FK ids.
+    """
+    errors = {}
+    project_id = values['project_id']
+
+    if project_id not in references['projects'] or (
+            allowed_project_ids is not None and project_id not in allowed_project_ids):
+        errors['project'] = ["Invalid project."]
+
+    task_id = values.get('task_id')
+    if task_id and references['tasks'].get(task_id) != project_id:
+        errors['task'] = ["Linked task must belong to the same project as the bug report."]
+
+    if values['reporter_id'] not in references['users']:
+        errors['reporter'] = ["Invalid user."]
+
+    return errors
+
+
+IMPORT_KINDS = {
+    ImportJob.Kind.TASKS: {
+        'model': Task,
+        'serializer': TaskBulkItemSerializer,
+        'relations': RELATION_FIELDS,
+        'check': check_references,
+        'state': task_state,
+        'record': record_task_changes,
+        'event': 'tasks.created',
+    },
+    ImportJob.Kind.BUGS: {
+        'model': BugReport,
+        'serializer': BugBulkItemSerializer,
+        'relations': BUG_RELATION_FIELDS,
+        'check': _check_bug_references,
+        'state': bug_state,
+        'record': record_bug_changes,
+        'event': 'bugs.created',
+    },
+}
+
+
+def _import_batch(kind, batch, defaults, forced, references, allowed_project_ids):
+    """
+    Validates one batch in memory and inserts its valid rows in one transaction.
+    Returns (created_count, rejections).
+    """
+    config = IMPORT_KINDS[kind]
+    item_serializer = config['serializer']()
+    rejections = []
+    valid = []
+
+    for line_number, row, error in batch:
+        if error:
+            rejections.append({'line': line_number, 'row': row, 'errors': error})
+            continue
+        try:
+            data = item_serializer.run_validation({**defaults, **row, **forced})
+        except serializers.ValidationError as exc:
+            rejections.append({'line': line_number, 'row': row, 'errors': exc.detail})
+            continue
+        values = {config['relations'].get(name, name): value for name, value in data.items()}
+        valid.append((line_number, row, values))
+
+    maps = references.load([values for _, _, values in valid])
+
+    objects = []
+    for line_number, row, values in valid:
+        errors = config['check'](values, maps, allowed_project_ids)
+        if errors:
+            rejections.append({'line': line_number, 'row': row, 'errors': errors})
+        else:
+            objects.append(config['model'](**values))
+
+    if objects:
+        with transaction.atomic():
+            config['model'].objects.bulk_create(objects)
+            config['record']([(None, config['state'](obj)) for obj in objects])
+            bump_data_version(*{obj.project_id for obj in objects})
+            publish_changes(config['event'], objects)
+
+    return len(objects), rejections
+
+
+def import_rows(rows, kind, defaults=None, allowed_project_ids=None, batch_size=None,
+                rejects=None, on_progress=None, forced=None):
+    """
+    Imports (line_number, row, error) tuples from read_rows() in batches of
+    `batch_size` (TASK_IMPORT_BATCH_SIZE by default).
+
+    `defaults` fill fields a row does not name, `forced` fields override the
+    row (e.g. the reporter of bugs imported by a user).
+
+    Unlike the bulk endpoints a bad row does not fail the import: it is
+    written to the binary `rejects` stream as a JSONL line with its errors.
+    `on_progress(created, rejected)` is called after every batch.
+    Returns (created_count, rejected_count).
+    """
+    batch_size = batch_size or settings.TASK_IMPORT_BATCH_SIZE
+    defaults = defaults or {}
+    forced = forced or {}
+    references = ReferenceMaps()
+    rows = iter(rows)
+    created = rejected = 0
+
+    while batch := list(islice(rows, batch_size)):
+        batch_created, rejections = _import_batch(kind, batch, defaults, forced, references, allowed_project_ids)
+        created += batch_created
+        rejected += len(rejections)
+
+        if rejects is not None:
+            for rejection in rejections:
+                rejects.write((json.dumps(rejection, ensure_ascii=False) + '\n').encode())
+
+        if on_progress:
+            on_progress(batch_created, len(rejections))
+
+    return created, rejected
+
+
+def run_import_job(job):
+    """
+    Runs an ImportJob, updating its counters after every batch so progress can be polled.
+    Rows are scoped to the projects the job's creator can access, and bugs are
+    reported by the creator whatever the rows say, as on BugReportViewSet.
+    """
+    user = job.created_by
+    allowed_project_ids = None if user is None or has_full_access(user) else get_accessible_project_ids(user)
+
+    defaults = {}
+    if job.project_id:
+        defaults['project'] = job.project_id
+    forced = {}
+    if job.kind == ImportJob.Kind.BUGS and user is not None:
+        forced['reporter'] = user.id
+
+    def on_progress(created, rejected):
+        ImportJob.objects.filter(id=job.id).update(
+            created_count=F('created_count') + created, rejected_count=F('rejected_count') + rejected
+        )
+
+    ImportJob.objects.filter(id=job.id).update(status=ImportJob.Status.RUNNING)
+
+    try:
+        with job.source.open('rb') as source, tempfile.TemporaryFile() as rejects:
+            created, rejected = import_rows(
+                read_rows(source, job.file_format), job.kind, defaults, allowed_project_ids,
+                rejects=rejects, on_progress=on_progress, forced=forced
+            )
+            if rejected:
+                rejects.seek(0)
+                job.rejects.save(f'import_{job.id}_rejects.jsonl', File(rejects), save=False)
+    except Exception:
+        ImportJob.objects.filter(id=job.id).update(status=ImportJob.Status.FAILED, finished_at=timezone.now())
+        raise
+
+    ImportJob.objects.filter(id=job.id).update(
+        status=ImportJob.Status.DONE, rejects=job.rejects.name or '', finished_at=timezone.now()
+    )
+    return created, rejected
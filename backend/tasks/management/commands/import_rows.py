@@ -0,0 +1,98 @@
+"""
+Django command to import tasks or bug reports from a CSV or JSONL file
+"""
+import time
+from pathlib import Path
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.models import Project
+from users.models import User
+from tasks.imports import import_rows, read_rows
+from tasks.models import ImportJob
+from tasks.tasks import import_rows_task
+
+
+class Command(BaseCommand):
+    """
+    Streams the file in batches of --batch-size rows, each validated against
+    preloaded project/sprint/task/user maps and written with bulk_create.
+    Rejected rows are written as JSONL to --rejects (default: <file>.rejects.jsonl).
+    With --async the file is stored as an ImportJob and imported by a Celery worker.
+    """
+    help = "Imports tasks or bug reports from a CSV or JSONL file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['tasks', 'bugs'])
+        parser.add_argument('path', help='CSV or JSONL file to import')
+        parser.add_argument('--format', dest='file_format', choices=ImportJob.Format.values,
+                            help='File format, inferred from the extension by default')
+        parser.add_argument('--batch-size', type=int, help='Rows per bulk_create batch')
+        parser.add_argument('--rejects', help='Where to write rejected rows')
+        parser.add_argument('--project', type=int, help='Project id for rows that do not name one')
+        parser.add_argument('--reporter',
+                            help='Username used as reporter for bug rows that do not name one '
+                                 '(for every row with --async, as for uploads)')
+        parser.add_argument('--async', dest='run_async', action='store_true',
+                            help='Enqueue the import on Celery instead of running it here')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.is_file():
+            raise CommandError(f'{path} does not exist.')
+
+        file_format = options['file_format'] or ImportJob.guess_format(path.name)
+        if file_format is None:
+            raise CommandError('Cannot infer the file format, pass --format.')
+
+        kind = ImportJob.Kind.TASKS if options['kind'] == 'tasks' else ImportJob.Kind.BUGS
+
+        reporter = None
+        if options['reporter']:
+            reporter = User.objects.filter(username=options['reporter']).first()
+            if reporter is None:
+                raise CommandError(f'User {options["reporter"]} does not exist.')
+
+        if options['run_async']:
+            self._enqueue(path, kind, file_format, options['project'], reporter)
+            return
+
+        defaults = {}
+        if options['project']:
+            defaults['project'] = options['project']
+        if reporter and kind == ImportJob.Kind.BUGS:
+            defaults['reporter'] = reporter.id
+
+        rejects_path = Path(options['rejects'] or f'{path}.rejects.jsonl')
+        started = time.perf_counter()
+
+        def on_progress(created, rejected):
+            self.stdout.write(f'  +{created} imported, +{rejected} rejected')
+
+        with path.open('rb') as source, rejects_path.open('wb') as rejects:
+            created, rejected = import_rows(
+                read_rows(source, file_format), kind, defaults,
+                batch_size=options['batch_size'], rejects=rejects, on_progress=on_progress
+            )
+
+        if not rejected:
+            rejects_path.unlink()
+
+        elapsed = time.perf_counter() - started
+        rate = (created + rejected) / elapsed * 60 if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {created} row(s), rejected {rejected} in {elapsed:.1f}s ({rate:.0f} rows/min).'
+        ))
+        if rejected:
+            self.stdout.write(self.style.WARNING(f'Rejected rows written to {rejects_path}'))
+
+    def _enqueue(self, path, kind, file_format, project_id, reporter):
+        project = Project.objects.filter(id=project_id).first() if project_id else None
+
+        with path.open('rb') as source:
+            job = ImportJob(kind=kind, file_format=file_format, project=project, created_by=reporter)
+            job.source.save(path.name, File(source), save=True)
+
+        import_rows_task.delay(job.id)
+        self.stdout.write(self.style.SUCCESS(f'Enqueued import job {job.id}.'))
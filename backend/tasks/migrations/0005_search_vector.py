@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:40
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_TABLES = ('tasks_task', 'tasks_bugreport')
+
+CREATE_SQL = """
+CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {table}_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON {table}
+    FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update();
+
+UPDATE {table} SET search_vector =
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B');
+
+CREATE INDEX {table}_search_vector_gin ON {table} USING gin (search_vector);
+"""
+
+DROP_SQL = """
+DROP INDEX IF EXISTS {table}_search_vector_gin;
+DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table};
+DROP FUNCTION IF EXISTS {table}_search_vector_update();
+"""
+
+
+def create_search_triggers(apps, schema_editor):
+    """
+    The trigger and GIN index are PostgreSQL-only; other backends keep an unused column
+    and fall back to icontains search.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for table in SEARCH_TABLES:
+        schema_editor.execute(CREATE_SQL.format(table=table))
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for table in SEARCH_TABLES:
+        schema_editor.execute(DROP_SQL.format(table=table))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_created_at_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bugreport',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
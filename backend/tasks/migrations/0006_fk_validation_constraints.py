@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+# (table, FK column, referenced table) whose referenced row must share project_id
+PROJECT_RULES = (
+    ('tasks_task', 'sprint_id', 'sprints_sprint'),
+    ('tasks_bugreport', 'task_id', 'tasks_task'),
+)
+
+CREATE_SQL = """
+CREATE OR REPLACE FUNCTION {table}_same_project_check() RETURNS trigger AS $$
+BEGIN
+    IF NEW.{column} IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM {target} WHERE id = NEW.{column} AND project_id = NEW.project_id
+    ) THEN
+        RAISE EXCEPTION '{table}.{column} must reference a row of the same project'
+            USING ERRCODE = 'integrity_constraint_violation';
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE CONSTRAINT TRIGGER {table}_same_project_trigger
+    AFTER INSERT OR UPDATE OF project_id, {column} ON {table}
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION {table}_same_project_check();
+"""
+
+DROP_SQL = """
+DROP TRIGGER IF EXISTS {table}_same_project_trigger ON {table};
+DROP FUNCTION IF EXISTS {table}_same_project_check();
+"""
+
+
+def create_project_triggers(apps, schema_editor):
+    """
+    Constraint triggers are PostgreSQL-only; other backends rely on Model.clean().
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for table, column, target in PROJECT_RULES:
+        schema_editor.execute(CREATE_SQL.format(table=table, column=column, target=target))
+
+
+def drop_project_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for table, column, target in PROJECT_RULES:
+        schema_editor.execute(DROP_SQL.format(table=table))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_initial'),
+        ('sprints', '0001_initial'),
+        ('tasks', '0005_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='bugreport',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', ['NEW', 'CONFIRMED', 'IN_PROGRESS', 'FIXED', 'CLOSED'])), name='bug_status_valid'),
+        ),
+        migrations.AddConstraint(
+            model_name='bugreport',
+            constraint=models.CheckConstraint(condition=models.Q(('priority__in', ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])), name='bug_priority_valid'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', ['NEW', 'IN_PROGRESS', 'REVIEW', 'TESTING', 'DONE', 'CLOSED'])), name='task_status_valid'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.CheckConstraint(condition=models.Q(('priority__in', ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])), name='task_priority_valid'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.CheckConstraint(condition=models.Q(('story_points__in', [1, 2, 3, 5, 8, 13, 21])), name='task_story_points_valid'),
+        ),
+        migrations.RunPython(create_project_triggers, drop_project_triggers),
+    ]
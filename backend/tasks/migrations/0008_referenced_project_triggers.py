@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# (table, FK column, referenced table) of migration 0006: moving a referenced
+# row to another project must not leave rows of the old project pointing at it
+PROJECT_RULES = (
+    ('tasks_task', 'sprint_id', 'sprints_sprint'),
+    ('tasks_bugreport', 'task_id', 'tasks_task'),
+)
+
+CREATE_SQL = """
+CREATE OR REPLACE FUNCTION {table}_{column}_target_check() RETURNS trigger AS $$
+BEGIN
+    IF NEW.project_id IS DISTINCT FROM OLD.project_id AND EXISTS (
+        SELECT 1 FROM {table} WHERE {column} = NEW.id AND project_id <> NEW.project_id
+    ) THEN
+        RAISE EXCEPTION '{target}.project_id must match the project of {table} rows referencing it'
+            USING ERRCODE = 'integrity_constraint_violation';
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE CONSTRAINT TRIGGER {table}_{column}_target_trigger
+    AFTER UPDATE OF project_id ON {target}
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION {table}_{column}_target_check();
+"""
+
+DROP_SQL = """
+DROP TRIGGER IF EXISTS {table}_{column}_target_trigger ON {target};
+DROP FUNCTION IF EXISTS {table}_{column}_target_check();
+"""
+
+
+def create_target_triggers(apps, schema_editor):
+    """
+    Constraint triggers are PostgreSQL-only; other backends rely on Model.clean().
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for table, column, target in PROJECT_RULES:
+        schema_editor.execute(CREATE_SQL.format(table=table, column=column, target=target))
+
+
+def drop_target_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for table, column, target in PROJECT_RULES:
+        schema_editor.execute(DROP_SQL.format(table=table, column=column, target=target))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sprints', '0002_sprint_completion'),
+        ('tasks', '0007_import_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_target_triggers, drop_target_triggers),
+    ]
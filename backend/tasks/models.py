@@ -1,35 +1,100 @@
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.translation import gettext_lazy as _
+from common.models import ProjectMoveMixin
 from projects.models import Project
 from sprints.models import Sprint
 
+# Existence of these relations is guaranteed by FK constraints, and the check
+# constraints below by the database, so full_clean() does not query for them.
+DB_ENFORCED_FIELDS = ['project', 'sprint', 'assignee', 'task', 'reporter']
 
-class Task(models.Model):
+
+class TaskStatus(models.TextChoices):
+    NEW = "NEW", _("Нова")
+    IN_PROGRESS = "IN_PROGRESS", _("В роботі")
+    CODE_REVIEW = "REVIEW", _("Перевірка коду")
+    TESTING = "TESTING", _("Тестування")
+    DONE = "DONE", _("Виконано")
+    CLOSED = "CLOSED", _("Закрито")
+
+
+class TaskPriority(models.TextChoices):
+    LOW = "LOW", _("Низький")
+    MEDIUM = "MEDIUM", _("Середній")
+    HIGH = "HIGH", _("Високий")
+    CRITICAL = "CRITICAL", _("Критичний")
+
+
+STORY_POINTS_CHOICES = (
+    (1, '1 SP'), (2, '2 SP'), (3, '3 SP'),
+    (5, '5 SP'), (8, '8 SP'), (13, '13 SP'), (21, '21 SP'),
+)
+
+
+class BugStatus(models.TextChoices):
+    NEW = "NEW", _("Новий")
+    CONFIRMED = "CONFIRMED", _("Підтверджено")
+    IN_PROGRESS = "IN_PROGRESS", _("В роботі")
+    FIXED = "FIXED", _("Виправлено")
+    CLOSED = "CLOSED", _("Закрито")
+
+
+class BugPriority(models.TextChoices):
+    LOW = "LOW", _("Низький")
+    MEDIUM = "MEDIUM", _("Середній")
+    HIGH = "HIGH", _("Високий")
+    CRITICAL = "CRITICAL", _("Критичний")
+
+
+def _related_project_id(instance, field_name, related_model):
+    """
+    Project id of a related object, read from the cached instance when present
+    or with a single `values_list` lookup otherwise.
+    """
+    related_id = getattr(instance, f'{field_name}_id')
+    descriptor = getattr(type(instance), field_name)
+
+    if descriptor.is_cached(instance):
+        related = getattr(instance, field_name)
+        if related is not None and related.pk == related_id:
+            return related.project_id
+
+    return related_model.objects.filter(pk=related_id).values_list('project_id', flat=True).first()
+
+
+def validate_without_lookups(instance):
+    """
+    full_clean() without the existence queries of DB_ENFORCED_FIELDS and the
+    database-enforced constraints. Required relations must still be set, and
+    clean() still runs its cross-object checks.
+    """
+    errors = {}
+    for field in instance._meta.concrete_fields:
+        if field.name in DB_ENFORCED_FIELDS and not field.null and getattr(instance, field.attname) is None:
+            errors[field.name] = [ValidationError(field.error_messages['null'], code='null')]
+
+    try:
+        instance.full_clean(exclude=DB_ENFORCED_FIELDS, validate_constraints=False)
+    except ValidationError as exc:
+        errors = exc.update_error_dict(errors)
+
+    if errors:
+        raise ValidationError(errors)
+
+
+class Task(ProjectMoveMixin, models.Model):
     """
     Represents a unit of work.
     Implements Fibonacci story points for complexity estimation.
     """
 
-    class Status(models.TextChoices):
-        NEW = "NEW", _("Нова")
-        IN_PROGRESS = "IN_PROGRESS", _("В роботі")
-        CODE_REVIEW = "REVIEW", _("Перевірка коду")
-        TESTING = "TESTING", _("Тестування")
-        DONE = "DONE", _("Виконано")
-        CLOSED = "CLOSED", _("Закрито")
-
-    class Priority(models.TextChoices):
-        LOW = "LOW", _("Низький")
-        MEDIUM = "MEDIUM", _("Середній")
-        HIGH = "HIGH", _("Високий")
-        CRITICAL = "CRITICAL", _("Критичний")
-
-    STORY_POINTS_CHOICES = (
-        (1, '1 SP'), (2, '2 SP'), (3, '3 SP'),
-        (5, '5 SP'), (8, '8 SP'), (13, '13 SP'), (21, '21 SP'),
-    )
+    Status = TaskStatus
+    Priority = TaskPriority
+    STORY_POINTS_CHOICES = STORY_POINTS_CHOICES
 
     title = models.CharField(max_length=200, verbose_name=_("Заголовок"))
     description = models.TextField(verbose_name=_("Опис"))
@@ -81,6 +146,9 @@ class Task(models.Model):
 
     due_date = models.DateField(null=True, blank=True, verbose_name="Дедлайн")
 
+    # Maintained by a database trigger on PostgreSQL (see migration 0005)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -90,18 +158,34 @@ class Task(models.Model):
         indexes = [
             models.Index(fields=['project', 'status']),
             models.Index(fields=['assignee']),
+            models.Index(fields=['created_at', 'id'], name='task_created_at_id_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=Q(status__in=TaskStatus.values), name='task_status_valid'),
+            models.CheckConstraint(condition=Q(priority__in=TaskPriority.values), name='task_priority_valid'),
+            models.CheckConstraint(
+                condition=Q(story_points__in=[value for value, _ in STORY_POINTS_CHOICES]),
+                name='task_story_points_valid'
+            ),
         ]
 
     def clean(self):
         """
-        Ensure the Task's sprint belongs to the Task's project.
+        Ensure the Task's sprint belongs to the Task's project, and that a task
+        with bug reports stays in their project.
+        Compares FK ids, with at most one lookup of the sprint's project id
+        (and one for bugs when the project changes).
         """
-        if self.sprint and self.sprint.project != self.project:
+        if self.sprint_id and _related_project_id(self, 'sprint', Sprint) != self.project_id:
             raise ValidationError(_("Спринт повинен належати тому ж проєкту, що і задача."))
+        if self.project_changed(self.project_id) and self.referenced_from_other_projects('bugs', self.project_id):
+            raise ValidationError(_("Задачу з баг-репортами не можна перенести в інший проєкт."))
 
     def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+        validate_without_lookups(self)
+        # post_save handlers (ProjectStats) run in the same transaction as the write
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"[{self.project.name}] {self.title}"
@@ -113,18 +197,8 @@ class BugReport(models.Model):
     Can be standalone within a project or linked to a specific Task.
     """
 
-    class Status(models.TextChoices):
-        NEW = "NEW", _("Новий")
-        CONFIRMED = "CONFIRMED", _("Підтверджено")
-        IN_PROGRESS = "IN_PROGRESS", _("В роботі")
-        FIXED = "FIXED", _("Виправлено")
-        CLOSED = "CLOSED", _("Закрито")
-
-    class Priority(models.TextChoices):
-        LOW = "LOW", _("Низький")
-        MEDIUM = "MEDIUM", _("Середній")
-        HIGH = "HIGH", _("Високий")
-        CRITICAL = "CRITICAL", _("Критичний")
+    Status = BugStatus
+    Priority = BugPriority
 
     title = models.CharField(max_length=200, verbose_name=_("Суть помилки"))
     description = models.TextField(verbose_name=_("Детальний опис (Steps to reproduce)"))
@@ -166,6 +240,9 @@ class BugReport(models.Model):
         verbose_name=_("Пріоритет")
     )
 
+    # Maintained by a database trigger on PostgreSQL (see migration 0005)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -175,17 +252,80 @@ class BugReport(models.Model):
         verbose_name = _("Звіт про помилку")
         verbose_name_plural = _("Звіти про помилки")
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='bug_created_at_id_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=Q(status__in=BugStatus.values), name='bug_status_valid'),
+            models.CheckConstraint(condition=Q(priority__in=BugPriority.values), name='bug_priority_valid'),
+        ]
 
     def clean(self):
         """
         Validate cross-reference integrity.
+        Compares FK ids, with at most one lookup of the task's project id.
         """
-        if self.task and self.task.project != self.project:
+        if self.task_id and _related_project_id(self, 'task', Task) != self.project_id:
             raise ValidationError(_("Пов'язана задача повинна належати тому ж проєкту, що і баг-репорт."))
 
     def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+        validate_without_lookups(self)
+        # post_save handlers (ProjectStats) run in the same transaction as the write
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"BUG-{self.id}: {self.title}"
+
+
+class ImportJob(models.Model):
+    """
+    A CSV or JSONL file of tasks or bug reports imported in batches (see tasks.imports).
+    Rejected rows and their errors are collected in `rejects` as JSONL.
+    """
+    class Kind(models.TextChoices):
+        TASKS = "TASKS", _("Задачі")
+        BUGS = "BUGS", _("Звіти про помилки")
+
+    class Format(models.TextChoices):
+        CSV = "csv", "CSV"
+        JSONL = "jsonl", "JSON Lines"
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", _("Очікує")
+        RUNNING = "RUNNING", _("Виконується")
+        DONE = "DONE", _("Завершено")
+        FAILED = "FAILED", _("Помилка")
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    file_format = models.CharField(max_length=10, choices=Format.choices)
+    source = models.FileField(upload_to='imports/')
+    rejects = models.FileField(upload_to='imports/rejects/', blank=True)
+
+    # Used for rows that do not name a project
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, related_name="imports")
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
+
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    created_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    @classmethod
+    def guess_format(cls, filename):
+        """
+        Import format from the file extension, or None if it is not recognised.
+        """
+        extensions = {'.csv': cls.Format.CSV, '.jsonl': cls.Format.JSONL, '.ndjson': cls.Format.JSONL}
+        for extension, file_format in extensions.items():
+            if filename.lower().endswith(extension):
+                return file_format
+        return None
+
+    def __str__(self):
+        return f"{self.get_kind_display()} import {self.id} - {self.get_status_display()}"
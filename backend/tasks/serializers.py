@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Task, BugReport
+from .models import Task, BugReport, ImportJob
 from users.serializers import UserShortSerializer
 
 
@@ -28,3 +28,77 @@ class TaskSerializer(serializers.ModelSerializer):
             'status', 'priority', 'story_points', 'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
+
+    def validate(self, data):
+        """
+        Ensure a task with bug reports is not moved to another project.
+        """
+        project = data.get('project')
+        if self.instance and project and self.instance.project_changed(project.id):
+            if self.instance.referenced_from_other_projects('bugs', project.id):
+                raise serializers.ValidationError(
+                    {'project': "A task with bug reports cannot be moved to another project."}
+                )
+        return data
+
+
+class TaskBulkItemSerializer(serializers.Serializer):
+    """
+    Validates one item of a bulk task request without touching the database.
+    Related objects are passed by id and checked against preloaded maps in tasks.bulk.
+    """
+    id = serializers.IntegerField(required=False)
+    title = serializers.CharField(max_length=200)
+    description = serializers.CharField()
+    project = serializers.IntegerField()
+    sprint = serializers.IntegerField(required=False, allow_null=True)
+    assignee = serializers.IntegerField(required=False, allow_null=True)
+    status = serializers.ChoiceField(choices=Task.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Task.Priority.choices, required=False)
+    story_points = serializers.ChoiceField(choices=Task.STORY_POINTS_CHOICES, required=False)
+    due_date = serializers.DateField(required=False, allow_null=True)
+
+
+class TaskBulkTransitionSerializer(serializers.Serializer):
+    """
+    Moves a set of tasks to another status.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    status = serializers.ChoiceField(choices=Task.Status.choices)
+
+
+class BugBulkItemSerializer(serializers.Serializer):
+    """
+    Bug report counterpart of TaskBulkItemSerializer, used by imports.
+    """
+    title = serializers.CharField(max_length=200)
+    description = serializers.CharField()
+    project = serializers.IntegerField()
+    task = serializers.IntegerField(required=False, allow_null=True)
+    reporter = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=BugReport.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=BugReport.Priority.choices, required=False)
+    is_resolved = serializers.BooleanField(required=False)
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """
+    Upload of an import file; `file_format` is inferred from the file extension when omitted.
+    """
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'kind', 'file_format', 'source', 'rejects', 'project', 'status',
+            'created_count', 'rejected_count', 'created_at', 'finished_at'
+        ]
+        read_only_fields = [
+            'kind', 'rejects', 'status', 'created_count', 'rejected_count', 'created_at', 'finished_at'
+        ]
+        extra_kwargs = {'file_format': {'required': False}}
+
+    def validate(self, data):
+        if not data.get('file_format'):
+            data['file_format'] = ImportJob.guess_format(data['source'].name)
+            if data['file_format'] is None:
+                raise serializers.ValidationError({"file_format": "Cannot infer the format, pass csv or jsonl."})
+        return data
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from common.events import publish
+from .models import Task, BugReport
+
+
+@receiver(post_save, sender=Task)
+def publish_task_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        publish(
+            instance.project_id, 'task.created' if created else 'task.updated',
+            id=instance.pk, sprint=instance.sprint_id
+        )
+
+
+@receiver(post_delete, sender=Task)
+def publish_task_deleted(sender, instance, **kwargs):
+    publish(instance.project_id, 'task.deleted', id=instance.pk, sprint=instance.sprint_id)
+
+
+@receiver(post_save, sender=BugReport)
+def publish_bug_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        publish(instance.project_id, 'bug.created' if created else 'bug.updated', id=instance.pk)
+
+
+@receiver(post_delete, sender=BugReport)
+def publish_bug_deleted(sender, instance, **kwargs):
+    publish(instance.project_id, 'bug.deleted', id=instance.pk)
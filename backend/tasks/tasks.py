@@ -0,0 +1,27 @@
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from .imports import run_import_job
+from .models import ImportJob
+
+
+@shared_task(
+    acks_late=True, reject_on_worker_lost=True,
+    soft_time_limit=settings.IMPORT_TASK_SOFT_TIME_LIMIT, time_limit=settings.IMPORT_TASK_TIME_LIMIT
+)
+def import_rows_task(job_id):
+    try:
+        job = ImportJob.objects.select_related('created_by').get(id=job_id)
+    except ImportJob.DoesNotExist:
+        return "Import job not found"
+
+    if job.status == ImportJob.Status.RUNNING:
+        # Redelivered after the worker died mid-import: committed batches must not be replayed
+        ImportJob.objects.filter(id=job.id).update(status=ImportJob.Status.FAILED, finished_at=timezone.now())
+        return f"Import {job_id} was interrupted"
+    if job.status != ImportJob.Status.PENDING:
+        return f"Import {job_id} already finished"
+
+    created, rejected = run_import_job(job)
+    return f"Import {job_id}: {created} created, {rejected} rejected"
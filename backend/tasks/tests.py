@@ -1,3 +1,608 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import FloatField
+from django.db.models.functions import Cast, Length
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common.filters import FullTextSearchFilter
+from projects.models import Project
+from reports.models import ProjectStats
+from sprints.models import Sprint
+from users.models import User
+
+from .models import DB_ENFORCED_FIELDS, Task, BugReport, ImportJob, validate_without_lookups
+
+
+class TaskListQueryTests(TestCase):
+    """
+    Tests that task and bug list endpoints do not issue per-row queries.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.dev = User.objects.create_user(username='dev', password='password123', role='DEV')
+        self.project = Project.objects.create(
+            name='Alpha',
+            description='Test project',
+            start_date=timezone.now().date(),
+            manager=self.manager
+        )
+        self.project.members.add(self.dev)
+        self.sprint = Sprint.objects.create(
+            name='Sprint 1',
+            project=self.project,
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date()
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.dev)
+
+    def _create_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(
+                title=f'Task {i}', description='...', project=self.project, sprint=self.sprint, assignee=self.dev
+            )
+            BugReport.objects.create(
+                title=f'Bug {i}', description='...', project=self.project, task=task, reporter=self.manager
+            )
+
+    def _count_queries(self, url):
+        # Warm up the cached access scope so only the list queries are counted
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx), response
+
+    def test_task_list_query_count_is_constant(self):
+        self._create_tasks(5)
+        small_page, _ = self._count_queries('/api/tasks/?page_size=100')
+
+        self._create_tasks(95)
+        full_page, response = self._count_queries('/api/tasks/?page_size=100')
+
+        self.assertEqual(len(response.data['results']), 100)
+        self.assertEqual(small_page, full_page)
+
+        task = response.data['results'][0]
+        self.assertEqual(task['assignee_details']['username'], 'dev')
+        self.assertEqual(task['bugs'][0]['reporter_details']['username'], 'pm')
+
+    def test_bug_list_query_count_is_constant(self):
+        self._create_tasks(5)
+        small_page, _ = self._count_queries('/api/bugs/?page_size=100')
+
+        self._create_tasks(95)
+        full_page, response = self._count_queries('/api/bugs/?page_size=100')
+
+        self.assertEqual(len(response.data['results']), 100)
+        self.assertEqual(small_page, full_page)
+
+
+class TaskAccessScopeTests(TestCase):
+    """
+    Tests for row-level security applied by ProjectRelatedQuerySetMixin.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.member = User.objects.create_user(username='dev', password='password123', role='DEV')
+        self.outsider = User.objects.create_user(username='qa', password='password123', role='QA')
+
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.project.members.add(self.member, self.manager)
+        self.other_project = Project.objects.create(
+            name='Beta', description='...', start_date=timezone.now().date(), manager=self.outsider
+        )
+
+        self.task = Task.objects.create(title='Visible', description='...', project=self.project)
+        Task.objects.create(title='Hidden', description='...', project=self.other_project)
+
+        self.client = APIClient()
+
+    def _list_titles(self, user):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/tasks/')
+        self.assertFalse(any('DISTINCT' in query['sql'] for query in ctx))
+        return [task['title'] for task in response.data['results']]
+
+    def test_members_and_managers_see_only_their_projects(self):
+        self.assertEqual(self._list_titles(self.member), ['Visible'])
+        self.assertEqual(self._list_titles(self.manager), ['Visible'])
+        self.assertEqual(self._list_titles(self.outsider), ['Hidden'])
+
+    def test_outsider_cannot_retrieve_foreign_task(self):
+        self.client.force_authenticate(self.outsider)
+        response = self.client.get(f'/api/tasks/{self.task.id}/')
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskCursorPaginationTests(TestCase):
+    """
+    Tests for the opt-in keyset pagination mode.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        for i in range(25):
+            Task.objects.create(title=f'Task {i}', description='...', project=self.project)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager)
+
+    def test_page_number_mode_is_default(self):
+        response = self.client.get('/api/tasks/')
+        self.assertEqual(response.data['count'], 25)
+
+    def test_cursor_mode_walks_all_rows_without_count(self):
+        url = '/api/tasks/?pagination=cursor&page_size=10'
+        seen = []
+
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            self.assertFalse(any('COUNT(' in query['sql'] for query in ctx))
+
+            seen.extend(task['id'] for task in response.data['results'])
+            url = response.data['next']
+
+        expected = list(Task.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+
+class TaskSearchTests(TestCase):
+    """
+    Tests for FullTextSearchFilter (icontains fallback outside PostgreSQL).
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        Task.objects.create(title='Fix login redirect', description='...', project=self.project)
+        Task.objects.create(title='Dashboard', description='Broken login widget', project=self.project)
+        Task.objects.create(title='Unrelated', description='...', project=self.project)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager)
+
+    def test_search_matches_title_and_description(self):
+        response = self.client.get('/api/tasks/?search=login')
+        titles = sorted(task['title'] for task in response.data['results'])
+        self.assertEqual(titles, ['Dashboard', 'Fix login redirect'])
+
+    def _ranked_titles(self, url):
+        # Stands in for the PostgreSQL rank: longer titles rank higher
+        def rank_by_title_length(backend, request, queryset, view):
+            return queryset.annotate(search_rank=Cast(Length('title'), FloatField())).order_by('-search_rank', '-id')
+
+        titles = []
+        with patch.object(FullTextSearchFilter, 'filter_queryset', rank_by_title_length):
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                titles.extend(task['title'] for task in response.data['results'])
+                url = response.data['next']
+        return titles
+
+    def test_ordering_only_breaks_rank_ties(self):
+        self.assertEqual(
+            self._ranked_titles('/api/tasks/?search=x&ordering=created_at'),
+            ['Fix login redirect', 'Dashboard', 'Unrelated']
+        )
+        self.assertEqual(
+            self._ranked_titles('/api/tasks/?search=x&ordering=-created_at'),
+            ['Fix login redirect', 'Unrelated', 'Dashboard']
+        )
+
+    def test_cursor_pages_keep_the_rank_order(self):
+        self.assertEqual(
+            self._ranked_titles('/api/tasks/?search=x&pagination=cursor&page_size=1'),
+            ['Fix login redirect', 'Unrelated', 'Dashboard']
+        )
+
+
+class TaskBulkEndpointTests(TestCase):
+    """
+    Tests for bulk_create, bulk_update and bulk_transition on /api/tasks/.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.dev = User.objects.create_user(username='dev', password='password123', role='DEV')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.project.members.add(self.dev)
+        self.sprint = Sprint.objects.create(
+            name='Sprint 1', project=self.project, start_date=timezone.now().date(), end_date=timezone.now().date()
+        )
+        self.other_project = Project.objects.create(
+            name='Beta', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.foreign_sprint = Sprint.objects.create(
+            name='Sprint B', project=self.other_project,
+            start_date=timezone.now().date(), end_date=timezone.now().date()
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.dev)
+
+    def _item(self, title, **extra):
+        return {'title': title, 'description': '...', 'project': self.project.id, **extra}
+
+    def test_bulk_create_writes_batch_with_constant_queries(self):
+        def create(count):
+            items = [self._item(f'Task {i}', sprint=self.sprint.id, assignee=self.dev.id) for i in range(count)]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post('/api/tasks/bulk_create/', items, format='json')
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(len(response.data), count)
+            return len(ctx)
+
+        create(1)
+        self.assertEqual(create(5), create(50))
+        self.assertEqual(Task.objects.filter(sprint=self.sprint).count(), 56)
+
+    def test_bulk_create_reports_per_item_errors_and_writes_nothing(self):
+        items = [
+            self._item('Valid'),
+            self._item('Wrong sprint', sprint=self.foreign_sprint.id),
+            {'title': 'Foreign', 'description': '...', 'project': self.other_project.id},
+            self._item('Bad status', status='NOPE'),
+        ]
+
+        response = self.client.post('/api/tasks/bulk_create/', items, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [3])
+
+        response = self.client.post('/api/tasks/bulk_create/', items[:3], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            {error['index']: sorted(error['errors']) for error in response.data['errors']},
+            {1: ['sprint'], 2: ['project']}
+        )
+        self.assertFalse(Task.objects.exists())
+
+    def test_bulk_update_and_transition(self):
+        tasks = [Task.objects.create(title=f'T{i}', description='...', project=self.project) for i in range(3)]
+        foreign = Task.objects.create(title='Foreign', description='...', project=self.other_project)
+
+        response = self.client.patch('/api/tasks/bulk_update/', [
+            {'id': task.id, 'sprint': self.sprint.id, 'story_points': 5} for task in tasks
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.filter(sprint=self.sprint, story_points=5).count(), 3)
+
+        response = self.client.post('/api/tasks/bulk_transition/', {
+            'ids': [tasks[0].id, foreign.id], 'status': 'DONE'
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+
+        response = self.client.post('/api/tasks/bulk_transition/', {
+            'ids': [task.id for task in tasks], 'status': 'DONE'
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.filter(status='DONE').count(), 3)
+
+        stats = ProjectStats.objects.get(project=self.project, sprint=self.sprint)
+        self.assertEqual((stats.tasks_done, stats.story_points_done), (3, 15))
+
+
+class TaskValidationTests(TestCase):
+    """
+    Tests for the FK-id based integrity checks on Task and BugReport saves.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.other_project = Project.objects.create(
+            name='Beta', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.sprint = Sprint.objects.create(
+            name='Sprint 1', project=self.project, start_date=timezone.now().date(), end_date=timezone.now().date()
+        )
+        self.task = Task.objects.create(title='Task', description='...', project=self.project)
+
+    def _validation_queries(self, instance):
+        with CaptureQueriesContext(connection) as ctx:
+            validate_without_lookups(instance)
+        return [query['sql'] for query in ctx]
+
+    def test_sprint_check_uses_one_targeted_lookup(self):
+        task = Task(title='New', description='...', project_id=self.project.id, sprint_id=self.sprint.id)
+
+        queries = self._validation_queries(task)
+
+        self.assertEqual(len(queries), 1)
+        self.assertIn('sprints_sprint', queries[0])
+
+    def test_cached_relations_cost_no_queries(self):
+        task = Task(title='New', description='...', project=self.project, sprint=self.sprint)
+        bug = BugReport(title='Bug', description='...', project=self.project, task=self.task, reporter=self.manager)
+
+        self.assertEqual(self._validation_queries(task), [])
+        self.assertEqual(self._validation_queries(bug), [])
+
+    def test_cross_project_references_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            Task.objects.create(title='New', description='...', project=self.other_project, sprint=self.sprint)
+
+        with self.assertRaises(ValidationError):
+            BugReport.objects.create(
+                title='Bug', description='...', project_id=self.other_project.id,
+                task_id=self.task.id, reporter=self.manager
+            )
+
+    def test_missing_required_relations_are_rejected(self):
+        with self.assertRaises(ValidationError) as ctx:
+            BugReport.objects.create(title='Bug', description='...')
+
+        # Checked although their existence lookups are left to the database
+        self.assertLessEqual({'project', 'reporter'}, set(DB_ENFORCED_FIELDS))
+        self.assertEqual(set(ctx.exception.message_dict), {'project', 'reporter'})
+
+    def test_task_with_bugs_stays_in_its_project(self):
+        BugReport.objects.create(
+            title='Bug', description='...', project=self.project, task=self.task, reporter=self.manager
+        )
+        client = APIClient()
+        client.force_authenticate(self.manager)
+
+        response = client.patch(f'/api/tasks/{self.task.id}/', {'project': self.other_project.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('project', response.data)
+
+        response = client.patch(
+            '/api/tasks/bulk_update/', [{'id': self.task.id, 'project': self.other_project.id}], format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('project', response.data['errors'][0]['errors'])
+
+        task = Task.objects.get(id=self.task.id)
+        task.project = self.other_project
+        with self.assertRaises(ValidationError):
+            task.save()
+        self.assertEqual(Task.objects.get(id=self.task.id).project_id, self.project.id)
+
+        # Without bug reports the task may move
+        task.bugs.all().delete()
+        task.save()
+        self.assertEqual(Task.objects.get(id=self.task.id).project_id, self.other_project.id)
+
+    def test_unchanged_project_is_not_checked_against_bugs(self):
+        task = Task.objects.get(id=self.task.id)
+        task.title = 'Renamed'
+        with CaptureQueriesContext(connection) as ctx:
+            validate_without_lookups(task)
+        self.assertEqual(len(ctx), 0)
+
+    def test_sprint_with_tasks_stays_in_its_project(self):
+        Task.objects.create(title='Sprint task', description='...', project=self.project, sprint=self.sprint)
+        sprint = Sprint.objects.get(id=self.sprint.id)
+        sprint.project = self.other_project
+
+        with self.assertRaises(ValidationError):
+            sprint.save()
+        self.assertEqual(Sprint.objects.get(id=self.sprint.id).project_id, self.project.id)
+
+    def test_database_rejects_invalid_choices(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Task.objects.filter(id=self.task.id).update(status='BOGUS')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Task.objects.filter(id=self.task.id).update(story_points=4)
+
+
+class TaskExportTests(TestCase):
+    """
+    Tests for the streaming task and bug exports.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.dev = User.objects.create_user(username='dev', password='password123', role='DEV')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.project.members.add(self.dev)
+        self.foreign_project = Project.objects.create(
+            name='Beta', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        Task.objects.create(title='Foreign', description='...', project=self.foreign_project)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.dev)
+
+    def _create_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(
+                title=f'Task {i}', description='...', project=self.project, assignee=self.dev,
+                status='DONE' if i % 2 else 'NEW'
+            )
+            BugReport.objects.create(
+                title=f'Bug {i}', description='...', project=self.project, task=task, reporter=self.dev
+            )
+
+    def _export(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_is_scoped_and_filtered(self):
+        self._create_tasks(4)
+
+        lines = self._export('/api/tasks/export/?status=DONE').splitlines()
+
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'title', 'description'])
+        self.assertIn('assignee_username', lines[0])
+        self.assertEqual([line.split(',')[1] for line in lines[1:]], ['Task 1', 'Task 3'])
+
+    def test_ndjson_export_of_bugs(self):
+        self._create_tasks(2)
+
+        rows = [json.loads(line) for line in self._export('/api/bugs/export/?export_format=ndjson').splitlines()]
+
+        self.assertEqual(sorted(row['title'] for row in rows), ['Bug 0', 'Bug 1'])
+        self.assertEqual(rows[0]['reporter_username'], 'dev')
+
+    def test_unknown_format_is_rejected(self):
+        self.assertEqual(self.client.get('/api/tasks/export/?export_format=xml').status_code, 400)
+
+    def test_export_query_count_does_not_depend_on_row_count(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                self._export('/api/tasks/export/')
+            return len(ctx)
+
+        self._create_tasks(2)
+        count_queries()
+        small = count_queries()
+
+        self._create_tasks(30)
+        self.assertEqual(count_queries(), small)
+
+
+class TaskImportTests(TestCase):
+    """
+    Tests for the streaming task and bug report import.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.manager = User.objects.create_user(username='pm', password='password123', role='PM')
+        self.dev = User.objects.create_user(username='dev', password='password123', role='DEV')
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+        self.project.members.add(self.dev)
+        self.sprint = Sprint.objects.create(
+            name='Sprint 1', project=self.project, start_date=timezone.now().date(), end_date=timezone.now().date()
+        )
+        self.foreign_project = Project.objects.create(
+            name='Beta', description='...', start_date=timezone.now().date(), manager=self.manager
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.dev)
+
+    def _csv(self, rows):
+        lines = ['title,description,project,sprint,status,story_points']
+        lines += [','.join(str(value) for value in row) for row in rows]
+        return '\n'.join(lines).encode()
+
+    def test_command_imports_valid_rows_and_writes_rejections(self):
+        rows = [(f'Task {i}', '...', self.project.id, self.sprint.id, 'DONE' if i % 2 else 'NEW', 3) for i in range(7)]
+        rows.append(('Bad status', '...', self.project.id, '', 'BOGUS', 3))
+        rows.append(('Wrong sprint', '...', self.foreign_project.id, self.sprint.id, 'NEW', 3))
+
+        path = Path(self.media_root) / 'tasks.csv'
+        path.write_bytes(self._csv(rows))
+
+        call_command('import_rows', 'tasks', str(path), '--batch-size', '3', stdout=StringIO())
+
+        self.assertEqual(Task.objects.filter(sprint=self.sprint).count(), 7)
+        rejects = [json.loads(line) for line in Path(f'{path}.rejects.jsonl').read_text().splitlines()]
+        self.assertEqual([reject['line'] for reject in rejects], [9, 10])
+        self.assertIn('status', rejects[0]['errors'])
+        self.assertIn('sprint', rejects[1]['errors'])
+
+        stats = ProjectStats.objects.get(project=self.project, sprint=self.sprint)
+        self.assertEqual((stats.tasks_done, stats.story_points_total), (3, 21))
+
+    def test_batches_do_not_issue_per_row_queries(self):
+        def run(count):
+            path = Path(self.media_root) / f'tasks_{count}.csv'
+            path.write_bytes(self._csv([(f'T{i}', '...', self.project.id, self.sprint.id, 'NEW', 1) for i in range(count)]))
+            with CaptureQueriesContext(connection) as ctx:
+                call_command('import_rows', 'tasks', str(path), '--batch-size', '100', stdout=StringIO())
+            return len(ctx)
+
+        run(1)
+        self.assertEqual(run(5), run(80))
+
+    def test_upload_endpoint_imports_bugs_as_current_user(self):
+        task = Task.objects.create(title='Task', description='...', project=self.project)
+        lines = [
+            json.dumps({'title': 'Crash', 'description': '...', 'task': task.id, 'priority': 'HIGH'}),
+            'not json',
+            json.dumps({'title': 'Foreign', 'description': '...', 'project': self.foreign_project.id}),
+        ]
+        upload = SimpleUploadedFile('bugs.jsonl', '\n'.join(lines).encode())
+
+        response = self.client.post(
+            '/api/bugs/import/', {'source': upload, 'project': self.project.id}, format='multipart'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created_count'], response.data['rejected_count']), (1, 2))
+        self.assertEqual(BugReport.objects.get().reporter, self.dev)
+        self.assertEqual(ProjectStats.objects.get(project=self.project, sprint=None).bugs_high, 1)
+
+        job = self.client.get(f'/api/imports/{response.data["id"]}/')
+        self.assertEqual(job.data['status'], 'DONE')
+        self.assertTrue(job.data['rejects'])
+
+    def test_uploaded_bugs_cannot_name_another_reporter(self):
+        row = {'title': 'Crash', 'description': '...', 'project': self.project.id, 'reporter': self.manager.id}
+        upload = SimpleUploadedFile('bugs.jsonl', json.dumps(row).encode())
+
+        response = self.client.post('/api/bugs/import/', {'source': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created_count'], 1)
+        self.assertEqual(BugReport.objects.get().reporter, self.dev)
+
+    @override_settings(TASK_IMPORT_INLINE_MAX_BYTES=10)
+    def test_large_upload_is_offloaded_to_celery(self):
+        upload = SimpleUploadedFile('tasks.csv', self._csv([('Task', '...', self.project.id, '', 'NEW', 1)]))
+
+        with patch('tasks.views.import_rows_task.delay') as delay:
+            response = self.client.post('/api/tasks/import/', {'source': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 202)
+        delay.assert_called_once_with(response.data['id'])
+        self.assertEqual(ImportJob.objects.get().status, 'PENDING')
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TaskViewSet, BugReportViewSet
+from .views import TaskViewSet, BugReportViewSet, ImportJobViewSet
 
 router = DefaultRouter()
 router.register(r'tasks', TaskViewSet, basename='task')
 router.register(r'bugs', BugReportViewSet, basename='bug')
+router.register(r'imports', ImportJobViewSet, basename='import')
 
 urlpatterns = [
     path('', include(router.urls)),
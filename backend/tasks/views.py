@@ -1,51 +1,183 @@
-from rest_framework import viewsets, filters
+from django.conf import settings
+
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 from django_filters.rest_framework import DjangoFilterBackend
 
-from common.pagination import StandardResultsSetPagination
+from common.pagination import OptionalCursorPagination, StandardResultsSetPagination
 from common.permissions import IsProjectParticipant
-from common.mixins import ProjectRelatedQuerySetMixin
+from common.filters import FullTextSearchFilter, SearchRankOrderingFilter
+from common.access import get_request_project_ids, has_full_access
+from common.mixins import (
+    CachedResponseMixin, ProjectRelatedQuerySetMixin, SerializerOptimizedQuerySetMixin, StreamingExportMixin,
+    optimize_queryset
+)
+
+from .models import Task, BugReport, ImportJob
+from .bulk import BulkRequestError, bulk_create_tasks, bulk_update_tasks
+from .imports import run_import_job
+from .serializers import TaskSerializer, BugReportSerializer, TaskBulkTransitionSerializer, ImportJobSerializer
+from .tasks import import_rows_task
+
+
+class ImportActionMixin:
+    """
+    Adds an `import` list action accepting a CSV or JSONL upload of `import_kind` rows.
+
+    Small files are imported within the request (201); files larger than
+    TASK_IMPORT_INLINE_MAX_BYTES are handed to a Celery worker (202) and
+    progress is polled on /api/imports/{id}/.
+    """
+    import_kind = None
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        serializer = ImportJobSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save(kind=self.import_kind, created_by=request.user)
+
+        if job.source.size > settings.TASK_IMPORT_INLINE_MAX_BYTES:
+            import_rows_task.delay(job.id)
+            response_status = status.HTTP_202_ACCEPTED
+        else:
+            run_import_job(job)
+            response_status = status.HTTP_201_CREATED
 
-from .models import Task, BugReport
-from .serializers import TaskSerializer, BugReportSerializer
+        job.refresh_from_db()
+        return Response(ImportJobSerializer(job).data, status=response_status)
 
 
-class TaskViewSet(ProjectRelatedQuerySetMixin, viewsets.ModelViewSet):
+class TaskViewSet(StreamingExportMixin,
+                  ImportActionMixin,
+                  CachedResponseMixin,
+                  SerializerOptimizedQuerySetMixin,
+                  ProjectRelatedQuerySetMixin,
+                  viewsets.ModelViewSet):
     """
     Main endpoint for task management.
-    Supports filtering by project/sprint for Kanban boards.
+    Supports filtering by project/sprint for Kanban boards, and streaming export.
     """
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OptionalCursorPagination
 
     permission_classes = [IsAuthenticated, IsProjectParticipant]
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, SearchRankOrderingFilter]
     filterset_fields = ['project', 'sprint', 'status', 'priority', 'assignee']
     search_fields = ['title', 'description']
     ordering_fields = ['priority', 'created_at']
 
+    import_kind = ImportJob.Kind.TASKS
+    export_filename = 'tasks'
+    export_fields = [
+        'id', 'title', 'description', 'project', 'sprint', 'assignee', 'assignee__username',
+        'status', 'priority', 'story_points', 'due_date', 'created_at', 'updated_at'
+    ]
+
+    def _allowed_project_ids(self):
+        """
+        Batch equivalent of IsProjectParticipant: None means unrestricted.
+        """
+        if has_full_access(self.request.user):
+            return None
+        return get_request_project_ids(self.request)
+
+    def _bulk_response(self, bulk_func, items, success_status):
+        try:
+            tasks, errors = bulk_func(items, self._allowed_project_ids())
+        except BulkRequestError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-class BugReportViewSet(ProjectRelatedQuerySetMixin, viewsets.ModelViewSet):
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = optimize_queryset(
+            Task.objects.filter(id__in=[task.id for task in tasks]).order_by('id'),
+            TaskSerializer()
+        )
+        return Response(TaskSerializer(queryset, many=True).data, status=success_status)
+
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """
+        Creates a list of tasks in one transaction.
+        Responds with per-item errors (by index) if any item is invalid.
+        """
+        return self._bulk_response(bulk_create_tasks, request.data, status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['patch'])
+    def bulk_update(self, request):
+        """
+        Partially updates a list of tasks, each item identified by `id`.
+        """
+        return self._bulk_response(bulk_update_tasks, request.data, status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def bulk_transition(self, request):
+        """
+        Moves the tasks listed in `ids` to `status`.
+        """
+        serializer = TaskBulkTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        items = [
+            {'id': task_id, 'status': serializer.validated_data['status']}
+            for task_id in serializer.validated_data['ids']
+        ]
+        return self._bulk_response(bulk_update_tasks, items, status.HTTP_200_OK)
+
+
+class BugReportViewSet(StreamingExportMixin,
+                       ImportActionMixin,
+                       CachedResponseMixin,
+                       SerializerOptimizedQuerySetMixin,
+                       ProjectRelatedQuerySetMixin,
+                       viewsets.ModelViewSet):
     """
     Endpoint for managing QA Bug Reports.
     Bugs are linked to a project and optionally to a task.
     """
     queryset = BugReport.objects.all().order_by('-created_at')
     serializer_class = BugReportSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OptionalCursorPagination
 
     permission_classes = [IsAuthenticated, IsProjectParticipant]
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, SearchRankOrderingFilter]
     filterset_fields = ['project', 'status', 'priority', 'reporter', 'is_resolved']
     search_fields = ['title', 'description']
     ordering_fields = ['priority', 'created_at']
 
+    import_kind = ImportJob.Kind.BUGS
+    export_filename = 'bugs'
+    export_fields = [
+        'id', 'title', 'description', 'project', 'task', 'reporter', 'reporter__username',
+        'status', 'priority', 'is_resolved', 'created_at'
+    ]
+
     def perform_create(self, serializer):
         """
         Automatically assign the current user as the reporter of the bug.
         """
         serializer.save(reporter=self.request.user)
+
+
+class ImportJobViewSet(mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Progress and rejection files of the imports started by the current user.
+    """
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    pagination_class = StandardResultsSetPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if has_full_access(self.request.user):
+            return queryset
+        return queryset.filter(created_by=self.request.user)
@@ -0,0 +1,142 @@
+"""
+Stateless JWT authentication.
+
+simplejwt's JWTAuthentication loads the User row on every request, although
+permissions and access scopes only need the claims that
+CustomTokenObtainPairSerializer embeds (id, username, role, is_superuser,
+is_staff). StatelessJWTAuthentication builds a users.models.TokenUser from those
+claims instead. Tokens carry the user's `token_version`; users.signals bumps it
+when a claim changes (role, username, superuser/staff/active flags), so older
+tokens are rejected and their holders must sign in again.
+
+The current version is read from CACHES['default'] (one query against the
+primary on a miss).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from common.db_router import primary
+from common.metrics import record_cache_lookup
+from .models import TokenUser, User
+
+TOKEN_VERSION_CLAIM = 'ver'
+TOKEN_VERSION_CACHE_KEY = 'token_version:user:{}'
+TOKEN_USER_CACHE_KEY = 'token_user:user:{}'
+
+# Cached for missing or inactive users; never matches an issued token
+NO_ACTIVE_USER = -1
+
+# Claim -> TokenUser field; besides these, TokenUser instances are known to be active
+TOKEN_USER_CLAIMS = {
+    'username': 'username',
+    'role': 'role',
+    'is_superuser': 'is_superuser',
+    'is_staff': 'is_staff',
+    TOKEN_VERSION_CLAIM: 'token_version',
+}
+
+
+def add_token_claims(token, user):
+    """
+    Embeds the claims StatelessJWTAuthentication builds the request user from.
+    """
+    for claim, field_name in TOKEN_USER_CLAIMS.items():
+        token[claim] = getattr(user, field_name)
+    return token
+
+
+def get_token_version(user_id):
+    """
+    Current token version of an active user, or NO_ACTIVE_USER.
+    """
+    key = TOKEN_VERSION_CACHE_KEY.format(user_id)
+    version = cache.get(key)
+    record_cache_lookup('token_version', version is not None)
+
+    if version is None:
+        with primary():
+            version = User.objects.filter(pk=user_id, is_active=True).values_list('token_version', flat=True).first()
+        if version is None:
+            version = NO_ACTIVE_USER
+        cache.set(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+
+    return version
+
+
+def get_cached_user_fields(user_id):
+    """
+    Concrete field values (except the password hash) of a user, or None if it does not exist.
+    Backs the deferred fields of TokenUser.
+    """
+    key = TOKEN_USER_CACHE_KEY.format(user_id)
+    values = cache.get(key)
+    record_cache_lookup('token_user', values is not None)
+
+    if values is None:
+        names = [field.attname for field in User._meta.concrete_fields if field.attname != 'password']
+        with primary():
+            values = User.objects.filter(pk=user_id).values(*names).first()
+        if values is None:
+            return None
+        cache.set(key, values, settings.TOKEN_USER_CACHE_TIMEOUT)
+
+    return values
+
+
+def invalidate_token_user(user_id):
+    """
+    Drops the cached token version and fields of a user, now and again on
+    commit, so a concurrent request cannot cache the pre-commit row.
+    """
+    keys = [TOKEN_VERSION_CACHE_KEY.format(user_id), TOKEN_USER_CACHE_KEY.format(user_id)]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def check_token_version(validated_token):
+    """
+    Raises AuthenticationFailed if the token was issued before the user's
+    claims last changed, or the user is no longer active.
+    """
+    user_id = validated_token[api_settings.USER_ID_CLAIM]
+    if validated_token[TOKEN_VERSION_CLAIM] != get_token_version(user_id):
+        raise AuthenticationFailed(_("Token has been revoked"), code='token_revoked')
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that returns a TokenUser built from the claims.
+
+    Tokens issued without the version claim, or any token when
+    JWT_STATELESS_AUTH is off, fall back to the per-request database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        if not settings.JWT_STATELESS_AUTH:
+            user = super().get_user(validated_token)
+            if validated_token[TOKEN_VERSION_CLAIM] != user.token_version:
+                raise AuthenticationFailed(_("Token has been revoked"), code='token_revoked')
+            return user
+
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        check_token_version(validated_token)
+
+        values = {
+            # simplejwt stores the id as a string
+            'id': User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM]),
+            'is_active': True,
+            **{field_name: validated_token.get(claim) for claim, field_name in TOKEN_USER_CLAIMS.items()},
+        }
+        # from_db() expects the loaded fields in model order and defers the rest
+        field_names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+        return TokenUser.from_db(None, field_names, [values[name] for name in field_names])
@@ -21,9 +21,37 @@ class User(AbstractUser):
         verbose_name=_("Роль")
     )
 
+    # Embedded in issued JWTs; bumped by users.signals when a claim changes, which revokes older tokens
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         verbose_name = _("Користувач")
         verbose_name_plural = _("Користувачі")
 
     def __str__(self):
-        return f"{self.username} ({self.role})"
\ No newline at end of file
+        return f"{self.username} ({self.role})"
+
+
+class TokenUser(User):
+    """
+    Request user built from access token claims by users.authentication,
+    without a database query. Fields that are not claims are deferred; reading
+    one loads the whole row through a short-lived cache.
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # Reading a deferred field ends up here with fields=[<attname>]
+        from .authentication import get_cached_user_fields
+
+        values = None
+        if fields is not None and from_queryset is None and set(fields) <= self.get_deferred_fields():
+            values = get_cached_user_fields(self.pk)
+
+        if values is None or not set(fields) <= values.keys():
+            return super().refresh_from_db(using, fields, from_queryset)
+
+        for name in self.get_deferred_fields() & values.keys():
+            setattr(self, name, values[name])
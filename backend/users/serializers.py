@@ -1,6 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import TOKEN_VERSION_CLAIM, add_token_claims, get_token_version
 
 User = get_user_model()
 
@@ -33,13 +38,26 @@ class UserShortSerializer(serializers.ModelSerializer):
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Serializer for custom JWT logic.
+    Embeds the claims users.authentication.StatelessJWTAuthentication builds the request user from.
     """
 
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
 
-        token['role'] = user.role
-        token['username'] = user.username
+        return add_token_claims(token, user)
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refuses refresh tokens issued before the user's claims last changed,
+    instead of minting access tokens that would be rejected anyway.
+    """
+
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs['refresh'])
+        version = refresh.payload.get(TOKEN_VERSION_CLAIM)
+        if version is not None and version != get_token_version(refresh.payload[api_settings.USER_ID_CLAIM]):
+            raise AuthenticationFailed("Token has been revoked", 'token_revoked')
 
-        return token
+        return super().validate(attrs)
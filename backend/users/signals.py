@@ -0,0 +1,52 @@
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from reports.versions import bump_users_version
+from .authentication import TOKEN_USER_CLAIMS, invalidate_token_user
+from .models import TokenUser, User
+
+# Saves that do not change anything rendered by UserShortSerializer (e.g. logins)
+IGNORED_UPDATE_FIELDS = {'last_login', 'password'}
+
+# Fields whose change revokes the user's tokens: the claims, and deactivation
+TOKEN_FIELDS = {*TOKEN_USER_CLAIMS.values(), 'is_active'} - {'token_version'}
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=TokenUser)
+def remember_token_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Stores whether this save changes a field embedded in the user's tokens.
+    """
+    instance._token_fields_changed = False
+    if raw or not instance.pk or (update_fields and not set(update_fields) & TOKEN_FIELDS):
+        return
+
+    previous = User.objects.filter(pk=instance.pk).values(*TOKEN_FIELDS).first()
+    instance._token_fields_changed = previous is not None and any(
+        previous[name] != getattr(instance, name) for name in TOKEN_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=TokenUser)
+def bump_users_version_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+
+    if getattr(instance, '_token_fields_changed', False):
+        User.objects.filter(pk=instance.pk).update(token_version=F('token_version') + 1)
+        instance.refresh_from_db(fields=['token_version'])
+    invalidate_token_user(instance.pk)
+
+    if update_fields and set(update_fields) <= IGNORED_UPDATE_FIELDS:
+        return
+    bump_users_version()
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=TokenUser)
+def bump_users_version_on_delete(sender, instance, **kwargs):
+    invalidate_token_user(instance.pk)
+    bump_users_version()
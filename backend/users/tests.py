@@ -1,3 +1,120 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from projects.models import Project
+from tasks.models import Task
+
+from .authentication import StatelessJWTAuthentication
+from .models import TokenUser, User
+from .serializers import CustomTokenObtainPairSerializer
+
+
+class StatelessAuthenticationTests(TestCase):
+    """
+    Tests for the token user built from JWT claims and token versioning.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='dev', password='password123', role='DEV', email='dev@example.com'
+        )
+        self.project = Project.objects.create(
+            name='Alpha', description='...', start_date=timezone.now().date(), manager=self.user
+        )
+        self.client = APIClient()
+
+    def _tokens(self, user):
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
+        return str(refresh.access_token), str(refresh)
+
+    def _authenticate(self, access):
+        authentication = StatelessJWTAuthentication()
+        return authentication.get_user(authentication.get_validated_token(access))
+
+    def _get(self, access, path='/api/projects/'):
+        return self.client.get(path, HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_user_is_built_from_claims_without_queries(self):
+        access, _ = self._tokens(self.user)
+        self._authenticate(access)
+
+        with self.assertNumQueries(0):
+            user = self._authenticate(access)
+            self.assertIsInstance(user, TokenUser)
+            self.assertEqual((user.pk, user.username, user.role), (self.user.pk, 'dev', 'DEV'))
+            self.assertFalse(user.is_superuser or user.is_staff)
+            self.assertTrue(user.is_authenticated and user.is_active)
+            self.assertEqual(user, self.user)
+
+        # Other fields come from the cached row
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'dev@example.com')
+        with self.assertNumQueries(0):
+            self.assertEqual(self._authenticate(access).email, 'dev@example.com')
+
+    def test_token_user_can_be_assigned_to_relations(self):
+        access, _ = self._tokens(self.user)
+
+        response = self.client.post(
+            '/api/bugs/', {'title': 'Broken', 'description': '...', 'project': self.project.id},
+            HTTP_AUTHORIZATION=f'Bearer {access}'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['reporter'], self.user.pk)
+
+    def test_claim_changes_revoke_tokens(self):
+        access, refresh = self._tokens(self.user)
+        self.assertEqual(self._get(access).status_code, 200)
+
+        # Logins and profile edits keep the tokens valid
+        self.user.save(update_fields=['last_login'])
+        self.user.first_name = 'Dev'
+        self.user.save()
+        self.assertEqual(self._get(access).status_code, 200)
+
+        self.user.role = 'PM'
+        self.user.save()
+        response = self._get(access)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['code'], 'token_revoked')
+
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': refresh})
+        self.assertEqual(response.status_code, 401)
+
+        access, _ = self._tokens(self.user)
+        self.assertEqual(self._authenticate(access).role, 'PM')
+        self.assertEqual(self._get(access).status_code, 200)
+
+    def test_deactivation_revokes_tokens(self):
+        access, _ = self._tokens(self.user)
+        self.assertEqual(self._get(access).status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self._get(access).status_code, 401)
+
+    def test_tokens_without_version_fall_back_to_the_database(self):
+        user = self._authenticate(str(AccessToken.for_user(self.user)))
+        self.assertIs(type(user), User)
+
+    @override_settings(JWT_STATELESS_AUTH=False)
+    def test_database_authentication_checks_the_version(self):
+        access, _ = self._tokens(self.user)
+        with self.assertNumQueries(1):
+            self.assertIs(type(self._authenticate(access)), User)
+
+        User.objects.filter(pk=self.user.pk).update(token_version=5)
+        self.assertEqual(self._get(access).status_code, 401)
+
+    def test_refresh_keeps_the_claims(self):
+        _, refresh = self._tokens(self.user)
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': refresh})
+        self.assertEqual(response.status_code, 200)
+
+        Task.objects.create(title='A', description='...', project=self.project)
+        self.assertEqual(self._get(response.data['access'], '/api/tasks/').data['count'], 1)
+        self.assertEqual(self._authenticate(response.data['access']).role, 'DEV')
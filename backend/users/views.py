@@ -1,15 +1,16 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import get_user_model
 
+from common.mixins import SerializerOptimizedQuerySetMixin
 from common.pagination import StandardResultsSetPagination
-from .serializers import UserSerializer, CustomTokenObtainPairSerializer
+from .serializers import UserSerializer, CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
 
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SerializerOptimizedQuerySetMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing users.
     """
@@ -34,3 +35,10 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     Custom view for JWT.
     """
     serializer_class = CustomTokenObtainPairSerializer
+
+
+class CustomTokenRefreshView(TokenRefreshView):
+    """
+    Token refresh that rejects revoked refresh tokens.
+    """
+    serializer_class = CustomTokenRefreshSerializer